@@ -0,0 +1,149 @@
+# Bitboard version of Board.
+#   Same API as Game/board.py (add_ship, receive_shot, all_ships_sunk, place_ships_randomly,
+#   grid, shots_taken) so GameState / SearchAI / main.py can use either one.
+#   Cells are numbered idx = r * size + c, and every state is one python int used as a bitmask:
+#       ship_bits  -> cells that contain a ship (hit or not)
+#       hit_bits   -> ship cells that were shot
+#       miss_bits  -> water cells that were shot
+#       forbidden_bits -> misses + sunk ships + their buffer (where no ship can be, for the heatmaps)
+#   cell_ship[idx] is the index of the ship on that cell (-1 for water), so a hit is found in O(1)
+#   instead of scanning every ship's coord list.
+
+from collections.abc import Mapping
+
+from Game.placements import cells_to_mask, neighborhood_mask, place_fleet_randomly
+from Game.zobrist import ZobristHash
+
+
+class BitGridView(Mapping):
+    """
+    Read-only stand-in for Board.grid.
+    Answers grid.get((r, c)) straight from the bitmasks so old code keeps working.
+    """
+
+    def __init__(self, board):
+        self._board = board
+
+    def _state(self, coord):
+        board = self._board
+        r, c = coord
+        if not (0 <= r < board.size and 0 <= c < board.size):
+            return None
+        bit = 1 << (r * board.size + c)
+        if board.hit_bits & bit:
+            return "already_hit"
+        if board.miss_bits & bit:
+            return "miss"
+        if board.ship_bits & bit:
+            return "ship"
+        return None
+
+    def __getitem__(self, coord):
+        state = self._state(coord)
+        if state is None:
+            raise KeyError(coord)
+        return state
+
+    def get(self, coord, default=None):
+        state = self._state(coord)
+        return default if state is None else state
+
+    def __contains__(self, coord):
+        return self._state(coord) is not None
+
+    def __iter__(self):
+        board = self._board
+        used = board.ship_bits | board.miss_bits
+        while used:
+            low = used & -used
+            idx = low.bit_length() - 1
+            yield divmod(idx, board.size)
+            used ^= low
+
+    def __len__(self):
+        return (self._board.ship_bits | self._board.miss_bits).bit_count()
+
+
+class BitBoard:
+
+    def __init__(self, size):
+        self.size = size
+        self.ships = []
+        self.shots_taken = set()
+
+        self.ship_bits = 0
+        self.hit_bits = 0
+        self.miss_bits = 0
+        self.forbidden_bits = 0
+
+        self.cell_ship = [-1] * (size * size)     # cell index -> ship index (-1 = water)
+        self.ship_remaining = []                   # ship index -> cells not hit yet
+        self.ships_afloat = 0                      # how many ships still have remaining cells
+
+        self.grid = BitGridView(self)
+        self.zobrist = ZobristHash(size)
+
+    def cell_mask(self, coords):
+        """Turns a list of (r, c) into a bitmask. Returns None if any cell is off the board."""
+        return cells_to_mask(coords, self.size)
+
+    def add_ship(self, ship):
+        mask = self.cell_mask(ship.coord)
+        if mask is None:            # out of bounds
+            return False
+        if mask & self.ship_bits:   # overlapping another ship
+            return False
+
+        ship_index = len(self.ships)
+        self.ships.append(ship)
+        self.ship_remaining.append(len(ship.coord))
+        self.ships_afloat += 1
+        self.ship_bits |= mask
+        for (r, c) in ship.coord:
+            self.cell_ship[r * self.size + c] = ship_index
+
+        return True
+
+    def receive_shot(self, coord):
+        if coord in self.shots_taken:
+            return "repeat"
+        self.shots_taken.add(coord)
+
+        (r, c) = coord
+        if not (0 <= r < self.size and 0 <= c < self.size):
+            return "miss"
+
+        idx = r * self.size + c
+        ship_index = self.cell_ship[idx]
+        if ship_index < 0:
+            self.miss_bits |= 1 << idx
+            self.forbidden_bits |= 1 << idx
+            self.zobrist.miss(idx)
+            return "miss"
+
+        # O(1) lookup of the ship instead of scanning every ship
+        ship = self.ships[ship_index]
+        ship.register_hit(coord)
+        self.hit_bits |= 1 << idx
+        self.ship_remaining[ship_index] -= 1
+        self.zobrist.hit(idx)
+
+        if self.ship_remaining[ship_index] == 0:
+            self.ships_afloat -= 1
+            self.zobrist.sink([sr * self.size + sc for (sr, sc) in ship.coord])
+            self.forbidden_bits |= self.neighborhood_mask(self.cell_mask(ship.coord))
+            return f"sunk {ship.name}"
+        return "hit"
+
+    def is_sunk(self, ship_index):
+        return self.ship_remaining[ship_index] == 0
+
+    def all_ships_sunk(self):
+        return self.ships_afloat == 0
+
+    def neighborhood_mask(self, mask):
+        """Grows a mask by one cell in all 8 directions (the no-touch buffer around ships)."""
+        return neighborhood_mask(mask, self.size)
+
+    def place_ships_randomly(self, ship_configs):
+        place_fleet_randomly(self, ship_configs)    # one helper for Board and BitBoard, see Game/placements.py
@@ -3,11 +3,14 @@
 #   which coordinates were hit
 #   which coordinates were missed
 #   This is the minimum needed for the board to function.
+# .ship_bits is the same ships as a bitmask (cell r*size+c), so placement checks are one AND (see Game/placements.py)
 # .ships is an attribute not a function, so it only calls a list, it does not call a method
 # note - board1.place_ship(ship1) really means Board.place_ship(board1, ship1), so self refers to the board you call it on
 # - for (r,c) probably goes through list of coord just 1 by 1 in the list, not like parsing thru a matrix like (0,0), (0,1) ...
 
 
+from Game.placements import neighborhood_mask, place_fleet_randomly
+from Game.zobrist import ZobristHash
 
 class Board:
 
@@ -16,6 +19,12 @@ class Board:
         self.ships = []                 
         self.grid = {}                  #grid is a dictionary where it has keys (coordinates) and values of ship, alr hit, and miss
         self.shots_taken = set() # - is a set because there can be no duplicates, and it is a registry of shots taken. once a shot taken it cant be shot again   
+        self.ship_bits = 0       # every ship cell as one bitmask, used by place_ships_randomly
+        self.zobrist = ZobristHash(size)    # hash of the shots so far, for the AI's transposition cache
+        # what the shooter has seen, kept up to date by receive_shot so the heatmaps never rescan the grid
+        self.hit_bits = 0
+        self.miss_bits = 0
+        self.forbidden_bits = 0  # misses + sunk ships + the buffer around them (no ship can be there)
         
     def add_ship(self, ship):
         for (r,c) in ship.coord: #checking to see if it is in bounds or not, self refers to board here
@@ -30,6 +39,7 @@ class Board:
         self.ships.append(ship)
         for (r,c) in ship.coord: #actually puts the ship in ts
             self.grid[(r,c)] = "ship"
+            self.ship_bits |= 1 << (r * self.size + c)
 
         return True
 
@@ -46,17 +56,28 @@ class Board:
         if self.grid.get(coord) == "ship":
             # find which ship
             for ship in self.ships:     #looks at every ship in ship list []
-                if coord in ship.coord:     #finds whcih ship is at this coordinate (r,c)
+                if coord in ship.cells:     #finds whcih ship is at this coordinate (r,c)
                     ship.register_hit(coord)    #for THIS ship, it registers the hit from the ship class
                     self.grid[coord] = "already_hit"    #now this coord in the grid dictionary goes from "ship" to "already_hit"
+                    self.zobrist.hit(r * self.size + c)
+                    self.hit_bits |= 1 << (r * self.size + c)
 
                     if ship.is_sunk():      #if ship was at its last life, and now is hit, it registers as sunk from now on
+                        self.zobrist.sink([sr * self.size + sc for (sr, sc) in ship.coord])
+                        ship_mask = 0
+                        for (sr, sc) in ship.coord:
+                            ship_mask |= 1 << (sr * self.size + sc)
+                        self.forbidden_bits |= neighborhood_mask(ship_mask, self.size)
                         return f"sunk {ship.name}"      #returns sunk with the exact name of the ship, thanks to the f before ""
                     else:
                         return "hit"
 
         # otherwise it is a miss
         self.grid[coord] = "miss"       #not in grid yet means it missed, dont need else cuz it will go thru if first and return if not a miss
+        if 0 <= r < self.size and 0 <= c < self.size:
+            self.zobrist.miss(r * self.size + c)
+            self.miss_bits |= 1 << (r * self.size + c)
+            self.forbidden_bits |= 1 << (r * self.size + c)
         return "miss"
 
     def all_ships_sunk(self):
@@ -64,61 +85,4 @@ class Board:
         return all(ship.is_sunk() for ship in self.ships)
 
     def place_ships_randomly(self, ship_configs):
-        import random
-        from Game.ship import Ship
-        
-        # Limit retries so it doesn't freeze if the board is too full
-        MAX_ATTEMPTS = 100 
-        
-        for name, size in ship_configs:
-            placed = False
-            attempts = 0
-            
-            while not placed and attempts < MAX_ATTEMPTS:
-                attempts += 1
-                
-                # Randomize orientation and start
-                orientation = random.choice(["H", "V"])
-                r = random.randint(0, self.size - 1)
-                c = random.randint(0, self.size - 1)
-                
-                new_coords = []
-                
-                # generate potential coordinates
-                if orientation == "H":
-                    if c + size <= self.size:
-                        new_coords = [(r, c+i) for i in range(size)]
-                else: # Vertical
-                    if r + size <= self.size:
-                        new_coords = [(r+i, c) for i in range(size)]
-                
-                # --- THE NEW VALIDATION LOGIC ---
-                if new_coords:
-                    is_valid = True
-                    
-                    for (nr, nc) in new_coords:
-                        # Check the cell itself AND its neighbors
-                        # We look at range -1 to +1 for both row and col
-                        # This creates a 3x3 box around every ship segment
-                        for dr in [-1, 0, 1]:
-                            for dc in [-1, 0, 1]:
-                                neighbor_r = nr + dr
-                                neighbor_c = nc + dc
-                                
-                                # If ANY neighbor has a ship, this placement is illegal
-                                if self.grid.get((neighbor_r, neighbor_c)) == "ship":
-                                    is_valid = False
-                                    break
-                            if not is_valid: break
-                        if not is_valid: break
-                    
-                    # If valid, actually place the ship
-                    if is_valid:
-                        new_ship = Ship(name, new_coords)
-                        self.add_ship(new_ship)
-                        placed = True
-            
-            if not placed:
-                print(f"Warning: Could not place {name} after {MAX_ATTEMPTS} attempts.")
-    
-#tester
+        place_fleet_randomly(self, ship_configs)    # one helper for Board and BitBoard, see Game/placements.py
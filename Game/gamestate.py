@@ -5,22 +5,32 @@
 #   run the match
 # need function for switching turns, winning, scoring, going turn, 
 
+from array import array
+
 from Game.board import Board
 from Game.ship import Ship
 
+PLAYERS = ("player", "ai")      # move log player codes: 0 = player, 1 = ai
+
 class GameState:
     
-    def __init__(self, size):
+    def __init__(self, size, board_cls=Board):     #board_cls lets you swap in Game.bitboard.BitBoard, same API
         self.size = size
-        self.player_board = Board(size)
-        self.ai_board = Board(size)
+        self.player_board = board_cls(size)
+        self.ai_board = board_cls(size)
 
         self.current_turn = "player"        #starting player, person is starting
         self.game_over = False              #game is ongoing
         self.winner = None
 
-        self.player_moves = []              #these 2 lines track the move list, important for later
-        self.ai_moves = []
+        # the move list, important for later. Three parallel arrays (one entry per move) instead of a dict per move:
+        self.move_player = array("B")       # index into PLAYERS
+        self.move_cell = array("i")         # r * size + c, -1 for a shot off the board (coord kept in _off_board)
+        self.move_result = array("B")       # index into result_names ("sunk X" names get added as they happen)
+        self.result_names = ["miss", "hit", "repeat"]
+        self._result_codes = {name: i for i, name in enumerate(self.result_names)}
+        self._off_board = {}                # move number -> coord
+        self._shot = (bytearray(size * size), bytearray(size * size))   # per player, 1 = already fired there
 
     def make_move(self, coord):
         if self.game_over:                  #stops if game over
@@ -48,17 +58,47 @@ class GameState:
 
     
     def record_move(self, current_player, coord, result):        #current player = "player" or "ai"
-
-        move = {                            #dictionary with key of string getting you the variable 
-            "player": current_player,
-            "coord": coord,
-            "result": result
-        }
-
-        if current_player == "player":                  #if the current player is the person (player) then it adds the move to the dictionary
-            self.player_moves.append(move)              #otherwise, it adds it to the ai dictionary
+        player = 0 if current_player == "player" else 1
+        code = self._result_codes.get(result)
+        if code is None:
+            code = self._result_codes[result] = len(self.result_names)
+            self.result_names.append(result)
+
+        (r, c) = coord
+        if 0 <= r < self.size and 0 <= c < self.size:
+            cell = r * self.size + c
+            self._shot[player][cell] = 1
         else:
-            self.ai_moves.append(move)
+            cell = -1
+            self._off_board[len(self.move_cell)] = coord
+
+        self.move_player.append(player)
+        self.move_cell.append(cell)
+        self.move_result.append(code)
+
+    def has_shot(self, current_player, coord):
+        """O(1): has this player already fired at coord? (False for cells off the board)"""
+        (r, c) = coord
+        if not (0 <= r < self.size and 0 <= c < self.size):
+            return False
+        return self._shot[0 if current_player == "player" else 1][r * self.size + c] == 1
+
+    def moves(self, current_player=None):
+        """The move log as (player, coord, result), in order. Only one player's moves if current_player is given."""
+        for i, (player, cell, code) in enumerate(zip(self.move_player, self.move_cell, self.move_result)):
+            if current_player is not None and PLAYERS[player] != current_player:
+                continue
+            coord = self._off_board[i] if cell < 0 else divmod(cell, self.size)
+            yield PLAYERS[player], coord, self.result_names[code]
+
+    # the old lists of {"player", "coord", "result"} dicts, built on demand for anything that still reads them
+    @property
+    def player_moves(self):
+        return [{"player": p, "coord": coord, "result": result} for p, coord, result in self.moves("player")]
+
+    @property
+    def ai_moves(self):
+        return [{"player": p, "coord": coord, "result": result} for p, coord, result in self.moves("ai")]
 
     def check_for_winner(self):
         if self.ai_board.all_ships_sunk():
@@ -0,0 +1,209 @@
+# Precomputed ship placements.
+#   Every legal spot for a ship of a given length on a given board size, built once per (size, length)
+#   and shared by random placement, the heatmaps and the solvers.
+#   Cells are numbered idx = r * size + c (same as Game/bitboard.py), so a placement is also a bitmask:
+#       mask    -> the cells of the ship
+#       buffer  -> the ship plus every cell touching it (the no-touch zone)
+#   "can this ship go here?" is then just: placement.buffer & ship_bits == 0
+
+import random
+from collections import namedtuple
+
+from Game.ship import Ship
+
+Placement = namedtuple("Placement", ["mask", "buffer", "cells", "orientation", "row", "col"])
+
+_PLACEMENTS = {}        # (size, length) -> tuple of Placement
+_COVERING = {}          # (size, length) -> cell -> tuple of the placements covering that cell
+_EDGE_MASKS = {}        # size -> (full, not_first_col, not_last_col)
+
+
+def _edge_masks(size):
+    if size not in _EDGE_MASKS:
+        full = (1 << (size * size)) - 1
+        not_first_col = 0
+        not_last_col = 0
+        for r in range(size):
+            row = ((1 << size) - 1) << (r * size)
+            not_first_col |= row & ~(1 << (r * size))
+            not_last_col |= row & ~(1 << (r * size + size - 1))
+        _EDGE_MASKS[size] = (full, not_first_col, not_last_col)
+    return _EDGE_MASKS[size]
+
+
+def neighborhood_mask(mask, size):
+    """Grows a mask by one cell in all 8 directions (the no-touch buffer around ships)."""
+    full, not_first_col, not_last_col = _edge_masks(size)
+    # shifting sideways must not wrap from the end of one row into the next
+    grown = mask | ((mask & not_last_col) << 1) | ((mask & not_first_col) >> 1)
+    grown |= (grown << size) | (grown >> size)
+    return grown & full
+
+
+def cells_to_mask(coords, size):
+    """List of (r, c) -> bitmask. Returns None if any cell is off the board."""
+    mask = 0
+    for (r, c) in coords:
+        if r < 0 or r >= size or c < 0 or c >= size:
+            return None
+        mask |= 1 << (r * size + c)
+    return mask
+
+
+def get_placements(size, length):
+    """
+    All placements of a ship of this length, horizontal ones first then vertical,
+    each in row-major order (the same order the old nested loops used).
+    """
+    key = (size, length)
+    if key not in _PLACEMENTS:
+        placements = []
+        if 0 < length <= size:
+            for r in range(size):
+                for c in range(size - length + 1):
+                    cells = tuple(r * size + c + i for i in range(length))
+                    placements.append(_make_placement(cells, size, "H", r, c))
+            for r in range(size - length + 1):
+                for c in range(size):
+                    cells = tuple((r + i) * size + c for i in range(length))
+                    placements.append(_make_placement(cells, size, "V", r, c))
+        _PLACEMENTS[key] = tuple(placements)
+    return _PLACEMENTS[key]
+
+
+def placements_covering(size, length, idx):
+    """The placements (from get_placements, same order) that put a ship of this length on cell idx."""
+    key = (size, length)
+    if key not in _COVERING:
+        by_cell = [[] for _ in range(size * size)]
+        for placement in get_placements(size, length):
+            for x in placement.cells:
+                by_cell[x].append(placement)
+        _COVERING[key] = [tuple(placements) for placements in by_cell]
+    return _COVERING[key][idx]
+
+
+def _make_placement(cells, size, orientation, r, c):
+    mask = 0
+    for x in cells:
+        mask |= 1 << x
+    return Placement(mask, neighborhood_mask(mask, size), cells, orientation, r, c)
+
+
+def find_placement(size, length, orientation, r, c):
+    """The placement that starts at (r, c) going H or V, or None if it runs off the board."""
+    if orientation == "H":
+        if r < 0 or r >= size or c < 0 or c + length > size:
+            return None
+        return get_placements(size, length)[r * (size - length + 1) + c]
+    if r < 0 or r + length > size or c < 0 or c >= size:
+        return None
+    horizontal = size * (size - length + 1)
+    return get_placements(size, length)[horizontal + r * size + c]
+
+
+def placement_coords(placement, size):
+    """Placement -> list of (r, c), the format Ship expects."""
+    return [divmod(x, size) for x in placement.cells]
+
+
+# --- RANDOM FLEET LAYOUTS ---
+# Instead of throwing darts and retrying, each ship picks uniformly among the placements that are
+# still legal (blocked = every placed ship + its buffer). If a later ship has no room left,
+# we back up and try another spot for the ship before it, so a full fleet is always found if one exists.
+
+QUICK_DRAWS = 8     # random draws before falling back to listing every legal placement
+MAX_DEAD_ENDS = 100000      # dead ends remembered per call; past that the search just stops memoizing new ones
+
+
+def fleet_fits_area(size, lengths):
+    """
+    Quick "can't possibly fit" check. Grow every ship by one cell to the right and down:
+    ships that don't touch then never share a cell, and all of them fit on a (size + 1) x (size + 1) board,
+    so their total area has to as well. False means the fleet never fits; True doesn't promise it does.
+    """
+    return sum(2 * (length + 1) for length in lengths) <= (size + 1) ** 2 and all(0 < n <= size for n in lengths)
+
+def random_fleet_layout(size, ship_configs, rng=None, blocked=0):
+    """
+    Returns one Placement per (name, length) in ship_configs (same order),
+    or None if the fleet cannot fit. blocked = cells no ship may cover (e.g. buffers of ships already on the board).
+    """
+    rng = rng or random
+    lengths = [length for _, length in ship_configs]
+    if not fleet_fits_area(size, lengths):
+        return None     # don't spend a whole backtracking search proving it
+    dead_ends = set()       # (ship number, blocked mask) already known to have no solution
+    chosen = []
+
+    def place(i, blocked):
+        if i == len(lengths):
+            return True
+        if (i, blocked) in dead_ends:
+            return False
+
+        placements = get_placements(size, lengths[i])
+
+        # cheap path: a few uniform draws from the whole table, the first legal one is still
+        # a uniform pick among the legal placements (rejection sampling)
+        tried = None
+        for _ in range(QUICK_DRAWS):
+            placement = placements[rng.randrange(len(placements))]
+            if not (placement.mask & blocked):
+                chosen.append(placement)
+                if place(i + 1, blocked | placement.buffer):
+                    return True
+                chosen.pop()
+                tried = placement
+                break
+
+        # crowded board (or a dead end below): list every legal placement and try them in random order
+        legal = [p for p in placements if not (p.mask & blocked) and p is not tried]
+        while legal:
+            # pick a random legal placement and remove it from the list (swap with the last one)
+            j = rng.randrange(len(legal))
+            placement = legal[j]
+            legal[j] = legal[-1]
+            legal.pop()
+
+            chosen.append(placement)
+            if place(i + 1, blocked | placement.buffer):
+                return True
+            chosen.pop()
+
+        if len(dead_ends) < MAX_DEAD_ENDS:
+            dead_ends.add((i, blocked))
+        return False
+
+    return list(chosen) if place(0, blocked) else None
+
+
+def place_fleet_randomly(board, ship_configs, rng=None):
+    """
+    place_ships_randomly for Board and BitBoard: adds the whole fleet at random legal spots
+    that don't touch the ships already on the board. Raises ValueError if the fleet can't fit.
+    """
+    # Picks among the placements that are actually legal and backtracks when a ship doesn't fit,
+    # so the whole fleet gets placed whenever that's possible (no more retry limit)
+    blocked = neighborhood_mask(board.ship_bits, board.size)
+    layout = random_fleet_layout(board.size, ship_configs, rng or random, blocked)
+    if layout is None:
+        raise ValueError(f"Could not fit fleet {ship_configs} on a {board.size}x{board.size} board.")
+
+    for (name, _), placement in zip(ship_configs, layout):
+        board.add_ship(Ship(name, placement_coords(placement, board.size)))
+
+
+def generate_layouts(size, ship_configs, count=None, seed=None):
+    """
+    Yields random fleet layouts (lists of Placement) for simulations, count of them or forever.
+    Raises ValueError if the fleet can never fit on this board.
+    """
+    rng = random.Random(seed)
+    made = 0
+    while count is None or made < count:
+        layout = random_fleet_layout(size, ship_configs, rng)
+        if layout is None:
+            raise ValueError(f"Fleet {ship_configs} does not fit on a {size}x{size} board")
+        yield layout
+        made += 1
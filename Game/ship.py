@@ -1,15 +1,25 @@
 class Ship:
+    # __slots__ = no per-ship __dict__, a board keeps a handful of these per game and the simulation makes millions
+    # coord is the cells in order (a tuple), cells maps each of them to its bit (1 << offset in coord) for O(1)
+    # "is this cell mine" checks, hit_bits has the bits of the cells hit so far so a repeated hit isn't counted twice
+    __slots__ = ("name", "coord", "cells", "hit_bits", "hit_count")
 
     def __init__(self, name, coord):
-        self.coord = coord
-        self.name = name  
-        self.hits = set()  
+        self.coord = tuple(coord)
+        self.name = name
+        self.cells = {cell: 1 << i for i, cell in enumerate(self.coord)}
+        self.hit_bits = 0
+        self.hit_count = 0
+
     def register_hit(self, coord):
-        self.hits.add(coord) 
+        bit = self.cells.get(coord)
+        if bit and not self.hit_bits & bit:
+            self.hit_bits |= bit
+            self.hit_count += 1
 
     def is_sunk(self):
-        return len(self.hits) == len(self.coord)
-        
+        return self.hit_count >= len(self.coord)
+
 # ship1 = Ship("destroyer", [(1,1), (1,2), (1,3)])
 # print(ship1.coord)
-# print(ship1.name)
\ No newline at end of file
+# print(ship1.name)
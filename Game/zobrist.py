@@ -0,0 +1,93 @@
+# Zobrist hashing of a board as the shooter sees it (misses, hits, sunk ships).
+#   Every (cell, state) pair gets a fixed random 64-bit number and a position's hash is the XOR of the numbers
+#   of its shot cells, so a shot updates the hash with one XOR instead of rehashing the whole board.
+#   A square board has 8 symmetries (4 rotations, each one mirrored or not). We keep one hash per symmetry,
+#   the hash of the board seen through it, so rotated / mirrored positions can share a cache entry:
+#   the canonical hash of a position is the smallest of its 8 hashes (see ai/transposition.py).
+#   The 8 hashes are packed side by side into one 512-bit int, so a shot is still a single XOR
+#   and they only get split apart when someone asks for the canonical hash.
+
+import random
+
+SYMMETRY_COUNT = 8
+HASH_BITS = 64
+HASH_MASK = (1 << HASH_BITS) - 1
+
+_SYMMETRIES = {}        # size -> tuple of 8 permutations
+_KEYS = {}              # size -> (miss keys, hit keys, hit->sunk keys), one packed int per cell
+
+
+def symmetries(size):
+    """The 8 symmetries of the board as permutations: perms[s][idx] = where cell idx ends up under symmetry s."""
+    if size not in _SYMMETRIES:
+        n = size - 1
+        maps = [
+            lambda r, c: (r, c),            # identity
+            lambda r, c: (c, n - r),        # rotate 90
+            lambda r, c: (n - r, n - c),    # rotate 180
+            lambda r, c: (n - c, r),        # rotate 270
+            lambda r, c: (r, n - c),        # mirror left-right
+            lambda r, c: (n - r, c),        # mirror top-bottom
+            lambda r, c: (c, r),            # transpose
+            lambda r, c: (n - c, n - r),    # anti-transpose
+        ]
+        perms = []
+        for to in maps:
+            perm = [0] * (size * size)
+            for r in range(size):
+                for c in range(size):
+                    tr, tc = to(r, c)
+                    perm[r * size + c] = tr * size + tc
+            perms.append(tuple(perm))
+        _SYMMETRIES[size] = tuple(perms)
+    return _SYMMETRIES[size]
+
+
+def zobrist_keys(size):
+    """
+    (miss, hit, hit->sunk) keys, one packed int per cell: bits 64*s .. 64*s+63 of keys[idx]
+    are what a cell in that state XORs into the hash of symmetry s.
+    """
+    if size not in _KEYS:
+        rng = random.Random(f"zobrist-{size}")      # fixed, so hashes are the same in every process
+        cells = size * size
+        miss = [rng.getrandbits(64) for _ in range(cells)]
+        hit = [rng.getrandbits(64) for _ in range(cells)]
+        sunk = [rng.getrandbits(64) for _ in range(cells)]
+
+        perms = symmetries(size)
+        def per_symmetry(table):
+            return [sum(table[perm[idx]] << (HASH_BITS * s) for s, perm in enumerate(perms)) for idx in range(cells)]
+
+        _KEYS[size] = (per_symmetry(miss), per_symmetry(hit), per_symmetry([h ^ s for h, s in zip(hit, sunk)]))
+    return _KEYS[size]
+
+
+class ZobristHash:
+    """The 8 symmetry hashes of one board (packed in self.packed), updated by receive_shot."""
+
+    def __init__(self, size):
+        self.size = size
+        self.miss_keys, self.hit_keys, self.sink_keys = zobrist_keys(size)
+        self.packed = 0
+
+    def miss(self, idx):
+        self.packed ^= self.miss_keys[idx]
+
+    def hit(self, idx):
+        self.packed ^= self.hit_keys[idx]
+
+    def sink(self, cells):
+        """A ship went down: its cells go from hit to sunk."""
+        for idx in cells:
+            self.packed ^= self.sink_keys[idx]
+
+    def hashes(self):
+        """The 8 hashes, one per symmetry."""
+        return [(self.packed >> (HASH_BITS * s)) & HASH_MASK for s in range(SYMMETRY_COUNT)]
+
+    def canonical(self):
+        """(smallest hash, the symmetry that gives it)."""
+        hashes = self.hashes()
+        best = min(hashes)
+        return best, hashes.index(best)
@@ -0,0 +1,200 @@
+from Game.placements import get_placements
+from ai.probability_model import RL_TIE_BREAK
+
+# Exact solver for small boards.
+#   On 5x5 with the small fleet there are only a few hundred legal fleet layouts (no overlap, no touching),
+#   so instead of estimating we list all of them once and keep track of which ones still fit what we've seen.
+#   The set of layouts that are still possible ("alive") is a python int used as a bitset, layout j = bit j,
+#   and every observation is one AND with a precomputed bitset:
+#       cell_layouts[idx]          -> layouts with a ship on cell idx
+#       ship_layouts[k][p]         -> layouts where ship k sits on placement p
+#   The chance that a cell holds a ship is then exactly popcount(alive & cell_layouts[idx]) / popcount(alive).
+
+MAX_LAYOUTS = 200000        # bigger boards / fleets have far too many layouts, use the heatmaps there
+
+_TABLES = {}                # (size, ship configs) -> LayoutTable, or the TooManyLayouts it raised
+
+
+class TooManyLayouts(ValueError):
+    """The board / fleet has more legal layouts than MAX_LAYOUTS."""
+
+
+class LayoutTable:
+    """Every legal layout of one fleet on one board size, plus the bitsets used to filter them."""
+
+    def __init__(self, size, ship_configs, max_layouts=MAX_LAYOUTS):
+        self.size = size
+        self.ship_configs = tuple(ship_configs)
+        self.names = {name: k for k, (name, _) in enumerate(ship_configs)}
+        self.placements = [get_placements(size, length) for _, length in ship_configs]
+
+        # 1. list the layouts, one placement index per ship
+        layouts = []
+        chosen = []
+
+        def place(k, blocked):
+            if k == len(self.placements):
+                layouts.append(tuple(chosen))
+                if len(layouts) > max_layouts:
+                    raise TooManyLayouts(f"More than {max_layouts} layouts for {list(ship_configs)} on {size}x{size}")
+                return
+            for p, placement in enumerate(self.placements[k]):
+                if not (placement.mask & blocked):
+                    chosen.append(p)
+                    place(k + 1, blocked | placement.buffer)
+                    chosen.pop()
+
+        place(0, 0)
+        self.layouts = layouts
+        self.all_layouts = (1 << len(layouts)) - 1
+
+        # 2. the bitsets
+        n = size * size
+        cell_bits = [0] * n
+        ship_bits = [[0] * len(placements) for placements in self.placements]
+        self.layout_masks = []      # layout j -> every ship cell of it as one mask
+        for j, layout in enumerate(layouts):
+            bit = 1 << j
+            occupied = 0
+            for k, p in enumerate(layout):
+                ship_bits[k][p] |= bit
+                occupied |= self.placements[k][p].mask
+                for x in self.placements[k][p].cells:
+                    cell_bits[x] |= bit
+            self.layout_masks.append(occupied)
+        self.cell_layouts = cell_bits
+        self.ship_layouts = ship_bits
+
+        # placements of ship k covering cell x, for hits and sinks
+        self.covering = [[[p for p, placement in enumerate(placements) if (placement.mask >> x) & 1]
+                          for x in range(n)] for placements in self.placements]
+
+
+def get_layout_table(size, ship_configs):
+    key = (size, tuple(ship_configs))
+    if key not in _TABLES:
+        try:
+            _TABLES[key] = LayoutTable(size, ship_configs)
+        except TooManyLayouts as error:
+            _TABLES[key] = error        # listing them again would fail the same way, just slower
+    table = _TABLES[key]
+    if isinstance(table, TooManyLayouts):
+        raise TooManyLayouts(str(table))
+    return table
+
+
+class ExactSolver:
+    """
+    The layouts still consistent with one board's shots. Feed it every shot with observe(),
+    or build a new one from the board (it replays what already happened).
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.size = size = board.size
+        self.table = get_layout_table(size, [(ship.name, len(ship.coord)) for ship in board.ships])
+        self.alive = self.table.all_layouts
+        self.hit_bits = 0
+        self.shot_bits = 0
+        self.shots_seen = 0
+
+        # replay: misses and hits first, then what we know about every ship (sunk -> exact spot, afloat -> not all hit)
+        for (r, c) in board.shots_taken:
+            if 0 <= r < size and 0 <= c < size:
+                idx = r * size + c
+                self.shot_bits |= 1 << idx
+                if board.grid.get((r, c)) == "already_hit":
+                    self.hit_bits |= 1 << idx
+                    self.alive &= self.table.cell_layouts[idx]
+                else:
+                    self.alive &= ~self.table.cell_layouts[idx]
+        for k, ship in enumerate(board.ships):
+            if ship.is_sunk():
+                mask = 0
+                for (r, c) in ship.coord:
+                    mask |= 1 << (r * size + c)
+                self.alive &= self._ship_on(k, [p for p, placement in enumerate(self.table.placements[k])
+                                                if placement.mask == mask])
+            else:
+                self.alive &= ~self._ship_on(k, [p for p, placement in enumerate(self.table.placements[k])
+                                                 if placement.mask & ~self.hit_bits == 0])
+        self.shots_seen = len(board.shots_taken)
+
+    def _ship_on(self, k, placements):
+        """Layouts where ship k is on one of these placements."""
+        bits = 0
+        for p in placements:
+            bits |= self.table.ship_layouts[k][p]
+        return bits
+
+    def _fully_hit(self, k, idx):
+        """Placements of ship k through cell idx whose every cell has been hit."""
+        table = self.table
+        return [p for p in table.covering[k][idx] if table.placements[k][p].mask & ~self.hit_bits == 0]
+
+    def observe(self, move, result):
+        """Filters the layouts by one shot and its result (what receive_shot returned)."""
+        self.shots_seen += 1
+        (r, c) = move
+        if result == "repeat" or not (0 <= r < self.size and 0 <= c < self.size):
+            return
+        idx = r * self.size + c
+        self.shot_bits |= 1 << idx
+        table = self.table
+
+        if result == "miss":
+            self.alive &= ~table.cell_layouts[idx]
+            return
+
+        self.hit_bits |= 1 << idx
+        self.alive &= table.cell_layouts[idx]
+        if result.startswith("sunk"):
+            # the named ship is exactly on cells we've hit, through this one
+            k = table.names[result[len("sunk "):]]
+            self.alive &= self._ship_on(k, self._fully_hit(k, idx))
+        else:
+            # whichever ship is here is not fully hit yet, or it would have sunk
+            for k in range(len(table.ship_configs)):
+                self.alive &= ~self._ship_on(k, self._fully_hit(k, idx))
+
+    def in_sync(self, board):
+        """False if shots happened on the board that were never passed to observe()."""
+        return board is self.board and self.shots_seen == len(board.shots_taken)
+
+    def layouts_left(self):
+        return self.alive.bit_count()
+
+    def alive_layouts(self):
+        """The layouts still possible as (mask of ship cells, weight 1) pairs, like PosteriorSampler.layouts."""
+        masks = self.table.layout_masks
+        alive = self.alive
+        layouts = []
+        while alive:
+            low = alive & -alive
+            layouts.append((masks[low.bit_length() - 1], 1.0))
+            alive ^= low
+        return layouts
+
+    def grid(self, rl_brain=None):
+        """
+        Number of layouts still alive with a ship on each cell, as a list of lists (works with get_best_hunt_move).
+        Cells already shot get 0. The RL bias only breaks ties.
+        """
+        size = self.size
+        alive = self.alive
+        cell_layouts = self.table.cell_layouts
+        bias = rl_brain.bias_cells() if rl_brain else None
+        grid = []
+        for r in range(size):
+            row = []
+            for c in range(size):
+                idx = r * size + c
+                if (self.shot_bits >> idx) & 1:
+                    row.append(0)
+                    continue
+                score = (alive & cell_layouts[idx]).bit_count()
+                if bias:
+                    score += bias[idx] * RL_TIE_BREAK
+                row.append(score)
+            grid.append(row)
+        return grid
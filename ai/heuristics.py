@@ -1,86 +1,203 @@
+from functools import lru_cache
+from operator import add
+
+from Game.placements import get_placements, neighborhood_mask, placements_covering
+
+try:
+    import numpy as np
+except ImportError:     # numpy is optional, the pure python heatmap below works without it
+    np = None
+
 def get_probability_grid(board, remaining_ships, rl_brain=None): # <--- Added rl_brain param
     """
     Generates a probability grid based on the remaining ships and the current board state.
     Now accounts for the rule: SHIPS CANNOT TOUCH + RL BIAS.
+    Bots that ask every move should keep a HeatmapScratch and call get_probability_grid_into instead.
+    """
+    return get_probability_grid_into(board, remaining_ships, HeatmapScratch(board.size), rl_brain)
+
+class HeatmapScratch:
+    """
+    Buffers get_probability_grid_into fills in place. The caller owns one (e.g. one per SearchAI)
+    and reuses it every move, so a heatmap doesn't build a new grid, weight list and rows each time.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        n = size * size
+        self.flat = [0] * n             # scores, cell r*size+c
+        self.zeros = [0] * n            # copied over flat to clear it
+        self.weights = [1] * n          # 10 on open hits while a heatmap is being built, 1 otherwise
+        self.ship_lengths = {}
+        self.rows = [[0] * size for _ in range(size)]
+
+def get_probability_grid_into(board, remaining_ships, scratch, rl_brain=None):
+    """
+    Same scores as get_probability_grid, written into scratch.rows (which is returned).
+    The next call overwrites them, so copy the rows if you need to keep them.
     """
     size = board.size
-    prob_grid = [[0 for _ in range(size)] for _ in range(size)]
+    flat = scratch.flat
+    flat[:] = scratch.zeros
+    weights = scratch.weights
 
     # --- STEP 1: CREATE FORBIDDEN ZONES ---
-    forbidden_mask = set()
+    # misses + sunk ships + their buffer zones, as one bitmask (the board keeps it up to date)
+    hit_bits, miss_bits, forbidden_mask = observed_bits(board)
+
+    # hits that are still in play count 10x
+    open_hits = hit_bits & ~forbidden_mask
+    hits = open_hits
+    while hits:
+        low = hits & -hits
+        weights[low.bit_length() - 1] = 10
+        hits ^= low
+
+    # --- STEP 2: SLIDING WINDOW (The Heatmap) ---
+    # every placement comes precomputed from Game/placements.py, so validity is one AND
+    ship_lengths = scratch.ship_lengths
+    ship_lengths.clear()
+    for ship in remaining_ships:
+        length = len(ship.coord)
+        ship_lengths[length] = ship_lengths.get(length, 0) + 1
 
-    # Add all known misses
+    for length, count in ship_lengths.items():
+        for placement in get_placements(size, length):
+            if not (placement.mask & forbidden_mask):
+                for x in placement.cells:
+                    flat[x] += count * weights[x]
+
+    hits = open_hits                # weights back to 1 for the next call
+    while hits:
+        low = hits & -hits
+        weights[low.bit_length() - 1] = 1
+        hits ^= low
+
+    # --- STEP 3: APPLY REINFORCEMENT LEARNING BIAS ---
+    if rl_brain:
+        _add_rl_bias_into(flat, hit_bits | miss_bits, rl_brain)
+
+    rows = scratch.rows
     for r in range(size):
+        row = rows[r]
+        base = r * size
         for c in range(size):
-            if board.grid.get((r, c)) == "miss":
-                forbidden_mask.add((r, c))
+            row[c] = flat[base + c]
+    return rows
 
-    # Add Sunk Ships AND their Buffer Zones
-    for ship in board.ships:
-        if ship.is_sunk():
-            for (sr, sc) in ship.coord:
-                forbidden_mask.add((sr, sc))
-                # Add neighbors
-                for dr in [-1, 0, 1]:
-                    for dc in [-1, 0, 1]:
-                        nr, nc = sr + dr, sc + dc
-                        if 0 <= nr < size and 0 <= nc < size:
-                            forbidden_mask.add((nr, nc))
+def _add_rl_bias_into(flat, shot_bits, rl_brain):
+    """
+    In-place add_rl_bias: the whole bias layer goes on in one map() over the grid,
+    then the cells already shot get their old score back (only those are looped over).
+    """
+    kept = []
+    marked = shot_bits
+    while marked:
+        low = marked & -marked
+        x = low.bit_length() - 1
+        kept.append((x, flat[x]))
+        marked ^= low
+    flat[:] = map(add, flat, rl_brain.bias_cells())
+    for x, score in kept:
+        flat[x] = score
 
-    # --- STEP 2: SLIDING WINDOW (The Heatmap) ---
-    ship_lengths = [len(ship.coord) for ship in remaining_ships]
-
-    for length in ship_lengths:
-        # Try Horizontal Placements
-        for r in range(size):
-            for c in range(size - length + 1): 
-                possible_coords = []
-                valid_placement = True
-                for i in range(length):
-                    coord = (r, c + i)
-                    if coord in forbidden_mask:
-                        valid_placement = False; break
-                    if board.grid.get(coord) == "already_hit" and coord not in forbidden_mask: pass
-                    elif board.grid.get(coord) == "already_hit": valid_placement = False; break
-                    possible_coords.append(coord)
-                
-                if valid_placement:
-                    for (pr, pc) in possible_coords:
-                        weight = 10 if board.grid.get((pr, pc)) == "already_hit" else 1
-                        prob_grid[pr][pc] += weight
-
-        # Try Vertical Placements
-        for r in range(size - length + 1):
-            for c in range(size):
-                possible_coords = []
-                valid_placement = True
-                for i in range(length):
-                    coord = (r + i, c)
-                    if coord in forbidden_mask:
-                        valid_placement = False; break
-                    if board.grid.get(coord) == "already_hit" and coord not in forbidden_mask: pass
-                    elif board.grid.get(coord) == "already_hit": valid_placement = False; break
-                    possible_coords.append(coord)
-                
-                if valid_placement:
-                    for (pr, pc) in possible_coords:
-                        weight = 10 if board.grid.get((pr, pc)) == "already_hit" else 1
-                        prob_grid[pr][pc] += weight
+def add_rl_bias(flat_grid, shot_bits, rl_brain):
+    """
+    Returns flat_grid plus the brain's precomputed bias on every cell that hasn't been shot.
+    Added to every cell at once, then taken back off the cells already shot.
+    """
+    biased = list(map(add, flat_grid, rl_brain.bias_cells()))
+    while shot_bits:
+        low = shot_bits & -shot_bits
+        x = low.bit_length() - 1
+        biased[x] = flat_grid[x]
+        shot_bits ^= low
+    return biased
 
-    # --- STEP 3: APPLY REINFORCEMENT LEARNING BIAS ---
+def get_target_grid(board, remaining_ships, rl_brain=None):
+    """
+    Heatmap for target mode: only the placements that could be the ship we already hit.
+    A placement counts if it covers at least one open hit (a hit on a ship that isn't sunk yet),
+    stays off misses and sunk ships' buffers, and doesn't touch any open hit it doesn't cover
+    (ships can't touch, so a hit right next to a ship must be part of it).
+    The best cell of this grid is the likeliest way to extend the hit cluster.
+    Returns None when there are no open hits (nothing to chase).
+    """
+    size = board.size
+    hit_bits, miss_bits, forbidden_mask = observed_bits(board)
+    open_hits = hit_bits & ~forbidden_mask
+    if not open_hits:
+        return None
+
+    ship_lengths = {}
+    for ship in remaining_ships:
+        length = len(ship.coord)
+        ship_lengths[length] = ship_lengths.get(length, 0) + 1
+
+    flat_grid = [0] * (size * size)
+    for length, count in ship_lengths.items():
+        seen = set()
+        hits = open_hits
+        while hits:
+            low = hits & -hits
+            hits ^= low
+            for placement in placements_covering(size, length, low.bit_length() - 1):
+                if placement.mask in seen:
+                    continue
+                seen.add(placement.mask)
+                if placement.mask & forbidden_mask or placement.buffer & open_hits & ~placement.mask:
+                    continue
+                for x in placement.cells:
+                    flat_grid[x] += count
+
+    # cells already shot can't be picked anyway, keep them out of the scores
+    shot = hit_bits | miss_bits
+    while shot:
+        low = shot & -shot
+        flat_grid[low.bit_length() - 1] = 0
+        shot ^= low
+
+    # RL bias only on cells that can still be part of the ship, so it never outranks a real extension
     if rl_brain:
-        for r in range(size):
-            for c in range(size):
-                if board.grid.get((r, c)) not in ["miss", "already_hit"]:
-                    bias = rl_brain.get_bias_score(r, c)
-                    prob_grid[r][c] += bias
-                        
-    return prob_grid
+        flat_grid = [score + bias if score else 0 for score, bias in zip(flat_grid, rl_brain.bias_cells())]
+    return [flat_grid[r * size:(r + 1) * size] for r in range(size)]
+
+def observed_bits(board):
+    """
+    Returns (hit_bits, miss_bits, forbidden_bits) for a Board or BitBoard, cell index r*size+c.
+    forbidden = misses + sunk ships + the buffer zone around sunk ships.
+    """
+    if hasattr(board, "forbidden_bits"):
+        # Board and BitBoard keep all three up to date in receive_shot
+        return board.hit_bits, board.miss_bits, board.forbidden_bits
+
+    size = board.size
+    if hasattr(board, "hit_bits"):
+        hit_bits, miss_bits = board.hit_bits, board.miss_bits
+    else:
+        hit_bits = miss_bits = 0
+        for (r, c), state in board.grid.items():      # only touched cells are in the dict
+            if state == "already_hit":
+                hit_bits |= 1 << (r * size + c)
+            elif state == "miss":
+                miss_bits |= 1 << (r * size + c)
+
+    forbidden = miss_bits
+    for ship in board.ships:
+        if ship.is_sunk():
+            ship_mask = 0
+            for (r, c) in ship.coord:
+                ship_mask |= 1 << (r * size + c)
+            forbidden |= neighborhood_mask(ship_mask, size)
+    return hit_bits, miss_bits, forbidden
 
 def get_best_hunt_move(board, prob_grid):
     """
     Finds the coordinate with the highest probability score that hasn't been shot at.
     """
+    if np is not None and isinstance(prob_grid, np.ndarray):
+        return get_best_hunt_move_numpy(board, prob_grid)
+
     best_score = -1
     best_move = None
     
@@ -102,4 +219,206 @@ def get_best_hunt_move(board, prob_grid):
                 if (r + c) % 2 == 0: # Simple checkerboard logic
                      best_move = coord
                 
-    return best_move
\ No newline at end of file
+    return best_move
+
+
+# --- NUMPY VERSION ---
+# Same heatmap as get_probability_grid, but every ship length is slid over every row/column at once.
+# A placement is valid when the window sum of the blocked mask is 0 (cumulative sums),
+# and how many valid placements cover a cell is another window sum over the valid starts.
+
+def board_to_arrays(board):
+    """
+    Returns (hit, miss, blocked) boolean size x size arrays for a Board or BitBoard.
+    blocked = misses + sunk ships + the buffer zone around sunk ships.
+    """
+    size = board.size
+    hit = np.zeros((size, size), dtype=bool)
+    miss = np.zeros((size, size), dtype=bool)
+
+    if hasattr(board, "hit_bits"):
+        # BitBoard: unpack the masks directly
+        n = size * size
+        nbytes = (n + 7) // 8
+        for mask, out in ((board.hit_bits, hit), (board.miss_bits, miss)):
+            bits = np.unpackbits(np.frombuffer(mask.to_bytes(nbytes, "little"), dtype=np.uint8), bitorder="little")
+            out.flat[:] = bits[:n]
+    else:
+        for (r, c), state in board.grid.items():
+            if state == "already_hit":
+                hit[r, c] = True
+            elif state == "miss":
+                miss[r, c] = True
+
+    blocked = miss.copy()
+    sunk_ships = [ship for ship in board.ships if ship.is_sunk()]
+    if sunk_ships:
+        sunk = np.zeros((size + 2, size + 2), dtype=bool)     # padded by 1 so the 3x3 grow never goes off the edge
+        for ship in sunk_ships:
+            for (r, c) in ship.coord:
+                sunk[r + 1, c + 1] = True
+        for dr in (0, 1, 2):
+            for dc in (0, 1, 2):
+                blocked |= sunk[dr:dr + size, dc:dc + size]
+
+    return hit, miss, blocked
+
+
+def weighted_coverage(blocked, length_counts):
+    """
+    Counts, for every cell, the valid horizontal + vertical placements covering it,
+    summed over ship lengths ({length: how many ships of that length}).
+    blocked is a (..., size, size) boolean array, extra leading axes (many boards) are handled in one go;
+    the counts can then also be arrays with one entry per board.
+    """
+    size = blocked.shape[-1]
+
+    # rows of the board and rows of the transposed board (= columns) in one array
+    free = ~np.stack((blocked, np.swapaxes(blocked, -1, -2)))
+    total = np.zeros(free.shape, dtype=np.int32)
+    for length, count in length_counts.items():
+        if length > size or (np.ndim(count) == 0 and count == 0):
+            continue
+        # valid[..., s]: the window starting at column s has no blocked cell (AND of `length` shifted slices)
+        starts = size - length + 1
+        valid = free[..., :starts].copy()
+        for d in range(1, length):
+            valid &= free[..., d:starts + d]
+        # one count per board broadcasts over its cells, then every window adds to the cells it covers
+        valid = valid * np.asarray(count, dtype=np.int32)[..., None, None]
+        for d in range(length):
+            total[..., d:starts + d] += valid
+
+    return total[0] + np.swapaxes(total[1], -1, -2)
+
+
+def get_probability_grid_numpy(board, remaining_ships, rl_brain=None):
+    """
+    Vectorized get_probability_grid. Returns the same scores as a size x size numpy array.
+    """
+    if np is None:
+        raise ImportError("numpy is required for the numpy heatmap")
+
+    hit, miss, blocked = board_to_arrays(board)
+
+    # ships of the same length only need one pass, then get multiplied
+    counts = {}
+    for ship in remaining_ships:
+        length = len(ship.coord)
+        counts[length] = counts.get(length, 0) + 1
+
+    prob_grid = weighted_coverage(blocked, counts).astype(np.int64)
+    prob_grid[hit] *= 10        # same hit weighting as the python version
+
+    if rl_brain:
+        prob_grid = prob_grid + np.where(hit | miss, 0.0, rl_brain.bias_array())
+
+    return prob_grid
+
+
+def get_best_hunt_move_numpy(board, prob_grid):
+    """
+    get_best_hunt_move for numpy grids. Same tie-break as the loop version:
+    the last checkerboard square with the top score, otherwise the first square with the top score.
+    """
+    size = board.size
+    shot = np.zeros((size, size), dtype=bool)
+    for (r, c) in board.shots_taken:
+        if 0 <= r < size and 0 <= c < size:
+            shot[r, c] = True
+
+    if shot.all():
+        return None
+
+    scores = np.where(shot, -np.inf, prob_grid.astype(float))
+    best = np.flatnonzero(scores == scores.max())
+    rows, cols = np.divmod(best, size)
+    even = best[(rows + cols) % 2 == 0]
+    idx = even[-1] if len(even) else best[0]
+    r, c = divmod(int(idx), size)
+    return (r, c)
+
+
+def get_probability_grids_batch(hit, blocked, length_counts):
+    """
+    get_probability_grid for a whole stack of boards at once (no RL bias).
+    hit / blocked are (boards, size, size) boolean arrays, length_counts maps
+    ship length -> array with how many unsunk ships of that length each board has left.
+    """
+    prob_grids = weighted_coverage(blocked, length_counts).astype(np.int64)
+    prob_grids[hit & ~blocked] *= 10
+    return prob_grids
+
+
+@lru_cache(maxsize=None)
+def _target_matrices(size, lengths):
+    """
+    Every placement of every length in `lengths`, for get_target_grids_batch:
+        test  -> (2 * cells, placements), [open hits, forbidden] @ test is >= 1 exactly for the placements
+                 that cover an open hit, stay off forbidden cells and touch no other open hit
+        ships -> (placements, cells), 0/1 ship cells of each placement
+        sizes -> how many placements each length has, in the order of `lengths`
+    """
+    cells = size * size
+    penalty = cells + 1         # more than any placement can score from the hits it covers
+    placements = [p for length in lengths for p in get_placements(size, length)]
+    ships = np.zeros((len(placements), cells), dtype=np.float32)
+    touching = np.zeros_like(ships)
+    for p, placement in enumerate(placements):
+        ships[p, list(placement.cells)] = 1
+        around = placement.buffer & ~placement.mask
+        while around:
+            low = around & -around
+            touching[p, low.bit_length() - 1] = 1
+            around ^= low
+    test = np.concatenate((ships - penalty * touching, -penalty * ships), axis=1).T.copy()
+    sizes = [len(get_placements(size, length)) for length in lengths]
+    return test, ships, sizes
+
+
+def get_target_grids_batch(hit, blocked, length_counts):
+    """
+    get_target_grid for a whole stack of boards at once (no RL bias), same arguments as
+    get_probability_grids_batch. Boards without open hits get an all-zero grid, and so do shot cells.
+    """
+    boards, size, _ = hit.shape
+    lengths = tuple(sorted(length for length in length_counts if length <= size))
+    test, ships, sizes = _target_matrices(size, lengths)
+
+    # which placements could be the ship(s) we've hit, all lengths and all boards in one matrix product,
+    # then every fitting placement adds its length's ship count to its cells (a second one)
+    seen = np.concatenate(((hit & ~blocked).reshape(boards, -1), blocked.reshape(boards, -1)), axis=1)
+    fits = (seen.astype(np.float32) @ test) >= 1
+    counts = np.repeat(np.stack([np.asarray(length_counts[length], dtype=np.float32) * np.ones(boards, np.float32)
+                                 for length in lengths], axis=1), sizes, axis=1)
+    grids = ((fits * counts) @ ships).astype(np.int64).reshape(boards, size, size)
+    grids[hit | blocked] = 0
+    return grids
+
+
+def get_best_hunt_moves_batch(prob_grids, shot):
+    """
+    get_best_hunt_move for a stack of boards, same tie-break. Returns one flat cell index
+    (r * size + c) per board, or -1 for boards with nothing left to shoot.
+    """
+    boards, size, _ = prob_grids.shape
+    scores = np.where(shot, -1, prob_grids).reshape(boards, -1)
+    top = scores == scores.max(axis=1, keepdims=True)
+    top &= scores >= 0
+
+    cells = np.arange(size * size)
+    even = top & (((cells // size) + (cells % size)) % 2 == 0)
+    has_even = even.any(axis=1)
+    last_even = size * size - 1 - np.argmax(even[:, ::-1], axis=1)
+    first = np.argmax(top, axis=1)
+
+    moves = np.where(has_even, last_even, first)
+    moves[~top.any(axis=1)] = -1
+    return moves
+
+
+# name -> heatmap function, so callers (SearchAI, simulation) can pick one at runtime
+HEATMAP_BACKENDS = {
+    "python": get_probability_grid,
+    "numpy": get_probability_grid_numpy,
+}
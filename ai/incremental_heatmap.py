@@ -0,0 +1,153 @@
+from Game.placements import get_placements
+from ai.heuristics import get_probability_grid
+
+class IncrementalHeatmap:
+    """
+    Keeps the hunt heatmap up to date shot by shot instead of rebuilding it every move.
+    Gives the same numbers as get_probability_grid (use check() to compare).
+
+    For every ship length we remember which placements are still valid and how many of them
+    cover each cell. A miss (or a sunk ship + its buffer) only kills the placements that
+    touch those cells, so an update costs (ship lengths x length) instead of a full rescan.
+    """
+
+    def __init__(self, board, remaining_ships):
+        self.board = board
+        self.size = size = board.size
+        n = size * size
+
+        self.counts = {}                    # length -> how many unsunk ships have that length
+        for ship in remaining_ships:
+            length = len(ship.coord)
+            self.counts[length] = self.counts.get(length, 0) + 1
+
+        self.placements = {}                # length -> cells of each placement (from Game/placements.py)
+        self.by_cell = {}                   # length -> cell -> indexes of placements covering that cell
+        self.valid = {}                     # length -> bytearray, 1 if the placement is still possible
+        self.cover = {}                     # length -> cell -> valid placements covering it
+        self.total = [0] * n                # sum over lengths of count * cover
+        self.weight = [1] * n               # 10 on hit cells, same as get_probability_grid
+        self.blocked = bytearray(n)         # misses + sunk ships + their buffer
+        self.shot = bytearray(n)
+        self.shots_seen = 0
+
+        for length in self.counts:
+            placements = [placement.cells for placement in get_placements(size, length)]
+
+            by_cell = [[] for _ in range(n)]
+            for p, cells in enumerate(placements):
+                for x in cells:
+                    by_cell[x].append(p)
+
+            self.placements[length] = placements
+            self.by_cell[length] = by_cell
+            self.valid[length] = bytearray([1]) * len(placements)
+            self.cover[length] = [len(by_cell[x]) for x in range(n)]
+            count = self.counts[length]
+            for x in range(n):
+                self.total[x] += count * self.cover[length][x]
+
+        # replay whatever already happened on this board
+        for ship in board.ships:
+            if ship.is_sunk():
+                self._block_around(ship)
+        for (r, c) in board.shots_taken:
+            if 0 <= r < size and 0 <= c < size:
+                state = board.grid.get((r, c))
+                if state == "miss":
+                    self._block(r * size + c)
+                elif state == "already_hit":
+                    self.weight[r * size + c] = 10
+                self.shot[r * size + c] = 1
+        self.shots_seen = len(board.shots_taken)
+
+    def _block(self, x):
+        """Removes every still-valid placement that covers cell x."""
+        if self.blocked[x]:
+            return
+        self.blocked[x] = 1
+        for length, by_cell in self.by_cell.items():
+            valid = self.valid[length]
+            cover = self.cover[length]
+            placements = self.placements[length]
+            count = self.counts[length]
+            for p in by_cell[x]:
+                if valid[p]:
+                    valid[p] = 0
+                    for y in placements[p]:
+                        cover[y] -= 1
+                        self.total[y] -= count
+
+    def _block_around(self, ship):
+        """Blocks a sunk ship and the no-touch buffer around it."""
+        size = self.size
+        for (sr, sc) in ship.coord:
+            for dr in [-1, 0, 1]:
+                for dc in [-1, 0, 1]:
+                    nr, nc = sr + dr, sc + dc
+                    if 0 <= nr < size and 0 <= nc < size:
+                        self._block(nr * size + nc)
+
+    def _sink(self, ship):
+        self._block_around(ship)
+
+        # one less ship of this length: its share of the heatmap goes away (only happens once per ship)
+        length = len(ship.coord)
+        self.counts[length] -= 1
+        cover = self.cover[length]
+        for x in range(self.size * self.size):
+            self.total[x] -= cover[x]
+
+    def observe(self, move, result, board=None):
+        """Feed one shot result (the same thing SearchAI.update_result gets)."""
+        if result == "repeat":
+            return
+        board = board or self.board
+        self.shots_seen += 1
+
+        (r, c) = move
+        if not (0 <= r < self.size and 0 <= c < self.size):
+            return
+        x = r * self.size + c
+        self.shot[x] = 1
+
+        if result == "miss":
+            self._block(x)
+        elif result == "hit":
+            self.weight[x] = 10
+        elif "sunk" in result:
+            self.weight[x] = 10
+            for ship in board.ships:
+                if move in ship.cells:
+                    self._sink(ship)
+                    break
+
+    def in_sync(self, board):
+        """False if shots happened on the board that were never passed to observe()."""
+        return board is self.board and self.shots_seen == len(board.shots_taken)
+
+    def grid(self, rl_brain=None):
+        """Returns the heatmap as a list of lists, like get_probability_grid."""
+        size = self.size
+        bias = rl_brain.bias_cells() if rl_brain else None
+        prob_grid = []
+        for r in range(size):
+            row = []
+            for c in range(size):
+                x = r * size + c
+                score = self.total[x] * self.weight[x]
+                if bias and not self.shot[x]:
+                    score += bias[x]
+                row.append(score)
+            prob_grid.append(row)
+        return prob_grid
+
+    def check(self, board, remaining_ships, rl_brain=None):
+        """Compares against a full get_probability_grid recompute. Raises AssertionError on mismatch."""
+        expected = get_probability_grid(board, remaining_ships, rl_brain)
+        actual = self.grid(rl_brain)
+        for r in range(self.size):
+            for c in range(self.size):
+                if abs(expected[r][c] - actual[r][c]) > 1e-9:
+                    raise AssertionError(f"Incremental heatmap differs at {(r, c)}: {actual[r][c]} != {expected[r][c]}")
+        return True
@@ -1,31 +1,175 @@
 import json
 import os
+import re
+import threading
+from array import array
+
+from ai.memory_store import MemoryStore, SharedMemoryStore
+
+try:
+    import numpy as np
+except ImportError:     # only needed for bias_array()
+    np = None
+
+LEGACY_MEMORY_FILE = "ai_memory.json"      # old format: a JSON list of lists, rewritten after every game
+BIAS_WEIGHT = 1.0       # bias of a cell that held a ship in every game so far (a heatmap point is one placement)
+
+# How past games count:
+#   cumulative -> every game forever, plain counters (the original behaviour)
+#   decay      -> each new game multiplies the old counts by `decay` first, so old habits fade out
+#   window     -> only the last `window` games (a ring of one ship mask per game)
+# All of them keep a fixed amount of memory and cost O(size^2) per learned game.
+LEARNING_MODES = ("cumulative", "decay", "window")
+DEFAULT_DECAY = 0.98
+DEFAULT_WINDOW = 200
+
+
+def memory_file(size, mode="cumulative", decay=DEFAULT_DECAY, window=DEFAULT_WINDOW, opponent=None):
+    """
+    Default memory file for a board size (one file per size so 5x5 and 10x10 games don't overwrite each other),
+    with the learning mode and opponent in the name so different setups never read each other's memory.
+    """
+    name = f"ai_memory_{size}x{size}"
+    if mode == "decay":
+        name += f"_decay{decay:g}"
+    elif mode == "window":
+        name += f"_window{window}"
+    return profile_file(name + ".bin", opponent)
+
+
+def profile_file(path, opponent):
+    """The memory file of one opponent's profile next to `path`: ai_memory.bin -> ai_memory_<opponent>.bin."""
+    if opponent is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{re.sub(r'[^A-Za-z0-9_.-]', '_', str(opponent))}{ext}"
 
-MEMORY_FILE = "ai_memory.json"
 
 class RLBrain:
-    def __init__(self, size=10):
+    """
+    Remembers where the opponent's ships have been across games.
+    flush_every / flush_interval control how often the memory hits the disk (see ai/memory_store.py):
+    the default writes after every game like before, training runs can batch it up, e.g. flush_every=500.
+    shared=True memory-maps the file so several processes can learn into it at once
+    (each one counts into its own shard file, merged into the main file on flush). Cumulative mode only.
+    mode / decay / window pick how old games are weighted (see LEARNING_MODES above),
+    opponent keeps a separate profile per opponent ID (see for_opponent).
+    """
+
+    def __init__(self, size=10, path=None, flush_every=1, flush_interval=None, shared=False,
+                 mode="cumulative", decay=DEFAULT_DECAY, window=DEFAULT_WINDOW, opponent=None):
+        if mode not in LEARNING_MODES:
+            raise ValueError(f"Unknown learning mode {mode!r}, expected one of {', '.join(LEARNING_MODES)}")
+        if mode == "decay" and not 0 < decay < 1:
+            raise ValueError("decay must be between 0 and 1")
+        if mode == "window" and window < 1:
+            raise ValueError("window must be at least 1 game")
+        if shared and mode != "cumulative":
+            raise ValueError("shared memory only supports the cumulative mode (shards are merged by adding)")
+
         self.size = size
-        self.memory_grid = self.load_memory()
-
-    def load_memory(self):
-        """Loads the heatmap from a JSON file. If none exists, creates a blank one."""
-        if os.path.exists(MEMORY_FILE):
-            with open(MEMORY_FILE, "r") as f:
-                try:
-                    data = json.load(f)
-                    # Simple check to ensure size matches
-                    if len(data) == self.size:
-                        return data
-                except:
-                    pass
-        # Return empty grid of zeros
-        return [[0 for _ in range(self.size)] for _ in range(self.size)]
+        self.mode = mode
+        self.decay = decay
+        self.window = window
+        self.opponent = opponent
+        self._settings = dict(flush_every=flush_every, flush_interval=flush_interval, shared=shared,
+                              mode=mode, decay=decay, window=window)
+        self.profiles = {}          # opponent ID -> RLBrain, filled by for_opponent
+
+        path = path or memory_file(size, mode, decay, window, opponent)
+        self.path = path
+        if shared:
+            self.store = SharedMemoryStore(path, size, flush_every, flush_interval)
+        elif mode == "decay":
+            self.store = MemoryStore(path, size, "d", flush_every, flush_interval)
+        elif mode == "window":
+            self.store = MemoryStore(path, size, "B", flush_every, flush_interval, layers=window)
+        else:
+            self.store = MemoryStore(path, size, "I", flush_every, flush_interval)
+        # only the original setup can pick up the old JSON memory
+        legacy = self.load_legacy_memory if mode == "cumulative" and opponent is None else None
+        self.store.load(legacy)
+
+        # window mode: running totals over the ring, so nothing has to be summed up per move
+        self._window_counts = None
+        if mode == "window":
+            counts = array("I", bytes(size * size * 4))
+            for layer in range(window):
+                start = layer * size * size
+                for i, value in enumerate(self.store.cells[start:start + size * size]):
+                    counts[i] += value
+            self._window_counts = counts
+
+        # the bias only changes when we learn, so it's worked out once and reused for every move
+        # learn_from_game can run on another thread than the moves (server.py), so a bias worked out
+        # from the old counts is only kept if no game was learned while it was being computed
+        self.version = 0            # bumped by learn_from_game, anything caching the bias can compare it
+        self._bias_lock = threading.Lock()
+        self._bias = None
+        self._bias_array = None
+        self._bias_fingerprint = None
+        # shared mode: other processes' games only show up in the mapped game counter when they flush
+        self._shared = shared
+        self._seen_games = self.store.games
+
+    def for_opponent(self, opponent):
+        """The brain for one opponent ID (same settings, own memory file next to ours). Created on first use."""
+        if opponent not in self.profiles:
+            self.profiles[opponent] = RLBrain(self.size, profile_file(self.path, opponent), opponent=opponent,
+                                              **self._settings)
+        return self.profiles[opponent]
+
+    def counts(self):
+        """Current count of every cell as a flat list (floats in decay mode, last `window` games in window mode)."""
+        if self._window_counts is not None:
+            return list(self._window_counts)
+        return self.store.values()
+
+    @property
+    def memory_grid(self):
+        """The counts as a list of lists (rows), like the old JSON grid."""
+        cells = self.counts()
+        return [cells[r * self.size:(r + 1) * self.size] for r in range(self.size)]
+
+    @property
+    def games_played(self):
+        return self.store.games
+
+    def effective_games(self):
+        """How many games the counts are worth, what bias_cells() divides by."""
+        games = self.store.games
+        if self.mode == "decay":
+            # 1 + d + d^2 + ... for every game learned so far
+            return (1 - self.decay ** games) / (1 - self.decay)
+        if self.mode == "window":
+            return min(games, self.window)
+        return games
+
+    def load_legacy_memory(self):
+        """Imports the old ai_memory.json heatmap if it matches this board size."""
+        if not os.path.exists(LEGACY_MEMORY_FILE):
+            return None
+        try:
+            with open(LEGACY_MEMORY_FILE, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not read {LEGACY_MEMORY_FILE} ({e}), ignoring it.")
+            return None
+        if len(data) != self.size or any(len(row) != self.size for row in data):
+            return None
+        cells = [int(value) for row in data for value in row]
+        # the JSON never stored a game count; every game adds at most 1 per cell, so the max is a lower bound
+        return max(cells, default=0), cells
 
     def save_memory(self):
-        """Saves current heatmap to file."""
-        with open(MEMORY_FILE, "w") as f:
-            json.dump(self.memory_grid, f)
+        """Writes the memory to disk right now."""
+        self.store.flush()
+
+    def close(self):
+        """Writes anything pending and stops the background writer (for every opponent profile too)."""
+        for profile in self.profiles.values():
+            profile.close()
+        self.store.close()
 
     def learn_from_game(self, opponent_board):
         """
@@ -33,21 +177,96 @@ class RLBrain:
         Scans the opponent's TRUE board and updates frequency counts.
         """
         # We need to look at the opponent's ships, even the ones we didn't hit!
+        ship_cells = []
         for r in range(self.size):
             for c in range(self.size):
                 # If there is a ship here (hit or unhit)
                 cell = opponent_board.grid.get((r, c))
                 if cell == "ship" or cell == "already_hit":
-                    self.memory_grid[r][c] += 1
-        
-        self.save_memory()
+                    ship_cells.append(r * self.size + c)
+
+        if self.mode == "decay":
+            self.store.decay_and_increment(self.decay, ship_cells)
+        elif self.mode == "window":
+            # the oldest game in the ring makes room for this one
+            slot = self.store.games % self.window
+            for i in self.store.replace_layer(slot, ship_cells):
+                self._window_counts[i] -= 1
+            for i in ship_cells:
+                self._window_counts[i] += 1
+        else:
+            self.store.increment(ship_cells)
+
+        # counted in memory, the background writer saves it when it's due
+        self.store.record_game()
+
+        with self._bias_lock:
+            self._new_version()
+
+    def _new_version(self):
+        # caller holds _bias_lock
+        self.version += 1
+        self._bias = None
+        self._bias_array = None
+        self._bias_fingerprint = None
+        self._seen_games = self.store.games
+
+    def _check_other_processes(self):
+        """Shared memory: a game counter that moved without us learning means another process flushed."""
+        if self._shared and self.store.games != self._seen_games:
+            with self._bias_lock:
+                if self.store.games != self._seen_games:
+                    self._new_version()
+
+    def _cache_bias(self, attr, value, version):
+        """Keeps a bias worked out at `version`, unless a game was learned in the meantime."""
+        with self._bias_lock:
+            if self.version == version:
+                setattr(self, attr, value)
+        return value
+
+    def bias_cells(self):
+        """
+        Bias score of every cell as a flat list (index r * size + c).
+        It's the fraction of past games with a ship there, times BIAS_WEIGHT, so it stays
+        the same size no matter how many games we've learned from and never overpowers the heatmap.
+        """
+        self._check_other_processes()
+        bias = self._bias
+        if bias is None:
+            version = self.version
+            games = self.effective_games()
+            scale = BIAS_WEIGHT / games if games else 0.0
+            bias = self._cache_bias("_bias", [count * scale for count in self.counts()], version)
+        return bias
+
+    def bias_array(self):
+        """bias_cells() as a size x size numpy array (cached the same way)."""
+        self._check_other_processes()
+        bias_array = self._bias_array
+        if bias_array is None:
+            if np is None:
+                raise ImportError("numpy is required for bias_array")
+            version = self.version
+            bias_array = np.array(self.bias_cells(), dtype=float).reshape(self.size, self.size)
+            bias_array = self._cache_bias("_bias_array", bias_array, version)
+        return bias_array
+
+    def bias_fingerprint(self):
+        """
+        A number that only changes when the bias does. Unlike version it's the same in every process
+        and across restarts, so caches saved to disk (ai/opening_book.py) can use it as a key.
+        """
+        self._check_other_processes()
+        fingerprint = self._bias_fingerprint
+        if fingerprint is None:
+            version = self.version
+            fingerprint = self._cache_bias("_bias_fingerprint", hash(tuple(self.bias_cells())), version)
+        return fingerprint
 
     def get_bias_score(self, r, c):
         """
         Returns a small bonus score based on how often ships appear here.
-        We scale it down so it doesn't overpower the main logic.
+        Loops over the whole board should use bias_cells() instead.
         """
-        raw_count = self.memory_grid[r][c]
-        
-        # Scaling factor: Divides by 10 so logic is still #1, but memory breaks ties
-        return raw_count / 10.0
\ No newline at end of file
+        return self.bias_cells()[r * self.size + c]
@@ -0,0 +1,454 @@
+import atexit
+import functools
+import glob
+import itertools
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+
+try:
+    import fcntl
+except ImportError:     # not on Windows
+    fcntl = None
+
+# Binary file for the RL memory grid.
+#   header: magic "RLBM", format version, board size, array typecode, number of games learned from
+#   body:   size * size cells (row by row) as a fixed-width little-endian array,
+#           or several such layers back to back (the sliding-window memory keeps one per game)
+# Writes go to a temp file in the same folder and are renamed over the real one,
+# so a crash mid-write never leaves a half-written memory behind.
+
+MAGIC = b"RLBM"
+VERSION = 1
+HEADER = struct.Struct("<4sHHcxxxQ")     # magic, version, size, typecode, padding, games
+
+
+class MemoryFileError(ValueError):
+    """The memory file exists but can't be used (corrupt, truncated, or for another board size)."""
+
+
+def write_memory(path, size, games, cells):
+    """Atomically writes a memory file. cells is an array.array with size * size values."""
+    data = array(cells.typecode, cells)
+    if sys.byteorder == "big":
+        data.byteswap()     # the file is always little-endian
+
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".rlbm-", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, size, cells.typecode.encode(), games))
+            f.write(data.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_memory(path):
+    """Returns (size, games, cells array). Raises MemoryFileError if the file is damaged."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    if len(raw) < HEADER.size:
+        raise MemoryFileError(f"{path}: file too short for a header")
+
+    magic, version, size, typecode, games = HEADER.unpack_from(raw)
+    if magic != MAGIC:
+        raise MemoryFileError(f"{path}: not an RL memory file")
+    if version != VERSION:
+        raise MemoryFileError(f"{path}: unsupported format version {version}")
+
+    cells = array(typecode.decode())
+    body = raw[HEADER.size:]
+    layer_bytes = size * size * cells.itemsize
+    if not body or len(body) % layer_bytes:
+        raise MemoryFileError(f"{path}: expected a multiple of {size * size} cells, file is truncated or padded")
+    cells.frombytes(body)
+    if sys.byteorder == "big":
+        cells.byteswap()
+    return size, games, cells
+
+
+class MemoryStore:
+    """
+    Keeps the memory grid in RAM and writes it out in the background.
+    A flush happens after every `flush_every` recorded games and/or every `flush_interval` seconds,
+    whichever comes first (None turns that trigger off). close() always writes what's pending,
+    and load() registers it to run at exit, so games recorded with both triggers off still get saved.
+    """
+
+    def __init__(self, path, size, typecode="I", flush_every=1, flush_interval=None, layers=1):
+        self.path = path
+        self.size = size
+        self.layers = layers
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+
+        self.cells = array(typecode, bytes(layers * size * size * array(typecode).itemsize))
+        self.games = 0
+        self.pending = 0            # games recorded since the last flush
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()     # one flush writes at a time, so an older snapshot never lands last
+
+        self._wake = threading.Event()
+        self._stop = False
+        self._writer = None
+        self._exit_hook = None
+
+    # --- loading ---
+
+    def load(self, legacy_loader=None):
+        """
+        Reads the file if it exists. A damaged file is moved aside (path + ".corrupt") with a warning
+        instead of being silently replaced. legacy_loader() can return (games, cells) when there is
+        no binary file yet (e.g. the old ai_memory.json).
+        """
+        _register_exit_hook(self)
+        if os.path.exists(self.path):
+            try:
+                size, games, cells = read_memory(self.path)
+                if size != self.size:
+                    raise MemoryFileError(f"{self.path}: memory is for a {size}x{size} board, not {self.size}x{self.size}")
+                if len(cells) != len(self.cells):
+                    raise MemoryFileError(f"{self.path}: expected {self.layers} layer(s) of cells")
+                if cells.typecode != self.cells.typecode:
+                    cells = array(self.cells.typecode, cells)
+                self.cells, self.games = cells, games
+                return True
+            except (OSError, MemoryFileError, struct.error, ValueError) as e:
+                aside = self.path + ".corrupt"
+                print(f"Warning: could not load AI memory ({e}). Moved it to {aside} and starting fresh.")
+                try:
+                    os.replace(self.path, aside)
+                except OSError:
+                    pass
+
+        if legacy_loader:
+            legacy = legacy_loader()
+            if legacy:
+                games, cells = legacy
+                self.cells = array(self.cells.typecode, cells)
+                self.games = games
+                self.pending += 1       # make sure it gets written in the new format
+                return True
+        return False
+
+    # --- reads / updates ---
+
+    def value(self, i):
+        return self.cells[i]
+
+    def values(self):
+        """Every cell's count, row by row."""
+        return list(self.cells)
+
+    def increment(self, indices, amount=1):
+        """Adds `amount` to each cell index in `indices`."""
+        cells = self.cells
+        with self.lock:
+            for i in indices:
+                cells[i] += amount
+
+    def decay_and_increment(self, factor, indices):
+        """Multiplies every cell by factor, then adds 1 to each index (exponential moving count)."""
+        cells = self.cells
+        with self.lock:
+            for i in range(len(cells)):
+                cells[i] *= factor
+            for i in indices:
+                cells[i] += 1
+
+    def replace_layer(self, layer, indices):
+        """
+        Overwrites one size * size layer with 1 at the given indices and 0 elsewhere.
+        Returns the indices that were set in that layer before.
+        """
+        n = self.size * self.size
+        start = layer * n
+        with self.lock:
+            old = self.cells[start:start + n]
+            previous = [i for i, value in enumerate(old) if value]
+            self.cells[start:start + n] = array(self.cells.typecode, bytes(n * self.cells.itemsize))
+            for i in indices:
+                self.cells[start + i] = 1
+        return previous
+
+    def record_game(self):
+        """Call once per finished game, after its update."""
+        with self.lock:
+            self.games += 1
+            self.pending += 1
+        if self.flush_every and self.pending >= self.flush_every:
+            self._start_writer()
+            self._wake.set()
+        elif self.flush_interval:
+            self._start_writer()
+
+    def flush(self):
+        """Writes everything pending right now, in the calling thread."""
+        with self.write_lock:
+            with self.lock:
+                if not self.pending:
+                    return
+                snapshot = array(self.cells.typecode, self.cells)
+                games = self.games
+                self.pending = 0
+            try:
+                write_memory(self.path, self.size, games, snapshot)
+            except OSError:
+                with self.lock:
+                    self.pending += 1       # try again on the next flush
+                raise
+
+    def close(self):
+        """Stops the background writer and writes whatever is still pending."""
+        _unregister_exit_hook(self)
+        if self._writer is not None:
+            self._stop = True
+            self._wake.set()
+            self._writer.join()
+            self._writer = None
+        self.flush()
+
+    # --- background writer ---
+
+    def _start_writer(self):
+        if self._writer is None:
+            self._stop = False
+            self._writer = threading.Thread(target=self._run_writer, name="rl-memory-writer", daemon=True)
+            self._writer.start()
+
+    def _run_writer(self):
+        while not self._stop:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stop:
+                break
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Warning: could not save AI memory ({e}), will retry.")
+
+
+# --- SHARED (MULTI-PROCESS) STORE ---
+# The main file is memory-mapped and read in place. Each process counts into its own shard file
+# (path + ".shard-<pid>.<n>", n counting the stores this process opened on any file, same format), so nobody ever writes the same bytes at the same time.
+# A flush adds the shard into the main file under an exclusive lock (path + ".lock") and zeroes the shard.
+# Shards left behind by a process that died are merged by the next process that opens the memory.
+# Unlike write_memory, that add happens in place (every process has the main file mapped, a renamed-over
+# file would leave them reading the old one), so it is not crash-safe: a process killed in the middle of a
+# merge leaves part of its counts added and the whole shard still there to be merged again.
+
+GAMES_OFFSET = HEADER.size - 8      # where the game count lives in the header
+
+_OPEN_SHARDS = set()                # shard files (absolute paths) opened by stores in this process
+_SHARD_NUMBERS = itertools.count()  # two stores on one file in one process get a shard each
+
+
+class SharedMemoryStore:
+    """Same interface as MemoryStore, backed by memory-mapped counters that many processes can share."""
+
+    def __init__(self, path, size, flush_every=1, flush_interval=None):
+        if fcntl is None:
+            raise OSError("shared RL memory needs fcntl file locks (Linux / macOS)")
+        if sys.byteorder == "big":
+            raise OSError("shared RL memory maps the little-endian file directly")
+        self.path = path
+        self.size = size
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.shard_path = f"{path}.shard-{os.getpid()}.{next(_SHARD_NUMBERS)}"
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.last_flush = time.monotonic()
+        self.base = None
+        self.shard = None
+        self._exit_hook = None
+
+    # --- opening ---
+
+    def load(self, legacy_loader=None):
+        with self._file_lock():
+            if os.path.exists(self.path):
+                try:
+                    size, _, cells = read_memory(self.path)
+                    if size != self.size or cells.typecode != "I" or len(cells) != size * size:
+                        raise MemoryFileError(f"{self.path}: not a {self.size}x{self.size} count grid")
+                except (OSError, MemoryFileError, struct.error, ValueError) as e:
+                    aside = self.path + ".corrupt"
+                    print(f"Warning: could not load AI memory ({e}). Moved it to {aside} and starting fresh.")
+                    os.replace(self.path, aside)
+
+            if not os.path.exists(self.path):
+                games, cells = 0, array("I", bytes(self.size * self.size * 4))
+                legacy = legacy_loader() if legacy_loader else None
+                if legacy:
+                    games, cells = legacy[0], array("I", legacy[1])
+                write_memory(self.path, self.size, games, cells)
+
+            self._base_map, self.base = self._map(self.path)
+            self._merge_dead_shards()
+
+            write_memory(self.shard_path, self.size, 0, array("I", bytes(self.size * self.size * 4)))
+            self._shard_map, self.shard = self._map(self.shard_path)
+            _OPEN_SHARDS.add(os.path.abspath(self.shard_path))
+        _register_exit_hook(self)
+        return True
+
+    def _map(self, path):
+        with open(path, "r+b") as f:
+            mapped = mmap.mmap(f.fileno(), 0)
+        return mapped, memoryview(mapped)[HEADER.size:].cast("I")
+
+    def _file_lock(self):
+        return _FileLock(self.path + ".lock")
+
+    # --- reads / updates ---
+
+    @property
+    def games(self):
+        return self._games(self._base_map) + self._games(self._shard_map)
+
+    def _games(self, mapped):
+        return struct.unpack_from("<Q", mapped, GAMES_OFFSET)[0]
+
+    def value(self, i):
+        return self.base[i] + self.shard[i]
+
+    def values(self):
+        base, shard = self.base, self.shard
+        return [base[i] + shard[i] for i in range(len(base))]
+
+    def increment(self, indices, amount=1):
+        shard = self.shard
+        with self.lock:
+            for i in indices:
+                shard[i] += amount
+
+    def record_game(self):
+        with self.lock:
+            struct.pack_into("<Q", self._shard_map, GAMES_OFFSET, self._games(self._shard_map) + 1)
+            self.pending += 1
+        due_by_count = self.flush_every and self.pending >= self.flush_every
+        due_by_time = self.flush_interval and time.monotonic() - self.last_flush >= self.flush_interval
+        if due_by_count or due_by_time:
+            self.flush()
+
+    # --- merging ---
+
+    def flush(self):
+        """Adds this process's shard into the main file and clears the shard."""
+        if self.shard is None:
+            return
+        with self.lock, self._file_lock():
+            self._add_into_base(self.shard, self._games(self._shard_map))
+            for i in range(len(self.shard)):
+                self.shard[i] = 0
+            struct.pack_into("<Q", self._shard_map, GAMES_OFFSET, 0)
+            self._shard_map.flush()
+            self.pending = 0
+            self.last_flush = time.monotonic()
+
+    def _add_into_base(self, counts, games):
+        base = self.base
+        for i in range(len(base)):
+            if counts[i]:
+                base[i] += counts[i]
+        struct.pack_into("<Q", self._base_map, GAMES_OFFSET, self._games(self._base_map) + games)
+        self._base_map.flush()
+
+    def _merge_dead_shards(self):
+        """
+        Folds in shards of processes that exited without flushing (caller holds the file lock).
+        That includes a shard with our own pid that nothing in this process has open: its process died
+        and the pid got reused by us. Older shards are named path + ".shard-<pid>", without the number.
+        """
+        for shard_path in glob.glob(glob.escape(self.path) + ".shard-*"):
+            pid = shard_path.rsplit(".shard-", 1)[-1].split(".")[0]
+            if not pid.isdigit():
+                continue
+            if int(pid) == os.getpid():
+                if os.path.abspath(shard_path) in _OPEN_SHARDS:
+                    continue
+            elif _pid_alive(int(pid)):
+                continue
+            try:
+                size, games, cells = read_memory(shard_path)
+                if size == self.size and cells.typecode == "I" and len(cells) == size * size:
+                    self._add_into_base(cells, games)
+            except (OSError, MemoryFileError, struct.error, ValueError) as e:
+                print(f"Warning: skipping unreadable memory shard {shard_path} ({e}).")
+            os.remove(shard_path)
+
+    def close(self):
+        """Merges what's left and removes this process's shard."""
+        _unregister_exit_hook(self)
+        if self.shard is None:
+            return
+        self.flush()
+        self.shard.release()
+        self._shard_map.close()
+        self.shard = None
+        _OPEN_SHARDS.discard(os.path.abspath(self.shard_path))
+        try:
+            os.remove(self.shard_path)
+        except OSError:
+            pass
+
+
+# --- closing at exit ---
+# Each store registers one exit hook (however often load() runs) and takes it back in close(),
+# so atexit doesn't keep closed stores alive.
+
+def _register_exit_hook(store):
+    if store._exit_hook is None:
+        store._exit_hook = functools.partial(_close_at_exit, store)
+        atexit.register(store._exit_hook)
+
+
+def _unregister_exit_hook(store):
+    if store._exit_hook is not None:
+        atexit.unregister(store._exit_hook)        # matches this store's own partial only
+        store._exit_hook = None
+
+
+def _close_at_exit(store):
+    # a store in a directory that's gone by now (a temp dir, a test's tmp_path) has nowhere to write
+    if os.path.isdir(os.path.dirname(os.path.abspath(store.path))):
+        store.close()
+
+
+class _FileLock:
+    """Exclusive flock on a small side file, used as a context manager."""
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,139 @@
+import atexit
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+from Game.board import Board
+from Game.ship import Ship
+from ai.heuristics import get_best_hunt_move, get_probability_grid, np, observed_bits
+
+# Opening book.
+#   Until the first hit, the heatmap only depends on the board size, the fleet, the RL bias
+#   and which cells were missed, so every game that opens the same way asks for the same grid.
+#   The book keeps (grid, move) for those positions so the heatmap is only worked out once:
+#       key = (size, ship lengths, RL bias fingerprint, missed cells as a bitmask)
+#   Least recently used positions get dropped once the book is full. It can be saved to a JSON file.
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_DEPTH = 20          # misses in a row precompute() follows from the empty board
+
+_books = {}                 # path (or None) -> OpeningBook shared by every bot in this process
+
+
+class OpeningBook:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict()    # key -> (grid, move), most recently used last
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def position_key(board, remaining_ships, rl_brain=None):
+        """Book key for this position, or None if it's out of the book (something was hit)."""
+        hit_bits, miss_bits, _ = observed_bits(board)
+        if hit_bits:
+            return None
+        fleet = tuple(sorted(len(ship.coord) for ship in remaining_ships))
+        bias = rl_brain.bias_fingerprint() if rl_brain else None
+        return (board.size, fleet, bias, miss_bits)
+
+    def get(self, key):
+        """(grid, move) for a position, or None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, grid, move):
+        if isinstance(grid, list):
+            grid = [list(row) for row in grid]      # the heatmap may live in a scratch buffer that gets reused
+        self.entries[key] = (grid, move)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def precompute(self, size, ship_configs, depth=DEFAULT_DEPTH, rl_brain=None, heatmap=get_probability_grid):
+        """
+        Fills in the all-miss opening line: best move on the empty board, then the best move
+        if that one missed, and so on for `depth` moves. Returns the moves.
+        """
+        board = Board(size)     # no ships on it, so every shot is a miss
+        # the heatmaps only look at ship lengths, so each ship is a real one along row 0 that never goes on the board
+        fleet = [Ship(name, [(0, c) for c in range(length)]) for name, length in ship_configs]
+        line = []
+        for _ in range(min(depth, size * size)):
+            key = self.position_key(board, fleet, rl_brain)
+            entry = self.entries.get(key)
+            if entry is None:
+                grid = heatmap(board, fleet, rl_brain)
+                entry = (grid, get_best_hunt_move(board, grid))
+                self.put(key, *entry)
+            move = entry[1]
+            if move is None:
+                break
+            line.append(move)
+            board.receive_shot(move)
+        return line
+
+    # --- on disk ---
+
+    def save(self, path=None):
+        """Writes the book to a JSON file (atomically, like the RL memory)."""
+        path = path or self.path
+        rows = []
+        for (size, fleet, bias, miss_bits), (grid, move) in self.entries.items():
+            if np is not None and isinstance(grid, np.ndarray):
+                grid = grid.tolist()
+            rows.append([size, list(fleet), bias, miss_bits, list(move) if move else None, grid])
+
+        folder = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".book-", dir=folder)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(rows, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load(self, path=None):
+        """Adds the positions saved in a JSON file. A missing or broken file just leaves the book as it is."""
+        path = path or self.path
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "r") as f:
+                rows = json.load(f)
+            for size, fleet, bias, miss_bits, move, grid in rows:
+                self.put((size, tuple(fleet), bias, miss_bits), grid, tuple(move) if move else None)
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Warning: could not read opening book {path} ({e}), ignoring it.")
+            return False
+        return True
+
+
+def get_book(spec=True):
+    """
+    The shared book SearchAI(opening_book=...) uses: True (or 1) for one in memory,
+    a file name for one that is loaded from and saved back to that file when the program exits.
+    """
+    if isinstance(spec, OpeningBook):
+        return spec
+    path = spec if isinstance(spec, str) else None
+    if path not in _books:
+        book = OpeningBook(path=path)
+        if path:
+            book.load()
+            atexit.register(book.save)
+        _books[path] = book
+    return _books[path]
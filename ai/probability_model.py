@@ -0,0 +1,181 @@
+import math
+import random
+import time
+
+from Game.placements import get_placements
+from ai.heuristics import get_probability_grid, observed_bits
+
+# Monte Carlo version of the heatmap.
+#   get_probability_grid scores every ship on its own, so it happily counts two ships on top of each other.
+#   Here we draw whole fleets instead: every remaining ship placed at once, no overlap, no touching,
+#   nothing on a miss or near a sunk ship, and every hit that isn't sunk yet covered by some ship.
+#   How often a cell is covered across the accepted fleets is its probability of holding a ship.
+#
+#   Drawing fleets blindly and throwing away the ones that miss the open hits almost never succeeds
+#   once a few hits are on the board, so each open hit gets a ship placed on it first ("anchored"),
+#   then the other ships go anywhere legal. Every step picks uniformly among k legal options, so the
+#   fleet is weighted by the product of those k's, which makes the weighted counts come out as if
+#   every way of drawing a consistent layout were equally likely.
+#   The anchored ships are fixed by the layout (the ship on the first uncovered hit, and so on), but two
+#   free ships of the same length can be drawn in either order, so a layout with m free ships of one
+#   length is reachable m! ways. The weight is divided by those m!'s, or layouts with more free
+#   same-length ships would count extra.
+
+DEFAULT_SAMPLES = 2000          # accepted fleets per move
+DEFAULT_TIME_BUDGET_MS = 50     # stop earlier than that if the move is taking too long
+RL_TIE_BREAK = 1e-6             # RL memory only breaks ties between equal frequencies
+MAX_ATTEMPTS_PER_SAMPLE = 500   # without a time budget, give up after this many rejections per wanted sample
+
+
+class PosteriorSampler:
+    """
+    Draws complete fleet layouts consistent with what has been observed on the board.
+    Call draw() as often as you like (it keeps adding to the same counts), then occupancy().
+    """
+
+    def __init__(self, board, remaining_ships, rng=None, keep_layouts=False):
+        self.board = board
+        self.size = board.size
+        self.rng = rng or random
+
+        hit_bits, miss_bits, forbidden = observed_bits(board)
+        self.forbidden = forbidden                      # misses + sunk ships + their buffer
+        self.open_hits = hit_bits & ~forbidden          # hits on ships that are still afloat
+        self.shot_bits = hit_bits | miss_bits
+
+        # long ships first, they are the hardest to fit
+        self.lengths = sorted((len(ship.coord) for ship in remaining_ships), reverse=True)
+        self.candidates = {}                            # length -> (mask, buffer) of placements clear of anything forbidden
+        self.covering = {}                              # (length, hit cell) -> the candidates that cover that hit
+        for length in set(self.lengths):
+            # a ship that isn't sunk can't sit on hits only, it would have sunk
+            self.candidates[length] = [(p.mask, p.buffer) for p in get_placements(self.size, length)
+                                       if not (p.mask & forbidden) and p.mask & ~self.open_hits]
+            hits = self.open_hits
+            while hits:
+                low = hits & -hits
+                self.covering[(length, low)] = [(mask, buffer) for mask, buffer in self.candidates[length] if mask & low]
+                hits ^= low
+
+        self.counts = [0.0] * (self.size * self.size)     # weighted number of layouts covering each cell
+        self.total_weight = 0.0
+        self.samples = 0        # accepted layouts
+        self.attempts = 0       # layouts tried (accepted + rejected)
+        self.elapsed = 0.0      # seconds spent in draw()
+        self.layouts = [] if keep_layouts else None     # accepted (mask of ship cells, weight), for ai/information.py
+
+    def _try_layout(self):
+        """
+        One random fleet. Returns (mask of occupied cells, weight), or None if it ran into a dead end.
+        """
+        rng = self.rng
+        blocked = 0
+        occupied = 0
+        weight = 1.0
+        unplaced = list(self.lengths)
+
+        # 1. anchor a ship on every open hit that isn't covered yet
+        uncovered = self.open_hits
+        while uncovered:
+            hit = uncovered & -uncovered
+            options = []
+            for length in set(unplaced):
+                options.extend((length, mask, buffer) for mask, buffer in self.covering[(length, hit)]
+                               if not (mask & blocked))
+            if not options:
+                return None
+
+            length, mask, buffer = options[rng.randrange(len(options))]
+            weight *= len(options)
+            unplaced.remove(length)
+            blocked |= buffer
+            occupied |= mask
+            uncovered &= ~occupied
+
+        # 2. the rest of the fleet goes anywhere legal (can't touch the anchored ships, so no new hits get covered)
+        for length in set(unplaced):
+            weight /= math.factorial(unplaced.count(length))
+        for length in unplaced:
+            legal = [(mask, buffer) for mask, buffer in self.candidates[length] if not (mask & blocked)]
+            if not legal:
+                return None
+            mask, buffer = legal[rng.randrange(len(legal))]
+            weight *= len(legal)
+            blocked |= buffer
+            occupied |= mask
+
+        return occupied, weight
+
+    def draw(self, max_samples=DEFAULT_SAMPLES, time_budget_ms=DEFAULT_TIME_BUDGET_MS):
+        """
+        Keeps sampling until max_samples more layouts are accepted or the time budget runs out
+        (either one can be None). Returns how many layouts were accepted in this call.
+        """
+        start = time.perf_counter()
+        if max_samples is None and time_budget_ms is None:
+            max_samples = DEFAULT_SAMPLES       # no budget at all, don't spin forever
+        deadline = None if time_budget_ms is None else start + time_budget_ms / 1000.0
+        # if the observations can't be explained at all, every layout gets rejected, so cap the attempts
+        max_attempts = None if deadline is not None else max_samples * MAX_ATTEMPTS_PER_SAMPLE
+        accepted = 0
+        attempts = 0
+        counts = self.counts
+
+        while max_samples is None or accepted < max_samples:
+            # one layout costs far more than reading the clock, so check it every time (keeps the tail latency tight)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if max_attempts is not None and attempts >= max_attempts:
+                break
+
+            attempts += 1
+            self.attempts += 1
+            layout = self._try_layout()
+            if layout is None:
+                continue
+
+            occupied, weight = layout
+            accepted += 1
+            self.total_weight += weight
+            if self.layouts is not None:
+                self.layouts.append(layout)
+            while occupied:
+                low = occupied & -occupied
+                counts[low.bit_length() - 1] += weight
+                occupied ^= low
+
+        self.samples += accepted
+        self.elapsed += time.perf_counter() - start
+        return accepted
+
+    def occupancy(self, rl_brain=None):
+        """Per-cell (weighted) frequency, 0..1, of holding a ship across the accepted layouts, as a list of lists."""
+        size = self.size
+        total = self.total_weight or 1.0
+        bias = rl_brain.bias_cells() if rl_brain else None
+        grid = []
+        for r in range(size):
+            row = []
+            for c in range(size):
+                score = self.counts[r * size + c] / total
+                if bias and not (self.shot_bits >> (r * size + c)) & 1:
+                    score += bias[r * size + c] * RL_TIE_BREAK
+                row.append(score)
+            grid.append(row)
+        return grid
+
+    def samples_per_second(self):
+        return self.samples / self.elapsed if self.elapsed else 0.0
+
+
+def get_sampled_probability_grid(board, remaining_ships, rl_brain=None, samples=DEFAULT_SAMPLES,
+                                 time_budget_ms=DEFAULT_TIME_BUDGET_MS, rng=None):
+    """
+    Drop-in replacement for get_probability_grid (works with get_best_hunt_move).
+    Falls back to the counting heatmap if no consistent layout was found within the budget.
+    """
+    sampler = PosteriorSampler(board, remaining_ships, rng)
+    sampler.draw(samples, time_budget_ms)
+    if sampler.samples == 0:
+        return get_probability_grid(board, remaining_ships, rl_brain)
+    return sampler.occupancy(rl_brain)
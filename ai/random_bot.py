@@ -0,0 +1,16 @@
+import random
+
+class RandomAI:
+    """Baseline bot for simulation.py: fires at a random cell it hasn't tried yet."""
+
+    def __init__(self, board_size):
+        self.size = board_size
+
+    def get_next_move(self, opponent_board, rl_brain=None):
+        possible = [(r, c) for r in range(opponent_board.size)
+                    for c in range(opponent_board.size)
+                    if (r, c) not in opponent_board.shots_taken]
+        return random.choice(possible) if possible else None
+
+    def update_result(self, move, result, opponent_board):
+        pass        # random guessing doesn't learn anything from results
@@ -0,0 +1,82 @@
+from collections import OrderedDict
+
+from Game.zobrist import symmetries
+from ai.heuristics import add_rl_bias, np, observed_bits
+
+# Transposition cache for heatmaps.
+#   Lots of games (especially on 5x5) run into the same misses / hits / sunk ships, often rotated or mirrored.
+#   Boards keep a Zobrist hash of what was shot (Game/zobrist.py), so the position is looked up
+#   by its canonical hash + the ship lengths still afloat, and the heatmap is stored in the canonical
+#   orientation. A hit on a rotated position just reads the stored grid through the same rotation.
+#   The RL bias isn't symmetric, so the table stores the grid without it and adds it on the way out.
+
+DEFAULT_MAX_ENTRIES = 100000
+
+_tables = {}        # one shared table per process for SearchAI(transposition=True)
+
+
+class TranspositionTable:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()    # (size, canonical hash, ship lengths) -> flat grid, most recently used last
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.last_was_hit = False
+
+    def grid(self, board, remaining_ships, rl_brain, compute):
+        """
+        The heatmap for this board as a list of lists, like get_probability_grid.
+        compute() must return that heatmap without RL bias; it's only called on a cache miss.
+        """
+        size = board.size
+        canonical_hash, symmetry = board.zobrist.canonical()
+        perm = symmetries(size)[symmetry]
+        key = (size, canonical_hash, tuple(sorted(len(ship.coord) for ship in remaining_ships)))
+
+        stored = self.entries.get(key)
+        if stored is None:
+            self.misses += 1
+            self.last_was_hit = False
+            grid = compute()
+            if np is not None and isinstance(grid, np.ndarray):
+                flat = grid.ravel().tolist()
+            else:
+                flat = [score for row in grid for score in row]
+            # cell idx of this board is cell perm[idx] of the canonical one
+            stored = [0] * (size * size)
+            for idx, score in enumerate(flat):
+                stored[perm[idx]] = score
+            self.entries[key] = stored
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.hits += 1
+            self.last_was_hit = True
+            self.entries.move_to_end(key)
+            flat = list(map(stored.__getitem__, perm))
+
+        if rl_brain:
+            hit_bits, miss_bits, _ = observed_bits(board)
+            flat = add_rl_bias(flat, hit_bits | miss_bits, rl_brain)
+        return [flat[r * size:(r + 1) * size] for r in range(size)]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.entries),
+            "evictions": self.evictions,
+        }
+
+
+def get_table(spec=True):
+    """The table SearchAI(transposition=...) uses: True (or 1) for the shared one, or a TranspositionTable."""
+    if isinstance(spec, TranspositionTable):
+        return spec
+    if None not in _tables:
+        _tables[None] = TranspositionTable()
+    return _tables[None]
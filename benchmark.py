@@ -0,0 +1,451 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from Game.board import Board
+from Game.bitboard import BitBoard
+from Game.placements import generate_layouts
+from ai.opening_book import OpeningBook
+from ai.heuristics import (HeatmapScratch, get_best_hunt_move, get_probability_grid, get_probability_grid_into,
+                           get_probability_grid_numpy, np)
+from ai.probability_model import PosteriorSampler
+from ai.search import SearchAI
+from ai.transposition import TranspositionTable
+
+# Benchmarks for the board / AI hot paths.
+#   python benchmark.py                          -> run everything, print a table
+#   python benchmark.py --json out.json          -> also save the results
+#   python benchmark.py --compare old.json new.json --threshold 0.10
+#                                                -> list everything that got more than 10% slower (exit code 1 if any)
+#   python benchmark.py --memory                 -> bytes allocated per heatmap call (tracemalloc), fresh vs scratch
+#   python benchmark.py --gui 600                -> ms per frame of the pygame GUI over 600 scripted frames,
+#                                                   old full redraw vs gui_render.Renderer (headless, SDL dummy driver)
+# Every result is stored as ops/sec under a name like "receive_shot/bit/10x10/standard".
+
+FLEETS = {
+    "small": [("Submarine", 3), ("Destroyer", 2)],
+    "standard": [("Carrier", 5), ("Battleship", 4), ("Cruiser", 3), ("Submarine", 3), ("Destroyer", 2)],
+    "large": [("Carrier", 5), ("Battleship", 4), ("Battleship 2", 4), ("Cruiser", 3), ("Cruiser 2", 3),
+              ("Submarine", 3), ("Submarine 2", 3), ("Destroyer", 2), ("Destroyer 2", 2), ("Destroyer 3", 2)],
+}
+SIZES = [5, 10, 20, 50]
+
+# Keep the old names around for anything that imported them
+FLEET_SMALL = FLEETS["small"]
+FLEET_STANDARD = FLEETS["standard"]
+
+
+def fleets_for(size):
+    """Fleets that make sense on this board size."""
+    if size <= 5:
+        return ["small"]
+    if size < 20:
+        return ["small", "standard"]
+    return ["standard", "large"]
+
+
+def measure(fn, seconds=1.0):
+    """Calls fn() until `seconds` have passed. Returns (calls, elapsed)."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return calls, elapsed
+
+
+def new_board(size, fleet, seed=0, board_cls=Board):
+    state = random.getstate()
+    random.seed(seed)
+    board = board_cls(size)
+    board.place_ships_randomly(fleet)
+    random.setstate(state)
+    return board
+
+
+def midgame_board(size, fleet, shots, seed=0, board_cls=Board):
+    """A board with `shots` random shots already fired at it, for benchmarks that need some observations."""
+    board = new_board(size, fleet, seed, board_cls)
+    cells = [(r, c) for r in range(size) for c in range(size)]
+    random.Random(seed).shuffle(cells)
+    for coord in cells[:shots]:
+        board.receive_shot(coord)
+    return board
+
+
+# --- INDIVIDUAL BENCHMARKS (each returns ops/sec) ---
+
+def bench_receive_shot(size, fleet, board_cls, seconds):
+    """Shots per second: fires at every cell of a fresh board, over and over."""
+    cells = [(r, c) for r in range(size) for c in range(size)]
+    shots = 0
+    elapsed = 0.0
+    seed = 0
+    while elapsed < seconds:
+        board = new_board(size, fleet, seed, board_cls)
+        seed += 1
+        start = time.perf_counter()
+        for coord in cells:
+            board.receive_shot(coord)
+        elapsed += time.perf_counter() - start
+        shots += len(cells)
+    return shots / elapsed
+
+
+def bench_place_ships(size, fleet, board_cls, seconds):
+    """Boards per second through place_ships_randomly."""
+    calls, elapsed = measure(lambda: board_cls(size).place_ships_randomly(fleet), seconds)
+    return calls / elapsed
+
+
+def bench_placement(size, fleet, seconds=1.0):
+    """Full fleet layouts per second from Game.placements.generate_layouts."""
+    layouts = generate_layouts(size, fleet, seed=0)
+    calls, elapsed = measure(lambda: next(layouts), seconds)
+    return calls / elapsed
+
+
+def bench_heatmap(size, fleet, backend, seconds):
+    """Heatmaps per second on a board with a quarter of the cells shot."""
+    board = midgame_board(size, fleet, size * size // 4)
+    remaining = [ship for ship in board.ships if not ship.is_sunk()]
+    if backend == "scratch":
+        scratch = HeatmapScratch(size)
+        calls, elapsed = measure(lambda: get_probability_grid_into(board, remaining, scratch), seconds)
+        return calls / elapsed
+    fn = get_probability_grid_numpy if backend == "numpy" else get_probability_grid
+    calls, elapsed = measure(lambda: fn(board, remaining), seconds)
+    return calls / elapsed
+
+
+def heatmap_allocations(size, fleet, calls=200):
+    """
+    tracemalloc numbers for the python heatmap with a fresh grid every call vs a reused HeatmapScratch.
+    Returns {variant: peak bytes per call}, i.e. what one heatmap allocates on top of what's already there
+    (the scratch itself is made before tracing starts, so it isn't counted).
+    """
+    board = midgame_board(size, fleet, size * size // 4, board_cls=BitBoard)
+    remaining = [ship for ship in board.ships if not ship.is_sunk()]
+    scratch = HeatmapScratch(size)
+    variants = {
+        "fresh": lambda: get_probability_grid(board, remaining),
+        "scratch": lambda: get_probability_grid_into(board, remaining, scratch),
+    }
+    report = {}
+    for name, fn in variants.items():
+        fn()        # warm caches (placement tables) outside the measurement
+        tracemalloc.start()
+        start_bytes, _ = tracemalloc.get_traced_memory()
+        peak = 0
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            fn()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - start_bytes)
+        tracemalloc.stop()
+        report[name] = peak
+    return report
+
+
+def bench_best_move(size, fleet, seconds):
+    """get_best_hunt_move calls per second on a precomputed heatmap."""
+    board = midgame_board(size, fleet, size * size // 4)
+    grid = get_probability_grid(board, [ship for ship in board.ships if not ship.is_sunk()])
+    calls, elapsed = measure(lambda: get_best_hunt_move(board, grid), seconds)
+    return calls / elapsed
+
+
+def bench_search_move(size, fleet, heatmap, seconds):
+    """SearchAI get_next_move + update_result pairs per second, playing games start to finish."""
+    moves = 0
+    elapsed = 0.0
+    seed = 0
+    while elapsed < seconds:
+        board = new_board(size, fleet, seed, BitBoard)
+        seed += 1
+        bot = SearchAI(size, heatmap=heatmap)
+        start = time.perf_counter()
+        while not board.all_ships_sunk() and elapsed + time.perf_counter() - start < seconds:
+            move = bot.get_next_move(board)
+            bot.update_result(move, board.receive_shot(move), board)
+            moves += 1
+        elapsed += time.perf_counter() - start
+    return moves / elapsed
+
+
+def bench_full_game(size, fleet, heatmap, seconds, **bot_kwargs):
+    """Complete games per second: placement + SearchAI until every ship is sunk."""
+    games = 0
+    start = time.perf_counter()
+    while True:
+        board = new_board(size, fleet, games, BitBoard)
+        bot = SearchAI(size, heatmap=heatmap, **bot_kwargs)
+        while not board.all_ships_sunk():
+            move = bot.get_next_move(board)
+            bot.update_result(move, board.receive_shot(move), board)
+        games += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return games / elapsed
+
+
+def bench_sampler(size, fleet, shots=0, seconds=1.0):
+    """Accepted Monte Carlo layouts per second (ai/probability_model.py) after `shots` random shots."""
+    board = midgame_board(size, fleet, shots)
+    remaining = [ship for ship in board.ships if not ship.is_sunk()]
+    sampler = PosteriorSampler(board, remaining, random.Random(0))
+    sampler.draw(max_samples=None, time_budget_ms=seconds * 1000)
+    return sampler.samples_per_second(), sampler.samples / max(sampler.attempts, 1)
+
+
+def bench_gui(frames=600, seed=0):
+    """
+    ms per frame for the GUI drawing, old (clear + draw_board for both boards + flip every frame) vs the
+    dirty-rect Renderer, without and with the heatmap overlay. Same scripted session for both: the ghost ship follows the mouse to a new cell every
+    4th frame, one shot every 10th frame. Runs on the SDL dummy driver, so no window is needed.
+    Returns {variant: ms per frame}.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    import gui_main
+    from Game.gamestate import GameState
+    from gui_render import (BG_COLOR, COLOR_HIT, COLOR_MISS, COLOR_SHIP, COLOR_VALID, COLOR_WATER, MARGIN,
+                            TEXT_COLOR, TILE_SIZE)
+
+    fleet = FLEETS["standard"]
+    screen = gui_main.SCREEN
+    player_x, ai_x, board_y = 50, 600, 120
+
+    def script():
+        """Yields (hover cell or None, (board name, shot) or None) per frame."""
+        rng = random.Random(seed)
+        cells = [(r, c) for r in range(10) for c in range(10)]
+        shots = {"player": rng.sample(cells, len(cells)), "ai": rng.sample(cells, len(cells))}
+        hover = None
+        for frame in range(frames):
+            if frame % 4 == 0:
+                hover = rng.choice(cells) if frame < frames // 2 else None
+            shot = None
+            if frame % 10 == 9:
+                side = "ai" if frame % 20 == 9 else "player"
+                if shots[side]:
+                    shot = (side, shots[side].pop())
+            yield hover, shot
+
+    def new_game():
+        gs = GameState(10)
+        gs.player_board.place_ships_randomly(fleet)
+        gs.ai_board.place_ships_randomly(fleet)
+        return gs
+
+    def draw_board(surface, board, offset_x, offset_y, title, reveal_ships=False):
+        """The draw-everything board gui_main.py used before gui_render.Renderer, kept here to compare against."""
+        title_surf = gui_main.BIG_FONT.render(title, True, TEXT_COLOR)
+        surface.blit(title_surf, (offset_x, offset_y - 50))
+
+        for r in range(board.size):
+            for c in range(board.size):
+                x = offset_x + (TILE_SIZE + MARGIN) * c
+                y = offset_y + (TILE_SIZE + MARGIN) * r
+                color = COLOR_WATER
+                cell_status = board.grid.get((r, c))
+                if cell_status == "ship":
+                    color = COLOR_SHIP if reveal_ships else COLOR_WATER
+                elif cell_status == "already_hit":
+                    color = COLOR_HIT
+                elif cell_status == "miss":
+                    color = COLOR_MISS
+                pygame.draw.rect(surface, color, (x, y, TILE_SIZE, TILE_SIZE))
+                if cell_status == "already_hit":
+                    pygame.draw.line(surface, (0, 0, 0), (x + 5, y + 5), (x + TILE_SIZE - 5, y + TILE_SIZE - 5), 3)
+                    pygame.draw.line(surface, (0, 0, 0), (x + TILE_SIZE - 5, y + 5), (x + 5, y + TILE_SIZE - 5), 3)
+
+        # sunk ships in green
+        for ship in board.ships:
+            if ship.is_sunk():
+                for (r, c) in ship.coord:
+                    x = offset_x + (TILE_SIZE + MARGIN) * c
+                    y = offset_y + (TILE_SIZE + MARGIN) * r
+                    pygame.draw.rect(surface, (50, 205, 50), (x, y, TILE_SIZE, TILE_SIZE))
+                    pygame.draw.rect(surface, (255, 255, 255), (x, y, TILE_SIZE, TILE_SIZE), 2)
+
+    def old_frame(gs, hover, message):
+        screen.fill(BG_COLOR)
+        msg_surf = gui_main.BIG_FONT.render(message, True, TEXT_COLOR)
+        screen.blit(msg_surf, msg_surf.get_rect(center=(gui_main.WINDOW_WIDTH // 2, 50)))
+        draw_board(screen, gs.player_board, player_x, board_y, "Your Fleet", reveal_ships=True)
+        draw_board(screen, gs.ai_board, ai_x, board_y, "Enemy Waters")
+        if hover:
+            for (r, c) in [(hover[0], hover[1] + i) for i in range(5)]:
+                if c < 10:
+                    s = pygame.Surface((TILE_SIZE, TILE_SIZE))
+                    s.set_alpha(128)
+                    s.fill(COLOR_VALID)
+                    screen.blit(s, (player_x + 42 * c, board_y + 42 * r))
+        pygame.display.flip()
+
+    report = {}
+
+    random.seed(seed)
+    gs = new_game()
+    start = time.perf_counter()
+    for hover, shot in script():
+        message = "Combat"
+        if shot:
+            board = gs.ai_board if shot[0] == "ai" else gs.player_board
+            message = board.receive_shot(shot[1])
+        old_frame(gs, hover, message)
+    report["full_redraw"] = 1000 * (time.perf_counter() - start) / frames
+
+    def dirty_frames(heatmap):
+        random.seed(seed)
+        gs = new_game()
+        renderer = gui_main.Renderer(screen, gui_main.FONT, gui_main.BIG_FONT)
+        views = {"player": renderer.add_board(gs.player_board, player_x, board_y, "Your Fleet", reveal_ships=True),
+                 "ai": renderer.add_board(gs.ai_board, ai_x, board_y, "Enemy Waters")}
+        grid = gui_main.ai_heatmap(gs.player_board, None) if heatmap else None
+        computing = 0.0         # the GUI does this on its worker thread, so it's not counted as frame time
+        start = time.perf_counter()
+        for hover, shot in script():
+            message = "Combat"
+            if shot:
+                view = views[shot[0]]
+                message = view.board.receive_shot(shot[1])
+                view.mark_shot(shot[1], message)
+                if heatmap and shot[0] == "player":
+                    t = time.perf_counter()
+                    grid = gui_main.ai_heatmap(gs.player_board, None)
+                    computing += time.perf_counter() - t
+            views["player"].set_ghost([(hover[0], hover[1] + i) for i in range(5)] if hover else [], COLOR_VALID)
+            views["player"].set_heat(grid)
+            renderer.set_message(message, TEXT_COLOR)
+            renderer.draw()
+        return 1000 * (time.perf_counter() - start - computing) / frames
+
+    report["dirty_rects"] = dirty_frames(False)
+    # heatmap overlay on the player board, recomputed after every shot on it
+    report["dirty_rects+heatmap"] = dirty_frames(True)
+    return report
+
+
+# --- SUITE ---
+
+def benchmark_cases(sizes):
+    """Yields (name, fn) for every benchmark; fn() returns ops/sec."""
+    heatmaps = ["python", "numpy"] if np is not None else ["python"]
+    for size in sizes:
+        for fleet_name in fleets_for(size):
+            fleet = FLEETS[fleet_name]
+            tag = f"{size}x{size}/{fleet_name}"
+            for engine, board_cls in (("dict", Board), ("bit", BitBoard)):
+                yield f"receive_shot/{engine}/{tag}", lambda s, f=fleet, b=board_cls, n=size: bench_receive_shot(n, f, b, s)
+                yield f"place_ships/{engine}/{tag}", lambda s, f=fleet, b=board_cls, n=size: bench_place_ships(n, f, b, s)
+            yield f"layouts/{tag}", lambda s, f=fleet, n=size: bench_placement(n, f, s)
+            for heatmap in heatmaps + ["scratch"]:
+                yield f"heatmap/{heatmap}/{tag}", lambda s, f=fleet, h=heatmap, n=size: bench_heatmap(n, f, h, s)
+            yield f"best_move/{tag}", lambda s, f=fleet, n=size: bench_best_move(n, f, s)
+            yield f"sampler/{tag}", lambda s, f=fleet, n=size: bench_sampler(n, f, n * n // 4, s)[0]
+            # the exact solver lists every layout, only small boards have few enough
+            exact = ["exact"] if size <= 5 else []
+            for heatmap in heatmaps + ["incremental"] + exact:
+                # a full python-heatmap game on 50x50 takes longer than the whole suite should
+                if size >= 50 and heatmap == "python":
+                    continue
+                yield f"search_move/{heatmap}/{tag}", lambda s, f=fleet, h=heatmap, n=size: bench_search_move(n, f, h, s)
+                yield f"full_game/{heatmap}/{tag}", lambda s, f=fleet, h=heatmap, n=size: bench_full_game(n, f, h, s)
+            # same games with the opening book / transposition cache (fresh one per case, so it starts cold like a new process)
+            if size < 50 or heatmaps[-1] != "python":
+                yield f"full_game/{heatmaps[-1]}+book/{tag}", \
+                    lambda s, f=fleet, h=heatmaps[-1], n=size: bench_full_game(n, f, h, s, opening_book=OpeningBook())
+                yield f"full_game/{heatmaps[-1]}+transposition/{tag}", \
+                    lambda s, f=fleet, h=heatmaps[-1], n=size: bench_full_game(n, f, h, s, transposition=TranspositionTable())
+
+
+def run_suite(sizes=SIZES, seconds=0.5, name_filter=None, verbose=True):
+    results = {}
+    for name, fn in benchmark_cases(sizes):
+        if name_filter and name_filter not in name:
+            continue
+        ops = fn(seconds)
+        results[name] = {"ops_per_sec": ops, "us_per_op": 1e6 / ops if ops else None}
+        if verbose:
+            print(f"{name:<45} {ops:>14,.1f} ops/sec {1e6 / ops if ops else 0:>12,.1f} us/op", flush=True)
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__ if np is not None else None,
+            "platform": platform.platform(),
+            "seconds_per_case": seconds,
+        },
+        "results": results,
+    }
+
+
+def compare(old, new, threshold=0.10):
+    """
+    Compares two saved runs. Returns a list of (name, old ops/sec, new ops/sec, change)
+    for every case that got slower by more than threshold (0.10 = 10%).
+    """
+    regressions = []
+    for name, new_result in new["results"].items():
+        old_result = old["results"].get(name)
+        if not old_result or not old_result["ops_per_sec"]:
+            continue
+        change = new_result["ops_per_sec"] / old_result["ops_per_sec"] - 1.0
+        if change < -threshold:
+            regressions.append((name, old_result["ops_per_sec"], new_result["ops_per_sec"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Battleship benchmarks")
+    parser.add_argument("--seconds", type=float, default=0.5, help="time spent on each measurement")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="board sizes to run")
+    parser.add_argument("--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two saved runs instead of running")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown that counts as a regression")
+    parser.add_argument("--memory", action="store_true", help="report heatmap allocations (tracemalloc) instead")
+    parser.add_argument("--gui", type=int, metavar="FRAMES", help="time the GUI drawing over FRAMES frames instead")
+    args = parser.parse_args(argv)
+
+    if args.memory:
+        for size in args.sizes:
+            for fleet_name in fleets_for(size):
+                for name, peak in heatmap_allocations(size, FLEETS[fleet_name]).items():
+                    print(f"{f'heatmap/{name}/{size}x{size}/{fleet_name}':<45} {peak:>10,} bytes/call (peak)")
+        return 0
+
+    if args.gui:
+        for name, ms in bench_gui(args.gui).items():
+            print(f"{f'gui/{name}':<45} {ms:>10.3f} ms/frame")
+        return 0
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        regressions = compare(old, new, args.threshold)
+        for name, old_ops, new_ops, change in regressions:
+            print(f"REGRESSION {name}: {old_ops:,.1f} -> {new_ops:,.1f} ops/sec ({change:+.1%})")
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1 if regressions else 0
+
+    run = run_suite(args.sizes, args.seconds, args.filter)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"Saved {len(run['results'])} results to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+# Lets pytest import the root scripts (server.py, simulation.py ...) and the Game/ and ai/ folders
+# the same way running them from this folder does.
@@ -1,13 +1,14 @@
 import pygame
 import sys
-import time
 
 # --- IMPORT YOUR MODULES ---
 from Game.gamestate import GameState
 from Game.ship import Ship
 from ai.search import SearchAI
-from ai.heuristics import get_probability_grid
+from ai.heuristics import get_probability_grid, get_target_grid
 from ai.learning import RLBrain  # <--- NEW IMPORT
+from gui_worker import Worker
+from gui_render import COLOR_INVALID, COLOR_VALID, MARGIN, TILE_SIZE, Renderer
 
 #HOW TO RUN: arjundeshpande@MacBookPro AI-project % python3 -m venv venv
 #arjundeshpande@MacBookPro AI-project % source venv/bin/activate
@@ -17,19 +18,16 @@ from ai.learning import RLBrain  # <--- NEW IMPORT
 # --- CONFIGURATION ---
 WINDOW_WIDTH = 1100
 WINDOW_HEIGHT = 600
-TILE_SIZE = 40
-MARGIN = 2
 HEADER_HEIGHT = 80
 
-# --- COLORS ---
-BG_COLOR = (40, 44, 52)
-TEXT_COLOR = (255, 255, 255)
-COLOR_WATER = (30, 144, 255)
-COLOR_SHIP = (105, 105, 105)
-COLOR_MISS = (200, 200, 255)
-COLOR_HIT = (220, 20, 60)
-COLOR_VALID = (0, 255, 0)
-COLOR_INVALID = (255, 0, 0)
+# --- PACING (ms) ---
+# These used to be pygame.time.wait() calls that froze the window. Now they're timers, the loop keeps running.
+AI_DELAY_MS = 600           # the AI's shot shows up at least this long after its turn starts
+SUNK_PAUSE_MS = 2000        # nobody shoots for this long after a ship sinks
+LEARN_SPLASH_MS = 1000      # "Updating AI Memory..." stays up at least this long (longer if learning is slower)
+DOTS_MS = 300               # speed of the "..." animation
+
+# Keys: R / right click = rotate while placing, H = AI heatmap over your fleet, F3 = frame-time overlay
 
 # Initialize Pygame
 pygame.init()
@@ -77,56 +75,20 @@ def check_valid_placement(board, coords):
                         return False
     return True
 
-def draw_board(surface, board, offset_x, offset_y, title, reveal_ships=False, show_heatmap=False, heatmap_grid=None):
-    # Draw Title
-    title_surf = BIG_FONT.render(title, True, TEXT_COLOR)
-    surface.blit(title_surf, (offset_x, offset_y - 50))
-
-    # 1. Draw Grid
-    for r in range(board.size):
-        for c in range(board.size):
-            x = offset_x + (TILE_SIZE + MARGIN) * c
-            y = offset_y + (TILE_SIZE + MARGIN) * r
-            
-            color = COLOR_WATER
-            cell_status = board.grid.get((r, c))
-
-            if cell_status == "ship":
-                color = COLOR_SHIP if reveal_ships else COLOR_WATER
-            elif cell_status == "already_hit":
-                color = COLOR_HIT
-            elif cell_status == "miss":
-                color = COLOR_MISS
-
-            # Heatmap Overlay
-            if show_heatmap and heatmap_grid and cell_status not in ["already_hit", "miss"]:
-                score = heatmap_grid[r][c]
-                intensity = min(255, score * 15)
-                if intensity > 0:
-                    s = pygame.Surface((TILE_SIZE, TILE_SIZE))
-                    s.set_alpha(150)
-                    s.fill((intensity, 0, 0))
-                    pygame.draw.rect(surface, color, (x, y, TILE_SIZE, TILE_SIZE))
-                    surface.blit(s, (x, y))
-                    continue
-
-            pygame.draw.rect(surface, color, (x, y, TILE_SIZE, TILE_SIZE))
-            
-            if cell_status == "already_hit":
-                pygame.draw.line(surface, (0,0,0), (x+5, y+5), (x+TILE_SIZE-5, y+TILE_SIZE-5), 3)
-                pygame.draw.line(surface, (0,0,0), (x+TILE_SIZE-5, y+5), (x+5, y+TILE_SIZE-5), 3)
-
-    # 2. OVERLAY: Green Sunk Ships
-    for ship in board.ships:
-        if ship.is_sunk():
-            for (r, c) in ship.coord:
-                x = offset_x + (TILE_SIZE + MARGIN) * c
-                y = offset_y + (TILE_SIZE + MARGIN) * r
-                pygame.draw.rect(surface, (50, 205, 50), (x, y, TILE_SIZE, TILE_SIZE)) # Green
-                pygame.draw.rect(surface, (255, 255, 255), (x, y, TILE_SIZE, TILE_SIZE), 2) # Border
+def ai_heatmap(board, rl_brain):
+    """What the AI is looking at on this board: the target grid while it has an open hit, the hunt heatmap otherwise."""
+    remaining = [ship for ship in board.ships if not ship.is_sunk()]
+    return get_target_grid(board, remaining, rl_brain) or get_probability_grid(board, remaining, rl_brain)
 
 # --- MAIN LOOP ---
 
+def ghost_cells(coords, ship_size, orientation):
+    r, c = coords
+    if orientation == "H":
+        return [(r, c + i) for i in range(ship_size)]
+    return [(r + i, c) for i in range(ship_size)]
+
+
 def main():
     clock = pygame.time.Clock()
     running = True
@@ -156,11 +118,44 @@ def main():
     AI_OFFSET_X = 600
     BOARD_OFFSET_Y = 120
 
-    game_message = "Welcome! Place your ships."
-    message_color = GOLD 
+    # Renderer: draws everything once, then only the cells / texts that changed (F3 = frame-time overlay)
+    renderer = Renderer(SCREEN, FONT, BIG_FONT, hint_pos=(PLAYER_OFFSET_X, BOARD_OFFSET_Y + (BOARD_SIZE * 45)))
+    renderer.clock = clock
+    player_view = renderer.add_board(gs.player_board, PLAYER_OFFSET_X, BOARD_OFFSET_Y, "Your Fleet", reveal_ships=True)
+    ai_view = renderer.add_board(gs.ai_board, AI_OFFSET_X, BOARD_OFFSET_Y, "Enemy Waters")
+    hover = None        # (grid coords, orientation, ships left) the ghost was last computed for
+
+    renderer.set_message("Welcome! Place your ships.", GOLD)
+
+    # AI moves and learning run on a worker thread, the loop below never blocks
+    worker = Worker()
+    ai_move = None          # the worker's move, waiting for ai_due
+    ai_due = 0
+    hold_until = 0          # end of the pause after a ship sinks
+    finish = None           # (splash from, splash until, final message, color) once the match is over
+
+    # Heatmap overlay (H): worked out on the worker only when the board or the brain changed, cached in between
+    show_heatmap = False
+    heat_key = None         # (shots on your board, brain version) the overlay on screen was computed for
+    heat_job = None         # same, for the heatmap the worker is computing
+
+    def start_learning(now, final_text, final_color):
+        # 2. PERFORM LEARNING (in the background, the splash shows while it runs)
+        worker.submit("learn", rl_brain.learn_from_game, gs.player_board)
+        # 1. SHOW LEARNING MESSAGE once the sunk pause is over, 3. the final message once learning is done
+        splash_from = max(now, hold_until)
+        return (splash_from, splash_from + LEARN_SPLASH_MS, final_text, final_color)
     
     while running:
         mouse_pos = pygame.mouse.get_pos()
+        now = pygame.time.get_ticks()
+
+        for tag, result in worker.poll():
+            if tag == "move":
+                ai_move = result
+            elif tag == "heatmap" and show_heatmap:
+                heat_key = heat_job
+                player_view.set_heat(result)
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -169,6 +164,13 @@ def main():
             elif event.type == pygame.KEYDOWN:
                 if ships_to_place and event.key == pygame.K_r:
                     placement_orientation = "V" if placement_orientation == "H" else "H"
+                elif event.key == pygame.K_F3:
+                    renderer.toggle_overlay()
+                elif event.key == pygame.K_h:
+                    show_heatmap = not show_heatmap
+                    if not show_heatmap:
+                        heat_key = None
+                        player_view.set_heat(None)
 
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
@@ -176,175 +178,126 @@ def main():
                     if ships_to_place:
                         coords = get_grid_coords(mouse_pos, PLAYER_OFFSET_X, BOARD_OFFSET_Y, BOARD_SIZE)
                         if coords:
-                            r, c = coords
                             ship_name, ship_size = ships_to_place[0]
-                            
-                            new_coords = []
-                            if placement_orientation == "H":
-                                new_coords = [(r, c+i) for i in range(ship_size)]
-                            else:
-                                new_coords = [(r+i, c) for i in range(ship_size)]
+                            new_coords = ghost_cells(coords, ship_size, placement_orientation)
 
                             # --- CHECK VALIDITY (Includes Neighbors) ---
                             if check_valid_placement(gs.player_board, new_coords):
                                 new_ship = Ship(ship_name, new_coords)
                                 gs.player_board.add_ship(new_ship)
+                                player_view.mark(new_coords)
                                 ships_to_place.pop(0)
                                 if not ships_to_place:
-                                    game_message = "Combat Started! Click Enemy Waters."
-                                    message_color = GOLD
+                                    renderer.set_message("Combat Started! Click Enemy Waters.", GOLD)
                             else:
-                                game_message = "Invalid Placement!"
-                                message_color = DANGER_RED
+                                renderer.set_message("Invalid Placement!", DANGER_RED)
 
                     # --- COMBAT PHASE ---
-                    elif not gs.game_over and gs.current_turn == "player":
+                    elif not gs.game_over and gs.current_turn == "player" and now >= hold_until:
                         coords = get_grid_coords(mouse_pos, AI_OFFSET_X, BOARD_OFFSET_Y, BOARD_SIZE)
                         if coords:
                             r, c = coords
                             if (r,c) not in gs.ai_board.shots_taken:
                                 result = gs.make_move((r, c))
+                                ai_view.mark_shot((r, c), result)
                                 
                                 if "sunk" in result:
                                     ship_name = result.replace("sunk ", "")
-                                    game_message = f"BOOM! You sunk the Enemy {ship_name}!"
-                                    message_color = SUCCESS_GREEN
-                                    
-                                    # Force Draw & Pause
-                                    SCREEN.fill(BG_COLOR)
-                                    msg_surf = BIG_FONT.render(game_message, True, message_color)
-                                    msg_rect = msg_surf.get_rect(center=(WINDOW_WIDTH // 2, 50))
-                                    SCREEN.blit(msg_surf, msg_rect)
-                                    draw_board(SCREEN, gs.player_board, PLAYER_OFFSET_X, BOARD_OFFSET_Y, "Your Fleet", reveal_ships=True, show_heatmap=False)
-                                    draw_board(SCREEN, gs.ai_board, AI_OFFSET_X, BOARD_OFFSET_Y, "Enemy Waters", reveal_ships=False) 
-                                    pygame.display.flip()
-                                    pygame.time.wait(2000)
+                                    renderer.set_message(f"BOOM! You sunk the Enemy {ship_name}!", SUCCESS_GREEN)
+                                    hold_until = now + SUNK_PAUSE_MS      # pause (without blocking)
                                 else:
-                                    game_message = f"You fired at ({r},{c}): {result.upper()}"
-                                    message_color = GOLD
+                                    renderer.set_message(f"You fired at ({r},{c}): {result.upper()}", GOLD)
                                 
                                 if gs.game_over:
-                                    # 1. SHOW LEARNING MESSAGE
-                                    SCREEN.fill(BG_COLOR)
-                                    learn_msg = BIG_FONT.render("Match Finished. Updating AI Memory...", True, GOLD)
-                                    msg_rect = learn_msg.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-                                    SCREEN.blit(learn_msg, msg_rect)
-                                    pygame.display.flip()
-                                    pygame.time.wait(1000) # Pause so user sees it
-
-                                    # 2. PERFORM LEARNING
-                                    rl_brain.learn_from_game(gs.player_board)
-
-                                    # 3. SET FINAL VICTORY MESSAGE
-                                    game_message = f"VICTORY! Enemy fleet destroyed. (AI Learned)"
-                                    message_color = SUCCESS_GREEN
+                                    finish = start_learning(now, "VICTORY! Enemy fleet destroyed. (AI Learned)", SUCCESS_GREEN)
 
                             else:
-                                game_message = "You already shot there!"
-                                message_color = WHITE
+                                renderer.set_message("You already shot there!", WHITE)
 
                 if event.button == 3 and ships_to_place:
                     placement_orientation = "V" if placement_orientation == "H" else "H"
 
         # --- AI TURN ---
+        # The move is worked out on the worker thread straight away; it's played once the delay (and any
+        # sunk pause) is over, so a slow AI only makes the wait longer instead of freezing the window.
         if not ships_to_place and gs.current_turn == "ai" and not gs.game_over:
-            pygame.display.flip() 
-            pygame.time.wait(600) 
-            
-            # --- NEW: PASS rl_brain TO AI ---
-            ai_move = ai_bot.get_next_move(gs.player_board, rl_brain)
-            ai_result = gs.make_move(ai_move)
-            ai_bot.update_result(ai_move, ai_result, gs.player_board)
+            if not worker.busy("move") and ai_move is None:
+                # --- NEW: PASS rl_brain TO AI ---
+                worker.submit("move", ai_bot.get_next_move, gs.player_board, rl_brain)
+                ai_due = max(now, hold_until) + AI_DELAY_MS
+
+            # (not while the worker is reading the board for the heatmap)
+            if ai_move is not None and now >= ai_due and now >= hold_until and not worker.busy("heatmap"):
+                ai_result = gs.make_move(ai_move)
+                ai_bot.update_result(ai_move, ai_result, gs.player_board)
+                player_view.mark_shot(ai_move, ai_result)
             
-            if "sunk" in ai_result:
-                ship_name = ai_result.replace("sunk ", "")
-                game_message = f"ALERT! AI sunk your {ship_name}!"
-                message_color = DANGER_RED
-                
-                SCREEN.fill(BG_COLOR)
-                msg_surf = BIG_FONT.render(game_message, True, message_color)
-                msg_rect = msg_surf.get_rect(center=(WINDOW_WIDTH // 2, 50))
-                SCREEN.blit(msg_surf, msg_rect)
-                draw_board(SCREEN, gs.player_board, PLAYER_OFFSET_X, BOARD_OFFSET_Y, "Your Fleet", reveal_ships=True, show_heatmap=False)
-                draw_board(SCREEN, gs.ai_board, AI_OFFSET_X, BOARD_OFFSET_Y, "Enemy Waters", reveal_ships=False)
-                pygame.display.flip()
-                pygame.time.wait(2000)
-
-            else:
-                game_message = f"AI fired at ({ai_move[0]},{ai_move[1]}): {ai_result.upper()}"
-                message_color = GOLD
-
-            if gs.game_over:
-                # 1. SHOW LEARNING MESSAGE
-                SCREEN.fill(BG_COLOR)
-                learn_msg = BIG_FONT.render("Match Finished. Updating AI Memory...", True, GOLD)
-                msg_rect = learn_msg.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-                SCREEN.blit(learn_msg, msg_rect)
-                pygame.display.flip()
-                pygame.time.wait(1000) # Pause so user sees it
-
-                # 2. PERFORM LEARNING
-                rl_brain.learn_from_game(gs.player_board)
-
-                # 3. SET FINAL DEFEAT MESSAGE
-                game_message = f"DEFEAT! The AI won. (AI Learned)"
-                message_color = DANGER_RED
+                if "sunk" in ai_result:
+                    ship_name = ai_result.replace("sunk ", "")
+                    renderer.set_message(f"ALERT! AI sunk your {ship_name}!", DANGER_RED)
+                    hold_until = now + SUNK_PAUSE_MS
+                else:
+                    renderer.set_message(f"AI fired at ({ai_move[0]},{ai_move[1]}): {ai_result.upper()}", GOLD)
+                ai_move = None
+
+                if gs.game_over:
+                    finish = start_learning(now, "DEFEAT! The AI won. (AI Learned)", DANGER_RED)
+
+        # "AI is thinking..." under the player's board while the AI has the turn
+        if not ships_to_place:
+            thinking = gs.current_turn == "ai" and not gs.game_over
+            renderer.set_hint("AI is thinking" + "." * (1 + now // DOTS_MS % 3) if thinking else None)
+
+        # --- END OF MATCH ---
+        # learning runs on the worker, the splash stays up until it's done (and at least LEARN_SPLASH_MS)
+        if finish is not None:
+            splash_from, splash_until, final_text, final_color = finish
+            if now >= splash_from:
+                renderer.splash("Match Finished. Updating AI Memory" + "." * (1 + now // DOTS_MS % 3), GOLD)
+            if now >= splash_until and not worker.busy("learn"):
+                renderer.end_splash()
+                renderer.set_message(final_text, final_color)
+                finish = None
+
+        # --- HEATMAP OVERLAY ---
+        if show_heatmap and not ships_to_place and not worker.busy("heatmap"):
+            key = (len(gs.player_board.shots_taken), rl_brain.version)
+            if key != heat_key:
+                heat_job = key
+                worker.submit("heatmap", ai_heatmap, gs.player_board, rl_brain)
 
         # --- DRAWING ---
-        SCREEN.fill(BG_COLOR)
-        
-        msg_surf = BIG_FONT.render(game_message, True, message_color)
-        msg_rect = msg_surf.get_rect(center=(WINDOW_WIDTH // 2, 50))
-        SCREEN.blit(msg_surf, msg_rect)
+        # Enemy ships show once the game is over
+        ai_view.set_reveal(gs.game_over)
 
-        # Draw Player Board (Heatmap DISABLED here)
-        draw_board(SCREEN, gs.player_board, PLAYER_OFFSET_X, BOARD_OFFSET_Y, "Your Fleet", 
-                   reveal_ships=True, show_heatmap=False)
-
-        # Draw Enemy Board
-        reveal_enemy = True if gs.game_over else False
-        draw_board(SCREEN, gs.ai_board, AI_OFFSET_X, BOARD_OFFSET_Y, "Enemy Waters", reveal_ships=reveal_enemy)
-
-        # GHOST SHIP OVERLAY
+        # GHOST SHIP OVERLAY, only worked out again when the mouse moves to another cell / the ship turns
         if ships_to_place:
             ship_name, ship_size = ships_to_place[0]
             coords = get_grid_coords(mouse_pos, PLAYER_OFFSET_X, BOARD_OFFSET_Y, BOARD_SIZE)
-            
-            if coords:
-                r, c = coords
-                # Generate ghost coords
-                ghost_coords = []
-                for i in range(ship_size):
-                    if placement_orientation == "H": nr, nc = r, c+i
-                    else: nr, nc = r+i, c
-                    ghost_coords.append((nr, nc))
-
-                # CHECK VALIDITY (Includes Neighbors)
-                is_valid = check_valid_placement(gs.player_board, ghost_coords)
-
-                # Color logic
-                hover_color = COLOR_VALID if is_valid else COLOR_INVALID
-                
-                # Draw Ghost
-                for (gr, gc) in ghost_coords:
-                    # Only draw if on screen (check_valid_placement handles logical bounds, but we need visual bounds)
-                    if 0 <= gr < BOARD_SIZE and 0 <= gc < BOARD_SIZE:
-                        x = PLAYER_OFFSET_X + (TILE_SIZE + MARGIN) * gc
-                        y = BOARD_OFFSET_Y + (TILE_SIZE + MARGIN) * gr
-                        s = pygame.Surface((TILE_SIZE, TILE_SIZE))
-                        s.set_alpha(128)
-                        s.fill(hover_color)
-                        SCREEN.blit(s, (x, y))
-                        pygame.draw.rect(SCREEN, (255,255,255), (x, y, TILE_SIZE, TILE_SIZE), 1)
-
-            instr_text = FONT.render(f"Placing: {ship_name} ({ship_size}) - Press 'R' to Rotate", True, WHITE)
-            SCREEN.blit(instr_text, (PLAYER_OFFSET_X, BOARD_OFFSET_Y + (BOARD_SIZE * 45)))
-
-        pygame.display.flip()
+            if (coords, placement_orientation, len(ships_to_place)) != hover:
+                hover = (coords, placement_orientation, len(ships_to_place))
+                if coords:
+                    ghost_coords = ghost_cells(coords, ship_size, placement_orientation)
+                    # CHECK VALIDITY (Includes Neighbors)
+                    is_valid = check_valid_placement(gs.player_board, ghost_coords)
+                    player_view.set_ghost(ghost_coords, COLOR_VALID if is_valid else COLOR_INVALID)
+                else:
+                    player_view.set_ghost([], None)
+
+            renderer.set_hint(f"Placing: {ship_name} ({ship_size}) - Press 'R' to Rotate")
+        elif hover is not None:
+            hover = None
+            player_view.set_ghost([], None)
+            renderer.set_hint(None)
+
+        renderer.draw()
         clock.tick(60)
 
+    # let a learning job that's still running finish writing the memory file
+    worker.close()
+    rl_brain.close()
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,351 @@
+import time
+
+import pygame
+
+# Dirty-rect renderer for gui_main.py.
+#   The old loop cleared the window and redrew both boards, the message and the ghost ship 60 times a second,
+#   with a new pygame.Surface for every ghost cell and a font render for every text, even when nothing moved.
+#   Here everything is drawn once, then only what changed is redrawn:
+#       - tiles are pre-built surfaces, one per cell look ("water", "hit", "sunk", "ship" + green ghost ...)
+#       - every BoardView remembers what it last drew on each cell, gui_main marks the cells a shot or the
+#         mouse touched, and draw() only blits the ones whose look is actually different now
+#       - texts are rendered again only when the text or color changes
+#       - pygame.display.update(rects) pushes just those rectangles to the window
+#   The AI's heatmap can be laid over a board (set_heat): scores become one of HEAT_LEVELS shades, and the
+#   shades come from a ramp of surfaces built once, so it's just more cached tiles.
+#   F3 toggles a frame-time overlay (time spent drawing + fps). Works with SDL_VIDEODRIVER=dummy,
+#   benchmark.py --gui uses that to compare against the old draw-everything path.
+
+TILE_SIZE = 40
+MARGIN = 2
+STEP = TILE_SIZE + MARGIN
+
+# --- COLORS ---
+BG_COLOR = (40, 44, 52)
+TEXT_COLOR = (255, 255, 255)
+COLOR_WATER = (30, 144, 255)
+COLOR_SHIP = (105, 105, 105)
+COLOR_MISS = (200, 200, 255)
+COLOR_HIT = (220, 20, 60)
+COLOR_SUNK = (50, 205, 50)
+COLOR_VALID = (0, 255, 0)
+COLOR_INVALID = (255, 0, 0)
+
+HEAT_LEVELS = 16           # shades in the heatmap ramp (level 0 = no overlay)
+HEAT_ALPHA = 150
+
+OVERLAY_COLOR = (255, 255, 0)
+OVERLAY_EVERY = 0.5         # seconds between frame-time overlay updates, so the overlay doesn't redraw every frame
+
+
+def _base_tile(state):
+    tile = pygame.Surface((TILE_SIZE, TILE_SIZE))
+    if state == "sunk":
+        tile.fill(COLOR_SUNK)
+        pygame.draw.rect(tile, (255, 255, 255), (0, 0, TILE_SIZE, TILE_SIZE), 2)
+        return tile
+    tile.fill({"ship": COLOR_SHIP, "hit": COLOR_HIT, "miss": COLOR_MISS}.get(state, COLOR_WATER))
+    if state == "hit":
+        pygame.draw.line(tile, (0, 0, 0), (5, 5), (TILE_SIZE - 5, TILE_SIZE - 5), 3)
+        pygame.draw.line(tile, (0, 0, 0), (TILE_SIZE - 5, 5), (5, TILE_SIZE - 5), 3)
+    return tile
+
+
+def heat_ramp():
+    """The heatmap shades, level -> translucent tile (None for level 0), red like draw_board's overlay."""
+    ramp = [None]
+    for level in range(1, HEAT_LEVELS):
+        shade = pygame.Surface((TILE_SIZE, TILE_SIZE))
+        shade.set_alpha(HEAT_ALPHA)
+        shade.fill((255 * level // (HEAT_LEVELS - 1), 0, 0))
+        ramp.append(shade)
+    return ramp
+
+
+class TileCache:
+    """
+    One surface per cell look, built the first time it's needed.
+    A look is (state, heat level or None, ghost color or None).
+    """
+
+    def __init__(self):
+        self.tiles = {}
+        self.ramp = heat_ramp()
+
+    def get(self, look):
+        tile = self.tiles.get(look)
+        if tile is None:
+            state, heat, ghost = look
+            tile = _base_tile(state)
+            if heat:
+                tile.blit(self.ramp[heat], (0, 0))
+            if ghost is not None:
+                shade = pygame.Surface((TILE_SIZE, TILE_SIZE))
+                shade.set_alpha(128)
+                shade.fill(ghost)
+                tile.blit(shade, (0, 0))
+                pygame.draw.rect(tile, (255, 255, 255), (0, 0, TILE_SIZE, TILE_SIZE), 1)
+            if pygame.display.get_surface() is not None:
+                tile = tile.convert()
+            self.tiles[look] = tile
+        return tile
+
+
+class TextSlot:
+    """A piece of text at a fixed spot. Rendered again only when the text or color changes."""
+
+    def __init__(self, font, pos, anchor="topleft"):
+        self.font = font
+        self.pos = pos
+        self.anchor = anchor
+        self.text = None
+        self.color = None
+        self.surface = None
+        self.rect = None        # where it is on screen right now
+        self.dirty = False
+
+    def set(self, text, color=TEXT_COLOR):
+        if text == self.text and color == self.color:
+            return
+        self.text, self.color = text, color
+        self.surface = self.font.render(text, True, color) if text else None
+        self.dirty = True
+
+    def draw(self, screen, force=False):
+        """Clears the old text, draws the new one. Returns the rects that changed."""
+        if not (self.dirty or force):
+            return []
+        rects = []
+        if self.rect is not None:
+            screen.fill(BG_COLOR, self.rect)
+            rects.append(self.rect)
+        self.rect = None
+        if self.surface is not None:
+            self.rect = self.surface.get_rect(**{self.anchor: self.pos})
+            screen.blit(self.surface, self.rect)
+            rects.append(self.rect)
+        self.dirty = False
+        return rects
+
+
+class BoardView:
+    """One board on screen. Knows what every cell looks like right now and redraws only the ones that changed."""
+
+    def __init__(self, board, offset_x, offset_y, title, title_font, reveal_ships=False, tiles=None):
+        self.board = board
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+        self.title = title_font.render(title, True, TEXT_COLOR)
+        self.reveal_ships = reveal_ships
+        self.tiles = tiles or TileCache()
+        self.drawn = {}             # (r, c) -> look on screen
+        self.pending = set()        # cells that may have changed since the last draw
+        self.ghost = {}             # (r, c) -> ghost color, the ship being placed
+        self.heat = {}              # (r, c) -> heatmap level, cells with level 0 left out
+
+    def cell_rect(self, r, c):
+        return pygame.Rect(self.offset_x + STEP * c, self.offset_y + STEP * r, TILE_SIZE, TILE_SIZE)
+
+    def area(self):
+        """The title and the whole grid, gaps included."""
+        side = self.board.size * STEP
+        return pygame.Rect(self.offset_x, self.offset_y - 50, side, side + 50)
+
+    def mark(self, cells):
+        """Cells whose look may have changed (a shot, a new ship, a sinking)."""
+        self.pending.update(cells)
+
+    def mark_shot(self, coord, result):
+        """Marks what a shot at coord changed: the cell, or the whole ship if it just sank."""
+        if result.startswith("sunk"):
+            for ship in self.board.ships:
+                if coord in ship.cells:
+                    self.mark(ship.coord)
+                    return
+        self.pending.add(coord)
+
+    def mark_all(self):
+        size = self.board.size
+        self.pending.update((r, c) for r in range(size) for c in range(size))
+
+    def set_reveal(self, reveal_ships):
+        if reveal_ships != self.reveal_ships:
+            self.reveal_ships = reveal_ships
+            self.mark(coord for ship in self.board.ships for coord in ship.coord)
+
+    def set_ghost(self, cells, color):
+        """The ghost ship under the mouse. Only the cells it left and the cells it moved onto get redrawn."""
+        size = self.board.size
+        ghost = {(r, c): color for (r, c) in cells if 0 <= r < size and 0 <= c < size}
+        if ghost == self.ghost:
+            return
+        self.pending.update(self.ghost)
+        self.pending.update(ghost)
+        self.ghost = ghost
+
+    def set_heat(self, grid):
+        """
+        Lays a heatmap (list of lists, like get_probability_grid) over the board, scaled so its best cell gets
+        the top shade. None takes it off. Only cells whose shade changed get redrawn.
+        """
+        heat = {}
+        top = max(max(row) for row in grid) if grid else 0
+        if top > 0:
+            for r, row in enumerate(grid):
+                for c, score in enumerate(row):
+                    level = int(score * (HEAT_LEVELS - 1) / top + 0.5)
+                    if level > 0:
+                        heat[(r, c)] = level
+        if heat == self.heat:
+            return
+        self.pending.update(coord for coord in self.heat.keys() | heat.keys() if self.heat.get(coord) != heat.get(coord))
+        self.heat = heat
+
+    def sunk_cells(self):
+        return {coord for ship in self.board.ships if ship.is_sunk() for coord in ship.coord}
+
+    def look(self, coord, sunk):
+        status = self.board.grid.get(coord)
+        if coord in sunk:
+            state = "sunk"
+        elif status == "already_hit":
+            state = "hit"
+        elif status == "miss":
+            state = "miss"
+        elif status == "ship" and self.reveal_ships:
+            state = "ship"
+        else:
+            state = "water"
+        heat = self.heat.get(coord) if state in ("water", "ship") else None
+        return (state, heat, self.ghost.get(coord))
+
+    def draw(self, screen, force=False):
+        """Blits the cells that changed (or all of them, with the title, if force). Returns the dirty rects."""
+        rects = []
+        if force:
+            screen.fill(BG_COLOR, self.area())
+            screen.blit(self.title, (self.offset_x, self.offset_y - 50))
+            rects.append(self.area())
+            self.drawn.clear()
+            self.mark_all()
+        if not self.pending:
+            return rects
+        sunk = self.sunk_cells()
+        for coord in self.pending:
+            look = self.look(coord, sunk)
+            if self.drawn.get(coord) == look:
+                continue
+            self.drawn[coord] = look
+            rect = self.cell_rect(*coord)
+            screen.blit(self.tiles.get(look), rect)
+            if not force:
+                rects.append(rect)
+        self.pending.clear()
+        return rects
+
+
+class Renderer:
+    """
+    Everything on the window: the boards, the message line, the placement hint and the frame-time overlay.
+    Call draw() once a frame, it pushes only the dirty rects to the display.
+    """
+
+    def __init__(self, screen, font, big_font, hint_pos=(0, 0)):
+        self.screen = screen
+        self.font = font
+        self.big_font = big_font
+        self.tiles = TileCache()
+        self.views = []
+        self.message = TextSlot(big_font, (screen.get_width() // 2, 50), anchor="center")
+        self.hint = TextSlot(font, hint_pos)
+        self.overlay = TextSlot(font, (screen.get_width() - 10, screen.get_height() - 10), anchor="bottomright")
+        self.banner = TextSlot(big_font, (screen.get_width() // 2, screen.get_height() // 2), anchor="center")
+        self.splashing = False      # True while the banner has the window to itself
+        self.show_overlay = False
+        self.needs_full = True
+
+        # frame-time stats for the overlay
+        self.draw_time = 0.0
+        self.frames = 0
+        self.rects_drawn = 0
+        self.last_overlay = time.perf_counter()
+        self.clock = None
+
+    def add_board(self, board, offset_x, offset_y, title, reveal_ships=False):
+        view = BoardView(board, offset_x, offset_y, title, self.big_font, reveal_ships, self.tiles)
+        self.views.append(view)
+        return view
+
+    def set_message(self, text, color):
+        self.message.set(text, color)
+
+    def set_hint(self, text):
+        self.hint.set(text, TEXT_COLOR)
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        if not self.show_overlay:
+            self.overlay.set(None)
+
+    def invalidate(self):
+        """Next draw() repaints the whole window (after something else drew over it)."""
+        self.needs_full = True
+
+    def splash(self, text, color):
+        """
+        A single centered line on an empty window instead of the boards, until end_splash().
+        Can be called every frame (e.g. with animated dots), it only redraws when the text changes.
+        """
+        if not self.splashing:
+            self.splashing = True
+            self.invalidate()
+        self.banner.set(text, color)
+
+    def end_splash(self):
+        if self.splashing:
+            self.splashing = False
+            self.banner.set(None)
+            self.banner.rect = None
+            self.invalidate()
+
+    def _overlay_text(self, now):
+        if now - self.last_overlay < OVERLAY_EVERY or not self.frames:
+            return
+        fps = f" | {self.clock.get_fps():.0f} fps" if self.clock else ""
+        self.overlay.set(f"draw {1000 * self.draw_time / self.frames:.2f} ms/frame | "
+                         f"{self.rects_drawn / self.frames:.1f} rects/frame{fps}", OVERLAY_COLOR)
+        self.draw_time = 0.0
+        self.frames = 0
+        self.rects_drawn = 0
+        self.last_overlay = now
+
+    def draw(self):
+        """Redraws what changed. Returns the number of dirty rects pushed to the display."""
+        start = time.perf_counter()
+        screen = self.screen
+        full = self.needs_full
+        if full:
+            screen.fill(BG_COLOR)
+            self.needs_full = False
+
+        rects = []
+        if self.splashing:
+            rects += self.banner.draw(screen, force=full)
+        else:
+            for view in self.views:
+                rects += view.draw(screen, force=full)
+            rects += self.message.draw(screen, force=full)
+            rects += self.hint.draw(screen, force=full)
+        if self.show_overlay:
+            self._overlay_text(start)
+        rects += self.overlay.draw(screen, force=full)
+
+        if full:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+
+        self.draw_time += time.perf_counter() - start
+        self.frames += 1
+        self.rects_drawn += 1 if full else len(rects)
+        return len(rects)
@@ -0,0 +1,59 @@
+import queue
+import threading
+
+# Background worker for gui_main.py.
+#   The AI's move (SearchAI.get_next_move) and the end-of-game learning (RLBrain.learn_from_game, which writes
+#   the memory file) used to run inside the event loop, so the window froze for as long as they took.
+#   They run on this thread now. Jobs are done one at a time in the order they were submitted, so the AI and
+#   the brain are never used by two jobs at once, and the event loop picks the results up with poll().
+#   The boards are only read by the jobs; gui_main doesn't change them while a job that reads them is running
+#   (the player can't shoot during the AI's turn).
+
+
+class Worker:
+    """Runs submitted jobs on one background thread. Results come back through poll()."""
+
+    def __init__(self, name="ai-worker"):
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = {}           # tag -> jobs submitted but not yet returned by poll()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            tag, fn, args = job
+            try:
+                self.results.put((tag, fn(*args), None))
+            except Exception as error:
+                self.results.put((tag, None, error))
+
+    def submit(self, tag, fn, *args):
+        """Queues fn(*args). Its result shows up in poll() as (tag, result)."""
+        self.pending[tag] = self.pending.get(tag, 0) + 1
+        self.jobs.put((tag, fn, args))
+
+    def busy(self, tag):
+        """True while a job with this tag hasn't been collected by poll() yet."""
+        return self.pending.get(tag, 0) > 0
+
+    def poll(self):
+        """Every finished job as (tag, result), without waiting. A job that raised raises here instead."""
+        done = []
+        while True:
+            try:
+                tag, result, error = self.results.get_nowait()
+            except queue.Empty:
+                return done
+            self.pending[tag] -= 1
+            if error is not None:
+                raise error
+            done.append((tag, result))
+
+    def close(self, timeout=None):
+        """Lets the queued jobs finish (learning still gets written), then stops the thread."""
+        self.jobs.put(None)
+        self.thread.join(timeout)
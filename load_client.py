@@ -0,0 +1,138 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from server import DEFAULT_PORT
+
+# Load test for server.py: plays lots of games at once and reports how long the server took to answer.
+#   python server.py --port 8765 &
+#   python load_client.py --sessions 300 --connections 20
+# Every session plays random shots until its game is over. Sessions are spread over --connections
+# connections and each connection has several requests in flight at once (one per session on it).
+# At the end it prints the round-trip latency seen by the client and the server's own stats.
+
+
+class Connection:
+    """One connection to the server. request() can be called from many tasks at once, answers are matched by id."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.waiting = {}           # id -> future for its response
+        self.ids = 0
+        self.listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def open(cls, host, port, unix=None):
+        if unix:
+            reader, writer = await asyncio.open_unix_connection(unix, limit=1 << 20)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+        return cls(reader, writer)
+
+    async def _listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.waiting.pop(response.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self.waiting.values():
+            if not future.done():
+                future.set_exception(ConnectionError("server closed the connection"))
+
+    async def request(self, **request):
+        self.ids += 1
+        request["id"] = self.ids
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[self.ids] = future
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        self.listener.cancel()
+
+
+async def play_session(conn, size, heatmap, latencies, rng):
+    """One whole game with random shots. Returns (moves, winner). Round-trip times go into latencies[op]."""
+    async def timed(op, **fields):
+        start = time.perf_counter()
+        response = await conn.request(op=op, **fields)
+        latencies.setdefault(op, []).append(1000 * (time.perf_counter() - start))
+        if not response["ok"]:
+            raise RuntimeError(f"{op} failed: {response['error']}")
+        return response
+
+    new = {"size": size}
+    if heatmap:
+        new["heatmap"] = heatmap
+    session = (await timed("new", **new))["session"]
+    cells = [(r, c) for r in range(size) for c in range(size)]
+    rng.shuffle(cells)
+    moves = 0
+    winner = None
+    for (r, c) in cells:
+        reply = await timed("shot", session=session, r=r, c=c)
+        moves += 1
+        if reply["game_over"]:
+            winner = reply["winner"]
+            break
+    await timed("close", session=session)
+    return moves, winner
+
+
+def describe(values):
+    values = sorted(values)
+    if not values:
+        return "no samples"
+    q = statistics.quantiles(values, n=100) if len(values) > 1 else [values[0]] * 99
+    return (f"n={len(values):<7} mean {statistics.fmean(values):8.2f}  p50 {q[49]:8.2f}  "
+            f"p95 {q[94]:8.2f}  p99 {q[98]:8.2f}  max {values[-1]:8.2f} ms")
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    conns = [await Connection.open(args.host, args.port, args.unix) for _ in range(args.connections)]
+    latencies = {}
+    start = time.perf_counter()
+    games = await asyncio.gather(*(play_session(conns[i % len(conns)], args.size, args.heatmap, latencies,
+                                                random.Random(rng.random()))
+                                   for i in range(args.sessions)))
+    elapsed = time.perf_counter() - start
+
+    shots = sum(moves for moves, _ in games)
+    wins = sum(1 for _, winner in games if winner == "ai")
+    print(f"{len(games)} games ({shots} shots) over {len(conns)} connections in {elapsed:.2f}s "
+          f"-> {shots / elapsed:,.0f} shots/s, AI won {wins}")
+    for op in ("new", "shot", "close"):
+        print(f"  {op:<6} round trip  {describe(latencies.get(op, []))}")
+
+    stats = await conns[0].request(op="stats")
+    print("server:", json.dumps({k: v for k, v in stats.items() if k not in ("ok", "id")}))
+    for conn in conns:
+        await conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="connect to this UNIX socket instead of TCP")
+    parser.add_argument("--sessions", type=int, default=200, help="games played at the same time")
+    parser.add_argument("--connections", type=int, default=10, help="connections the sessions are spread over")
+    parser.add_argument("--size", type=int, default=10, help="board size")
+    parser.add_argument("--heatmap", help="heatmap option for the server's AIs")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the client's shots")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
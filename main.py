@@ -111,7 +111,7 @@ while not gs.game_over:
             row = int(raw_row) - 1
             coord = (row, col)
 
-            if coord in [move["coord"] for move in gs.player_moves]:
+            if gs.has_shot("player", coord):
                 print("You already shot there! Try again.")
             elif row < 0 or row >= gs.size or col < 0 or col >= gs.size:
                 print("Out of bounds. Try again.")
@@ -0,0 +1,373 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from Game.gamestate import GameState
+from ai.exact_solver import get_layout_table
+from ai.learning import RLBrain
+from ai.search import HEATMAP_CHOICES, SELECTORS, SearchAI
+from simulation import default_fleet
+
+# Headless game server: many human-vs-AI games at once.
+#   python server.py --port 8765                  -> TCP on 127.0.0.1:8765
+#   python server.py --unix /tmp/battleship.sock  -> local UNIX socket
+#   python load_client.py --sessions 300          -> load test (see load_client.py)
+# Protocol: one JSON object per line each way. Every request gets exactly one response, in the same
+# connection; "id" is copied over so a client can have several requests in flight.
+#   {"op": "new", "size": 10, "heatmap": "python", "selector": "greedy"}
+#        -> {"ok": true, "session": "s1", "size": 10, "fleet": [[name, length], ...], "ships": [[name, [[r, c], ...]], ...]}
+#   {"op": "shot", "session": "s1", "r": 3, "c": 4}
+#        -> {"ok": true, "result": "miss", "ai_move": [r, c], "ai_result": "hit", "game_over": false, "winner": null}
+#   {"op": "state", "session": "s1"}        -> shots so far, whose turn, winner
+#   {"op": "stats"} / {"op": "stats", "session": "s1"}   -> latency numbers (server-wide / one session)
+#   {"op": "close", "session": "s1"}
+# Errors come back as {"ok": false, "error": "..."}.
+# Like main.py your fleet is placed randomly (the response tells you where), you shoot first, and every shot
+# of yours is answered by the AI's shot.
+# AI moves run on a thread pool (--workers). At most --max-pending of them are queued or running; past that a
+# shot waits for a slot instead of piling more work on the pool (that wait shows up as queue_ms). Sessions
+# belong to the connection that made them and go away when it closes.
+# With --learn the AIs use the RL memory (one RLBrain per board size, the same files main.py / gui_main.py use)
+# and learn every finished game on one extra thread, so two games never write the memory at once.
+
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 64
+MAX_FLEET_SHIPS = 10        # client fleets are placed by backtracking, so keep them small
+LATENCY_WINDOW = 1000       # latencies kept per stat for the percentiles (older ones are only in count/mean/max)
+
+
+class LatencyStats:
+    """Count / mean / max of a latency in ms, plus percentiles over the last LATENCY_WINDOW samples."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=LATENCY_WINDOW)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        self.recent.append(ms)
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        recent = sorted(self.recent)
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3),
+            "p50": round(recent[len(recent) // 2], 3),
+            "p95": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 3),
+            "max": round(self.max, 3),
+        }
+
+
+class Session:
+    """One game: the GameState, the AI playing it, and its latency numbers."""
+
+    def __init__(self, session_id, size, fleet, ai_kwargs, rl_brain=None):
+        self.id = session_id
+        self.rl_brain = rl_brain
+        self.gs = GameState(size)
+        self.fleet = fleet
+        self.ai = SearchAI(size, **ai_kwargs)
+        self.gs.player_board.place_ships_randomly(fleet)
+        self.gs.ai_board.place_ships_randomly(fleet)
+        self.lock = asyncio.Lock()      # one request at a time per game
+        self.learned = False
+        self.broken = None              # why the AI couldn't play its turn; the game can't go on after that
+        self.stats = {"request_ms": LatencyStats(), "queue_ms": LatencyStats(), "ai_ms": LatencyStats()}
+        self.created = time.time()
+
+    def ships(self):
+        return [[ship.name, [list(coord) for coord in ship.coord]] for ship in self.gs.player_board.ships]
+
+    def state(self):
+        gs = self.gs
+        return {
+            "session": self.id,
+            "size": gs.size,
+            "turn": gs.current_turn,
+            "game_over": gs.game_over,
+            "winner": gs.winner,
+            "broken": self.broken,
+            "player_moves": [[list(coord), result] for _, coord, result in gs.moves("player")],
+            "ai_moves": [[list(coord), result] for _, coord, result in gs.moves("ai")],
+        }
+
+
+class GameServer:
+    """The session table and the request handlers. serve() runs it on TCP or a UNIX socket."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING, learn=False):
+        self.sessions = {}
+        self.ids = itertools.count(1)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai")
+        self.learner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="learn")
+        self.slots = asyncio.Semaphore(max_pending)
+        self.pending = 0                # AI moves queued or running on the pool
+        self.learn = learn
+        self.brains = {}                # board size -> RLBrain, only with learn
+        self.stats = {"request_ms": LatencyStats(), "queue_ms": LatencyStats(), "ai_ms": LatencyStats()}
+        self.requests = 0
+        self.sessions_created = 0
+        self.started = time.time()
+
+    # --- AI work (runs on the pool) ---
+
+    def brain(self, size):
+        if not self.learn:
+            return None
+        if size not in self.brains:
+            self.brains[size] = RLBrain(size)
+        return self.brains[size]
+
+    def _ai_turn(self, session):
+        """The AI's reply to a player shot: pick a move, play it. Returns (move, result, ms spent)."""
+        start = time.perf_counter()
+        gs = session.gs
+        move = session.ai.get_next_move(gs.player_board, session.rl_brain)
+        result = gs.make_move(move)
+        session.ai.update_result(move, result, gs.player_board)
+        return move, result, 1000 * (time.perf_counter() - start)
+
+    async def run_ai(self, session):
+        queued = time.perf_counter()
+        async with self.slots:
+            waited = 1000 * (time.perf_counter() - queued)
+            self.pending += 1
+            try:
+                move, result, ai_ms = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self._ai_turn, session)
+            finally:
+                self.pending -= 1
+        for stats in (session.stats, self.stats):
+            stats["queue_ms"].add(waited)
+            stats["ai_ms"].add(ai_ms)
+        return move, result
+
+    async def learn_from(self, session):
+        """At the end of a game the brain learns where the player put their fleet (file I/O, so off the loop)."""
+        if session.rl_brain is None or session.learned:
+            return
+        session.learned = True
+        await asyncio.get_running_loop().run_in_executor(self.learner, session.rl_brain.learn_from_game,
+                                                         session.gs.player_board)
+
+    # --- requests ---
+
+    def _session(self, request, owned):
+        session = self.sessions.get(request.get("session"))
+        if session is None or session.id not in owned:
+            raise ValueError(f"Unknown session {request.get('session')!r}")
+        return session
+
+    async def op_new(self, request, owned):
+        size = int(request.get("size", 10))
+        if not 2 <= size <= 50:
+            raise ValueError("size must be between 2 and 50")
+        fleet = [(str(name), int(length)) for name, length in request.get("fleet") or default_fleet(size)]
+        if not 1 <= len(fleet) <= MAX_FLEET_SHIPS:
+            raise ValueError(f"fleet must have between 1 and {MAX_FLEET_SHIPS} ships")
+        if any(not 1 <= length <= size for _, length in fleet):
+            raise ValueError(f"ship lengths must be between 1 and {size}")
+        ai_kwargs = {}
+        if "heatmap" in request:
+            if request["heatmap"] not in HEATMAP_CHOICES:
+                raise ValueError(f"heatmap must be one of {HEATMAP_CHOICES}")
+            ai_kwargs["heatmap"] = request["heatmap"]
+        if "selector" in request:
+            if request["selector"] not in SELECTORS:
+                raise ValueError(f"selector must be one of {list(SELECTORS)}")
+            ai_kwargs["selector"] = request["selector"]
+        if ai_kwargs.get("heatmap") == "exact":
+            # the exact solver lists every layout up front; raises TooManyLayouts (a ValueError) for big boards
+            await asyncio.get_running_loop().run_in_executor(self.executor, get_layout_table, size, fleet)
+
+        # placing both fleets can take a while on a crowded board, so it doesn't run on the loop either
+        try:
+            session = await asyncio.get_running_loop().run_in_executor(
+                self.executor, Session, f"s{next(self.ids)}", size, fleet, ai_kwargs, self.brain(size))
+        except ValueError:
+            raise ValueError(f"Can't fit the fleet {fleet} on a {size}x{size} board")
+        self.sessions[session.id] = session
+        owned.add(session.id)
+        self.sessions_created += 1
+        return {"session": session.id, "size": size, "fleet": [list(ship) for ship in fleet], "ships": session.ships()}
+
+    async def op_shot(self, request, owned):
+        session = self._session(request, owned)
+        async with session.lock:
+            gs = session.gs
+            if session.broken:
+                raise ValueError(f"Session is broken ({session.broken}), close it and start a new one")
+            if gs.game_over:
+                raise ValueError("Game is over")
+            if gs.current_turn != "player":
+                raise ValueError("Not your turn")
+            r, c = int(request["r"]), int(request["c"])
+            if not (0 <= r < gs.size and 0 <= c < gs.size):
+                raise ValueError("Out of bounds")
+            if (r, c) in gs.ai_board.shots_taken:
+                raise ValueError("You already shot there")
+
+            reply = {"result": gs.make_move((r, c)), "ai_move": None, "ai_result": None}
+            if not gs.game_over:
+                try:
+                    move, result = await self.run_ai(session)
+                except Exception as error:
+                    # the player's shot is in but the AI never answered: no way to carry on from here
+                    session.broken = f"AI turn failed: {error!r}"
+                    raise RuntimeError(session.broken) from error
+                reply["ai_move"], reply["ai_result"] = list(move), result
+            if gs.game_over:
+                await self.learn_from(session)
+            reply["game_over"] = gs.game_over
+            reply["winner"] = gs.winner
+            return reply
+
+    async def op_state(self, request, owned):
+        return self._session(request, owned).state()
+
+    async def op_stats(self, request, owned):
+        if request.get("session") is not None:
+            session = self._session(request, owned)
+            return {"session": session.id, **{name: s.summary() for name, s in session.stats.items()}}
+        return {
+            "sessions": len(self.sessions),
+            "sessions_created": self.sessions_created,
+            "requests": self.requests,
+            "ai_pending": self.pending,
+            "uptime_s": round(time.time() - self.started, 1),
+            **{name: s.summary() for name, s in self.stats.items()},
+        }
+
+    async def op_close(self, request, owned):
+        session = self._session(request, owned)
+        owned.discard(session.id)
+        del self.sessions[session.id]
+        return {"session": session.id, "closed": True}
+
+    async def handle(self, request, owned):
+        """One request dict -> one response dict."""
+        start = time.perf_counter()
+        self.requests += 1
+        handler = getattr(self, f"op_{request.get('op')}", None) if isinstance(request.get("op"), str) else None
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown op {request.get('op')!r}")
+            response = {"ok": True, **await handler(request, owned)}
+        except (ValueError, KeyError, TypeError) as error:
+            response = {"ok": False, "error": str(error)}
+        except Exception as error:      # a bug in one game shouldn't take the connection down
+            response = {"ok": False, "error": f"Internal error: {error!r}"}
+        if "id" in request:
+            response["id"] = request["id"]
+
+        ms = 1000 * (time.perf_counter() - start)
+        self.stats["request_ms"].add(ms)
+        # the session field is whatever the client sent, only a string can be a session id
+        key = request.get("session") or response.get("session")
+        session = self.sessions.get(key) if isinstance(key, str) else None
+        if session is not None:
+            session.stats["request_ms"].add(ms)
+        return response
+
+    # --- connections ---
+
+    async def client(self, reader, writer):
+        """
+        Reads requests off one connection. Each one is handled in its own task, so a slow AI turn in one
+        session doesn't hold up the others on the same connection (requests for the same session still go
+        one at a time, through its lock).
+        """
+        owned = set()
+        tasks = set()
+
+        async def answer(request):
+            response = await self.handle(request, owned)
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("expected a JSON object")
+                except ValueError as error:
+                    writer.write(json.dumps({"ok": False, "error": f"Bad request: {error}"}).encode() + b"\n")
+                    continue
+                task = asyncio.create_task(answer(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            for session_id in owned:
+                self.sessions.pop(session_id, None)
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, unix=None, ready=None):
+        if unix:
+            if os.path.exists(unix):
+                os.remove(unix)
+            server = await asyncio.start_unix_server(self.client, path=unix)
+            where = unix
+        else:
+            server = await asyncio.start_server(self.client, host, port)
+            where = "{}:{}".format(*server.sockets[0].getsockname()[:2])
+        print(f"Battleship server on {where}", flush=True)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.learner.shutdown(wait=True)
+        for brain in self.brains.values():
+            brain.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Battleship game server (line-delimited JSON)")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port")
+    parser.add_argument("--unix", metavar="PATH", help="listen on this UNIX socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="threads for AI moves")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help="AI moves queued or running at once, more shots wait for a slot")
+    parser.add_argument("--learn", action="store_true", help="AIs use the RL memory and learn from every game")
+    parser.add_argument("--seed", type=int, help="seed the random module (placements, AI tie breaks)")
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    server = GameServer(args.workers, args.max_pending, args.learn)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,476 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from multiprocessing import Pool
+
+from Game.board import Board
+from Game.bitboard import BitBoard
 from Game.gamestate import GameState
+from Game.placements import random_fleet_layout
+from ai.learning import RLBrain
+from ai.heuristics import get_best_hunt_moves_batch, get_probability_grids_batch, get_target_grids_batch, np
 from ai.search import SearchAI
-from ai.random_bot import RandomAI 
+from ai.random_bot import RandomAI
+
+BOARD_SIZE = 10  # <--- Default board size (5 or 10), can be changed with --size
+
+# Fleets must match main.py logic
+FLEETS = {
+    5: [("Submarine", 3), ("Destroyer", 2)],
+    10: [("Carrier", 5), ("Battleship", 4), ("Cruiser", 3), ("Submarine", 3), ("Destroyer", 2)],
+}
+
+BOTS = {
+    "random": RandomAI,
+    "search": SearchAI,
+}
+
+BOARD_ENGINES = {
+    "dict": Board,
+    "bit": BitBoard,
+}
+
+LEARN_FLUSH_EVERY = 50      # games between merges of a worker's RL shard into the shared memory file
+
+
+def default_fleet(board_size):
+    """The 5x5 board gets the small fleet, everything else gets the standard one."""
+    return FLEETS[5] if board_size == 5 else FLEETS[10]
+
+
+def game_seed(base_seed, game_index):
+    """Seed for one game. Only depends on the game number, so it's the same no matter which worker plays it."""
+    return (base_seed << 32) + game_index
+
+
+def play_game(bot_type, board_size, fleets, seed=None, bot_kwargs=None, board_cls=Board, rl_brain=None):
+    """
+    Plays one full game of bot_type against a random fleet.
+    With an rl_brain the bot gets its bias and the brain learns from the fleet afterwards.
+    Returns a result dict: seed, moves taken and wall time in seconds.
+    """
+    if seed is not None:
+        random.seed(seed)       # placement and the bots all use the random module
+    start = time.perf_counter()
+
+    gs = GameState(board_size, board_cls=board_cls)
+    gs.ai_board.place_ships_randomly(fleets)
+
+    # Initialize the specific bot
+    bot = bot_type(gs.size, **(bot_kwargs or {}))
+
+    moves_taken = 0
+    while not gs.ai_board.all_ships_sunk():
+        move = bot.get_next_move(gs.ai_board, rl_brain)
+        result = gs.make_move_simulation(move)
+        bot.update_result(move, result, gs.ai_board)
+        moves_taken += 1
+
+        # Safety break just in case
+        if moves_taken > board_size**2 + 10: break
+
+    if rl_brain:
+        rl_brain.learn_from_game(gs.ai_board)
+
+    return {"seed": seed, "moves": moves_taken, "wall_time": time.perf_counter() - start}
+
+
+def game_footprint(bot_type, board_size, fleets, games=200, seed=0, bot_kwargs=None, board_cls=Board):
+    """
+    Memory and time of whole games through GameState.make_move (both fleets, both sides shooting with bot_type,
+    every move logged), unlike play_game which only fires at one board.
+    Returns {"bytes_per_game": what one finished GameState keeps alive (boards, ships, move log; tracemalloc),
+             "ms_per_game": wall time per game, measured in a separate untraced pass}.
+    """
+    def play(i):
+        random.seed(game_seed(seed, i))
+        gs = GameState(board_size, board_cls=board_cls)
+        gs.player_board.place_ships_randomly(fleets)
+        gs.ai_board.place_ships_randomly(fleets)
+        bots = {"player": bot_type(board_size, **(bot_kwargs or {})), "ai": bot_type(board_size, **(bot_kwargs or {}))}
+        while not gs.game_over:
+            turn = gs.current_turn
+            board = gs.ai_board if turn == "player" else gs.player_board
+            move = bots[turn].get_next_move(board)
+            bots[turn].update_result(move, gs.make_move(move), board)
+        return gs
 
-def run_batch(bot_type, num_games=1000):
+    play(0)     # warm the placement / layout caches so they aren't counted
+    start = time.perf_counter()
+    for i in range(games):
+        play(i)
+    ms_per_game = 1000 * (time.perf_counter() - start) / games
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    finished = [play(i) for i in range(games)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del finished
+    return {"bytes_per_game": (after - before) / games, "ms_per_game": ms_per_game}
+
+
+def run_batch(bot_type, num_games=1000, board_size=BOARD_SIZE, fleets=None, seed=None, bot_kwargs=None):
+    """Plays num_games in this process and returns the average number of moves."""
+    fleets = fleets or default_fleet(board_size)
     total_moves = 0
-    BOARD_SIZE = 10  # <--- Change to 5 or 10 here
-    
-    # Define the fleet based on the board size (Must match main.py logic)
-    if BOARD_SIZE == 5:
-        fleets = [("Submarine", 3), ("Destroyer", 2)]
-    else:
-        fleets = [("Carrier", 5), ("Battleship", 4), ("Cruiser", 3), ("Submarine", 3), ("Destroyer", 2)]
-    
+
     print(f"Running {num_games} games for {bot_type.__name__}...", end="", flush=True)
-    
+
     for i in range(num_games):
-        gs = GameState(BOARD_SIZE)
-        
-        # FIX: Now we pass 'fleets' to the function!
-        gs.ai_board.place_ships_randomly(fleets)
-        
-        # Initialize the specific bot
-        bot = bot_type(gs.size)
-        
-        moves_taken = 0
-        while not gs.ai_board.all_ships_sunk():
-            move = bot.get_next_move(gs.ai_board)
-            result = gs.make_move_simulation(move)
-            bot.update_result(move, result, gs.ai_board)
-            moves_taken += 1
-            
-            # Safety break just in case
-            if moves_taken > BOARD_SIZE**2 + 10: break
-                
-        total_moves += moves_taken
-        
+        game = play_game(bot_type, board_size, fleets,
+                         seed=None if seed is None else game_seed(seed, i), bot_kwargs=bot_kwargs)
+        total_moves += game["moves"]
+
     print(" Done.")
     return total_moves / num_games
 
-if __name__ == "__main__":
+
+# --- PARALLEL RUNNER ---
+
+_worker_brains = {}     # (memory path, size) -> this process's shared RLBrain
+
+
+def _worker_brain(learn_path, board_size):
+    key = (learn_path, board_size)
+    if key not in _worker_brains:
+        _worker_brains[key] = RLBrain(board_size, learn_path, flush_every=LEARN_FLUSH_EVERY, shared=True)
+    return _worker_brains[key]
+
+
+def _play_task(task):
+    """Worker side of run_parallel. Takes plain names/tuples so everything pickles."""
+    game_index, seed, bot_name, board_size, fleets, bot_kwargs, engine, learn_path = task
+    rl_brain = _worker_brain(learn_path, board_size) if learn_path else None
+    result = play_game(BOTS[bot_name], board_size, fleets, seed, bot_kwargs, BOARD_ENGINES[engine], rl_brain)
+    result["game"] = game_index
+    return result
+
+
+def run_parallel(bot_name, num_games=1000, board_size=BOARD_SIZE, fleets=None, workers=None, seed=0,
+                 bot_kwargs=None, engine="dict", chunk_size=None, on_result=None, learn_path=None):
+    """
+    Plays num_games spread over a process pool.
+    Every game gets game_seed(seed, i), so the results are identical for any number of workers.
+    on_result(result) is called for each game as soon as it comes back.
+    learn_path: train a shared RL memory file while playing (every worker learns into it at once).
+    The bots then also use that memory, so results depend on game order and are no longer worker-independent.
+    SearchAI's sampling (montecarlo heatmap, info selector) normally stops on a wall-clock budget, which
+    depends on how busy the machine is, so here it draws its full `samples` instead unless time_budget_ms
+    is passed explicitly.
+    Returns the list of per-game results sorted by game number.
+    """
+    fleets = fleets or default_fleet(board_size)
+    workers = workers or os.cpu_count() or 1
+    if BOTS[bot_name] is SearchAI and "time_budget_ms" not in (bot_kwargs or {}):
+        bot_kwargs = dict(bot_kwargs or {}, time_budget_ms=None)
+    tasks = [(i, game_seed(seed, i), bot_name, board_size, fleets, bot_kwargs, engine, learn_path)
+             for i in range(num_games)]
+
+    results = []
+    if workers == 1:
+        stream = map(_play_task, tasks)
+        pool = None
+    else:
+        # small chunks keep results streaming back while still cutting down on pickling
+        chunk_size = chunk_size or max(1, min(64, num_games // (workers * 4)))
+        pool = Pool(workers)
+        stream = pool.imap_unordered(_play_task, tasks, chunksize=chunk_size)
+
+    try:
+        for result in stream:
+            results.append(result)
+            if on_result:
+                on_result(result)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if learn_path:
+            # pool workers exit without running atexit, opening the memory here merges their leftover shards
+            brain = _worker_brains.pop((learn_path, board_size), None) or RLBrain(board_size, learn_path, shared=True)
+            brain.close()
+
+    results.sort(key=lambda game: game["game"])
+    return results
+
+
+# --- SELECTOR COMPARISON ---
+
+def compare_selectors(num_games=200, board_size=BOARD_SIZE, fleets=None, workers=1, seed=0, bot_kwargs=None):
+    """
+    SearchAI with selector="greedy" vs selector="info" on the same seeded fleets, with the wall-clock budget
+    off (see run_parallel), so the numbers are the same on every run and machine.
+    bot_kwargs go to both (e.g. heatmap="exact" or samples=500).
+    Returns {"greedy": summary, "info": summary, "info_minus_greedy": mean moves per game info needed over greedy}.
+    """
+    results = {}
+    for selector in ("greedy", "info"):
+        results[selector] = run_parallel("search", num_games, board_size, fleets, workers, seed,
+                                         dict(bot_kwargs or {}, selector=selector))
+    summaries = {selector: summarize(games) for selector, games in results.items()}
+    diffs = [info["moves"] - greedy["moves"] for greedy, info in zip(results["greedy"], results["info"])]
+    summaries["info_minus_greedy"] = sum(diffs) / len(diffs) if diffs else 0.0
+    return summaries
+
+
+# --- LOCKSTEP RUNNER ---
+# Plays a whole batch of SearchAI games side by side, with every game's state in (games, cells) numpy arrays.
+# Each step, the games with an open hit get their target-mode heatmap from one vectorized call and the rest
+# get their hunt heatmap from another, then every move is applied to the arrays at once (hits, misses,
+# sinks and the buffer around sunk ships), so the only per-game Python left is the fleet placement.
+# Same seeds -> same fleets and same moves as play_game with the default SearchAI.
+# On one core that's about 8-9x run_parallel(workers=1) on 10x10 and 6-7x on 5x5, so short of 10x:
+# what's left is numpy's per-step overhead on the two heatmap calls and the per-game fleet placement.
+
+LOCKSTEP_BATCH = 1024       # games per batch, bigger batches spread the per-step overhead over more games
+
+def _play_lockstep_batch(seeds, board_size, fleets):
+    games = len(seeds)
+    cells = board_size * board_size
+    ships = len(fleets)
+    ship_at = np.full((games, cells), -1, dtype=np.int64)              # cell -> ship number, -1 for water
+    ship_buffer = np.zeros((games, ships, cells), dtype=bool)           # a ship plus the cells around it
+    buffer_bytes = (cells + 7) // 8
+    for k, seed in enumerate(seeds):
+        random.seed(seed)       # same draws as place_ships_randomly in play_game, so the same fleet
+        layout = random_fleet_layout(board_size, fleets, random)
+        if layout is None:
+            raise ValueError(f"Could not fit fleet {fleets} on a {board_size}x{board_size} board.")
+        for s, placement in enumerate(layout):
+            ship_at[k, list(placement.cells)] = s
+            bits = np.frombuffer(placement.buffer.to_bytes(buffer_bytes, "little"), dtype=np.uint8)
+            ship_buffer[k, s] = np.unpackbits(bits, bitorder="little")[:cells]
+
+    lengths = np.array([length for _, length in fleets])
+    hits_left = np.tile(lengths, (games, 1))                            # per ship, hits until it sinks
+    sunk = np.zeros(games, dtype=np.int64)
+    hit = np.zeros((games, board_size, board_size), dtype=bool)
+    blocked = np.zeros((games, board_size, board_size), dtype=bool)     # misses + sunk ships + buffers
+    shot = np.zeros((games, board_size, board_size), dtype=bool)
+    flat_hit = hit.reshape(games, cells)
+    flat_blocked = blocked.reshape(games, cells)
+    flat_shot = shot.reshape(games, cells)
+    counts = {}                                                          # length -> unsunk ships of that length, per game
+    for _, length in fleets:
+        counts.setdefault(length, np.zeros(games, dtype=np.int64))
+        counts[length] += 1
+
+    moves_taken = np.zeros(games, dtype=np.int64)
+    active = np.arange(games)
+    while len(active):
+        # 1. target mode for every game with a hit on a ship that isn't sunk yet (SearchAI.target_move)
+        moves = np.full(len(active), -1)
+        chasing = (hit[active] & ~blocked[active]).any(axis=(1, 2))
+        if chasing.any():
+            idx = active[chasing]
+            grids = get_target_grids_batch(hit[idx], blocked[idx], {length: n[idx] for length, n in counts.items()})
+            best = get_best_hunt_moves_batch(grids, shot[idx])
+            # a best score of 0 means no placement explains the hits, then the hunt heatmap takes over
+            found = (best >= 0) & (grids.reshape(len(idx), -1)[np.arange(len(idx)), np.maximum(best, 0)] > 0)
+            moves[np.flatnonzero(chasing)[found]] = best[found]
+
+        # 2. everyone else hunts
+        hunting = moves < 0
+        if hunting.any():
+            idx = active[hunting]
+            grids = get_probability_grids_batch(hit[idx], blocked[idx], {length: n[idx] for length, n in counts.items()})
+            moves[hunting] = get_best_hunt_moves_batch(grids, shot[idx])
+
+        # 3. apply every move at once
+        playing = moves >= 0
+        active, moves = active[playing], moves[playing]
+        flat_shot[active, moves] = True
+        ship = ship_at[active, moves]
+        missed = ship < 0
+        flat_blocked[active[missed], moves[missed]] = True
+
+        hitters, ship = active[~missed], ship[~missed]
+        flat_hit[hitters, moves[~missed]] = True
+        hits_left[hitters, ship] -= 1
+        sinking = hits_left[hitters, ship] == 0
+        sinkers, ship = hitters[sinking], ship[sinking]     # at most one sink per game per step
+        flat_blocked[sinkers] |= ship_buffer[sinkers, ship]
+        for length, n in counts.items():
+            n[sinkers[lengths[ship] == length]] -= 1
+        sunk[sinkers] += 1
+
+        moves_taken[active] += 1
+        active = active[(sunk[active] < ships) & (moves_taken[active] <= cells + 10)]
+
+    return moves_taken.tolist()
+
+
+def run_lockstep(num_games=1000, board_size=BOARD_SIZE, fleets=None, seed=0, batch_size=LOCKSTEP_BATCH, on_result=None):
+    """
+    SearchAI games played batch_size at a time in lockstep (see above). Needs numpy.
+    Returns per-game results like run_parallel; wall_time is the batch time split evenly over its games.
+    """
+    if np is None:
+        raise ImportError("numpy is required for the lockstep runner")
+    fleets = fleets or default_fleet(board_size)
+
+    results = []
+    for first in range(0, num_games, batch_size):
+        indices = range(first, min(num_games, first + batch_size))
+        seeds = [game_seed(seed, i) for i in indices]
+        start = time.perf_counter()
+        moves_taken = _play_lockstep_batch(seeds, board_size, fleets)
+        per_game = (time.perf_counter() - start) / len(seeds)
+
+        for i, game_seed_, moves in zip(indices, seeds, moves_taken):
+            result = {"seed": game_seed_, "moves": moves, "wall_time": per_game, "game": i}
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    rank = max(1, -(-len(sorted_values) * pct // 100))     # ceil without floats
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(results, elapsed=None):
+    """Mean / stdev / percentiles of moves and wall time for a list of game results."""
+    moves = sorted(game["moves"] for game in results)
+    times = sorted(game["wall_time"] for game in results)
+    summary = {
+        "games": len(results),
+        "mean_moves": statistics.fmean(moves) if moves else 0,
+        "stdev_moves": statistics.stdev(moves) if len(moves) > 1 else 0.0,
+        "min_moves": moves[0] if moves else 0,
+        "max_moves": moves[-1] if moves else 0,
+        "p50_moves": percentile(moves, 50),
+        "p90_moves": percentile(moves, 90),
+        "p99_moves": percentile(moves, 99),
+        "mean_game_ms": statistics.fmean(times) * 1000 if times else 0,
+        "p99_game_ms": percentile(times, 99) * 1000,
+    }
+    if elapsed:
+        summary["elapsed_s"] = elapsed
+        summary["games_per_s"] = len(results) / elapsed
+    return summary
+
+
+def parse_fleet(text):
+    """'Carrier:5,Destroyer:2' -> [('Carrier', 5), ('Destroyer', 2)]"""
+    fleet = []
+    for part in text.split(","):
+        name, _, length = part.strip().partition(":")
+        if not name or not length.isdigit():
+            raise argparse.ArgumentTypeError(f"Bad ship {part!r}, expected Name:length")
+        fleet.append((name, int(length)))
+    return fleet
+
+
+def parse_bot_arg(text):
+    """'heatmap=numpy' -> ('heatmap', 'numpy'), numbers are converted and 'none' is None."""
+    key, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Bad bot option {text!r}, expected key=value")
+    if value.lower() == "none":
+        return key, None
+    for convert in (int, float):
+        try:
+            return key, convert(value)
+        except ValueError:
+            pass
+    return key, value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Battleship AI simulation")
+    parser.add_argument("--games", type=int, default=1000, help="games per bot")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes to use (1 = serial)")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE, help="board size")
+    parser.add_argument("--fleet", type=parse_fleet, help="e.g. Carrier:5,Destroyer:2 (default depends on size)")
+    parser.add_argument("--bot", action="append", choices=sorted(BOTS), help="bot to run, can be repeated")
+    parser.add_argument("--bot-arg", action="append", type=parse_bot_arg, default=[],
+                        help="extra constructor option for the bot, e.g. heatmap=numpy or time_budget_ms=none")
+    parser.add_argument("--engine", choices=sorted(BOARD_ENGINES), default="dict", help="board implementation")
+    parser.add_argument("--seed", type=int, default=0, help="base seed, game i uses game_seed(seed, i)")
+    parser.add_argument("--results", help="write one JSON line per game to this file")
+    parser.add_argument("--lockstep", action="store_true",
+                        help="play SearchAI games as one vectorized batch (numpy, default SearchAI options only)")
+    parser.add_argument("--batch-size", type=int, default=LOCKSTEP_BATCH, help="games per lockstep batch")
+    parser.add_argument("--learn", metavar="FILE",
+                        help="let the bots use and train this RL memory file (shared by all workers)")
+    parser.add_argument("--compare-selectors", action="store_true",
+                        help="play SearchAI's greedy and info selectors on the same seeds (the --bot-arg options go to both)")
+    parser.add_argument("--footprint", action="store_true",
+                        help="report memory / time per whole GameState game (both sides, move log) instead")
+    args = parser.parse_args(argv)
+
+    bots = args.bot or ["random", "search"]
+    fleets = args.fleet or default_fleet(args.size)
+    bot_kwargs = dict(args.bot_arg)
+
     print(f"--- BATTLESHIP AI SIMULATION ---")
-    
-    # Run Random Bot
-    avg_random = run_batch(RandomAI, num_games=1000)
-    
-    # Run Smart Bot
-    avg_smart = run_batch(SearchAI, num_games=1000)
-    
+    print(f"{args.games} games per bot, {args.size}x{args.size}, {args.workers} workers, seed {args.seed}")
+
+    if args.compare_selectors:
+        summaries = compare_selectors(args.games, args.size, fleets, args.workers, args.seed, bot_kwargs)
+        for selector in ("greedy", "info"):
+            s = summaries[selector]
+            print(f"{selector:>10}: mean {s['mean_moves']:.2f} moves (stdev {s['stdev_moves']:.2f}, "
+                  f"p50 {s['p50_moves']}, p90 {s['p90_moves']}) | {s['mean_game_ms']:.2f} ms/game")
+        print(f"info - greedy: {summaries['info_minus_greedy']:+.3f} moves per game")
+        return summaries
+
+    if args.footprint:
+        for bot_name in bots:
+            f = game_footprint(BOTS[bot_name], args.size, fleets, args.games, args.seed,
+                               bot_kwargs if bot_name != "random" else None, BOARD_ENGINES[args.engine])
+            print(f"{BOTS[bot_name].__name__:>10}: {f['bytes_per_game']:,.0f} bytes per finished game, "
+                  f"{f['ms_per_game']:.2f} ms/game")
+        return None
+
+    out = open(args.results, "w") if args.results else None
+    summaries = {}
+    try:
+        for bot_name in bots:
+            print(f"Running {args.games} games for {BOTS[bot_name].__name__}...", end="", flush=True)
+
+            def write_result(result, bot_name=bot_name):
+                if out:
+                    out.write(json.dumps(dict(result, bot=bot_name)) + "\n")
+
+            start = time.perf_counter()
+            if args.lockstep and bot_name == "search" and not bot_kwargs and not args.learn:
+                results = run_lockstep(args.games, args.size, fleets, args.seed, args.batch_size,
+                                       on_result=write_result)
+            else:
+                results = run_parallel(bot_name, args.games, args.size, fleets, args.workers, args.seed,
+                                       bot_kwargs if bot_name != "random" else None, args.engine,
+                                       on_result=write_result, learn_path=args.learn)
+            summaries[bot_name] = summarize(results, time.perf_counter() - start)
+            print(" Done.")
+    finally:
+        if out:
+            out.close()
+
     print(f"\n--- FINAL RESULTS (Lower is Better) ---")
-    print(f"Random Bot Average: {avg_random:.2f} moves")
-    print(f"Smart AI Average:   {avg_smart:.2f} moves")
-    
-    if avg_random > 0:
+    for bot_name, s in summaries.items():
+        print(f"{BOTS[bot_name].__name__:>10}: mean {s['mean_moves']:.2f} moves (stdev {s['stdev_moves']:.2f}, "
+              f"p50 {s['p50_moves']}, p90 {s['p90_moves']}, p99 {s['p99_moves']}) | "
+              f"{s['mean_game_ms']:.2f} ms/game, {s['games_per_s']:.1f} games/s")
+
+    if "random" in summaries and "search" in summaries and summaries["random"]["mean_moves"] > 0:
+        avg_random = summaries["random"]["mean_moves"]
+        avg_smart = summaries["search"]["mean_moves"]
         improvement = ((avg_random - avg_smart) / avg_random) * 100
-        print(f"\nYour AI is {improvement:.1f}% more efficient than random guessing!")
\ No newline at end of file
+        print(f"\nYour AI is {improvement:.1f}% more efficient than random guessing!")
+
+    return summaries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+# Test positions shared by the heatmap tests.
+import random
+
+from Game.board import Board
+from simulation import default_fleet
+
+
+def random_positions(size, games, seed):
+    """(board, remaining ships) after every shot of a few games of random shooting."""
+    rng = random.Random(seed)
+    for _ in range(games):
+        random.seed(rng.random())
+        board = Board(size)
+        board.place_ships_randomly(default_fleet(size))
+        cells = [(r, c) for r in range(size) for c in range(size)]
+        rng.shuffle(cells)
+        for cell in cells:
+            board.receive_shot(cell)
+            yield board, [ship for ship in board.ships if not ship.is_sunk()]
+            if board.all_ships_sunk():
+                break
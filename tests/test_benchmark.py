@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from benchmark import compare, main, run_suite
+
+
+def run(**ops):
+    return {"results": {name.replace("_", "/"): {"ops_per_sec": value} for name, value in ops.items()}}
+
+
+def test_compare_flags_only_slowdowns_past_the_threshold():
+    old = run(heatmap_a=1000.0, heatmap_b=1000.0, heatmap_c=1000.0, gone=50.0)
+    new = run(heatmap_a=850.0, heatmap_b=950.0, heatmap_c=2000.0, added=10.0)
+    [(name, old_ops, new_ops, change)] = compare(old, new, 0.10)
+    assert (name, old_ops, new_ops) == ("heatmap/a", 1000.0, 850.0)
+    assert change == pytest.approx(-0.15)
+    assert compare(old, new, 0.20) == []
+
+
+def test_compare_command_exits_with_1_on_a_regression(tmp_path, capsys):
+    old_file, new_file = tmp_path / "old.json", tmp_path / "new.json"
+    old_file.write_text(json.dumps(run(receive_shot=100.0)))
+    new_file.write_text(json.dumps(run(receive_shot=50.0)))
+    assert main(["--compare", str(old_file), str(new_file)]) == 1
+    assert "REGRESSION receive/shot" in capsys.readouterr().out
+    assert main(["--compare", str(old_file), str(old_file)]) == 0
+
+
+def test_suite_runs_the_filtered_cases():
+    suite = run_suite([5], seconds=0.01, name_filter="receive_shot/", verbose=False)
+    assert sorted(suite["results"]) == ["receive_shot/bit/5x5/small", "receive_shot/dict/5x5/small"]
+    assert all(result["ops_per_sec"] > 0 for result in suite["results"].values())
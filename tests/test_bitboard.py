@@ -0,0 +1,35 @@
+import random
+
+from Game.bitboard import BitBoard
+from Game.board import Board
+from Game.ship import Ship
+from simulation import FLEETS
+
+
+def test_bitboard_answers_every_shot_like_the_dict_board():
+    rng = random.Random(3)
+    for game in range(5):
+        random.seed(game)
+        board = Board(10)
+        board.place_ships_randomly(FLEETS[10])
+        bitboard = BitBoard(10)
+        for ship in board.ships:
+            assert bitboard.add_ship(Ship(ship.name, ship.coord))
+
+        cells = [(r, c) for r in range(10) for c in range(10)]
+        rng.shuffle(cells)
+        for cell in cells + [cells[0], (-1, 4), (3, 10)]:      # a repeat and two off-board shots
+            assert bitboard.receive_shot(cell) == board.receive_shot(cell)
+            assert bitboard.all_ships_sunk() == board.all_ships_sunk()
+            assert (bitboard.hit_bits, bitboard.miss_bits, bitboard.forbidden_bits) == \
+                   (board.hit_bits, board.miss_bits, board.forbidden_bits)
+        assert {cell: bitboard.grid.get(cell) for cell in cells} == {cell: board.grid.get(cell) for cell in cells}
+        assert bitboard.zobrist.packed == board.zobrist.packed
+
+
+def test_bitboard_rejects_the_same_ships_as_the_dict_board():
+    for board in (Board(5), BitBoard(5)):
+        assert board.add_ship(Ship("Cruiser", [(0, 0), (0, 1), (0, 2)]))
+        assert not board.add_ship(Ship("Overlap", [(0, 2), (1, 2)]))
+        assert not board.add_ship(Ship("Outside", [(4, 4), (4, 5)]))
+        assert len(board.ships) == 1
@@ -0,0 +1,31 @@
+import random
+
+from Game.gamestate import GameState
+from simulation import FLEETS
+
+
+def test_move_log_reads_back_like_the_old_lists_of_dicts():
+    random.seed(1)
+    gs = GameState(10)
+    gs.player_board.place_ships_randomly(FLEETS[10])
+    gs.ai_board.place_ships_randomly(FLEETS[10])
+    cells = [(r, c) for r in range(10) for c in range(10)]
+    shots = {"player": random.sample(cells, 100), "ai": random.sample(cells, 100)}
+    shots["player"][3:3] = [(-1, 2), shots["player"][0]]       # off the board, and a repeat
+
+    old_log = {"player": [], "ai": []}      # what GameState used to append to player_moves / ai_moves
+    while not gs.game_over:
+        player = gs.current_turn
+        coord = shots[player].pop(0)
+        already = any(move["coord"] == coord for move in old_log[player])
+        on_board = 0 <= coord[0] < 10 and 0 <= coord[1] < 10
+        assert gs.has_shot(player, coord) == (already and on_board)
+        result = gs.make_move(coord)
+        old_log[player].append({"player": player, "coord": coord, "result": result})
+
+    assert gs.player_moves == old_log["player"]
+    assert gs.ai_moves == old_log["ai"]
+    assert [move for move in gs.moves() if move[0] == "ai"] == [tuple(m.values()) for m in old_log["ai"]]
+    assert len(list(gs.moves())) == len(old_log["player"]) + len(old_log["ai"])
+    assert ("player", (-1, 2), "miss") in gs.moves("player")
+    assert any(result.startswith("sunk") for _, _, result in gs.moves())
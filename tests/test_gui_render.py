@@ -0,0 +1,60 @@
+import os
+import random
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+from Game.gamestate import GameState
+from gui_render import Renderer
+from simulation import FLEETS
+
+
+@pytest.fixture
+def screen():
+    pygame.init()
+    yield pygame.display.set_mode((1100, 600))
+    pygame.quit()
+
+
+def new_renderer(screen, gs):
+    renderer = Renderer(screen, pygame.font.Font(None, 20), pygame.font.Font(None, 36))
+    views = (renderer.add_board(gs.player_board, 50, 120, "Your Fleet", reveal_ships=True),
+             renderer.add_board(gs.ai_board, 600, 120, "Enemy Waters"))
+    return renderer, views
+
+
+def test_only_changed_cells_are_redrawn_and_the_screen_matches_a_full_redraw(screen):
+    random.seed(4)
+    gs = GameState(10)
+    gs.player_board.place_ships_randomly(FLEETS[10])
+    gs.ai_board.place_ships_randomly(FLEETS[10])
+    renderer, (mine, enemy) = new_renderer(screen, gs)
+    renderer.draw()
+    assert renderer.draw() == 0         # nothing changed, nothing pushed
+
+    water = next((r, c) for r in range(10) for c in range(10) if gs.ai_board.grid.get((r, c)) is None)
+    enemy.mark_shot(water, gs.ai_board.receive_shot(water))
+    assert renderer.draw() == 1
+
+    ship = gs.ai_board.ships[-1]
+    for coord in ship.coord:
+        enemy.mark_shot(coord, gs.ai_board.receive_shot(coord))
+    assert renderer.draw() == len(ship.coord)      # the whole ship turns "sunk", each cell once
+
+    mine.set_ghost([(0, 0), (0, 1)], (0, 255, 0))
+    renderer.draw()
+    mine.set_ghost([(0, 1), (0, 2)], (0, 255, 0))
+    assert renderer.draw() == 2         # the cell it left and the one it moved onto, (0, 1) looks the same
+    mine.set_heat([[r + c for c in range(10)] for r in range(10)])
+    renderer.draw()
+    mine.set_ghost([], (0, 255, 0))
+    renderer.draw()
+
+    incremental = pygame.image.tobytes(screen, "RGB")
+    fresh, (fresh_mine, _) = new_renderer(screen, gs)
+    fresh_mine.set_heat([[r + c for c in range(10)] for r in range(10)])
+    screen.fill((0, 0, 0))
+    fresh.draw()
+    assert pygame.image.tobytes(screen, "RGB") == incremental
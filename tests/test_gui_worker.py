@@ -0,0 +1,85 @@
+import random
+import threading
+import time
+
+import pytest
+
+from Game.board import Board
+from ai.search import SearchAI
+from gui_worker import Worker
+from simulation import FLEETS
+
+
+def wait_for(worker, count):
+    done = []
+    deadline = time.monotonic() + 5
+    while len(done) < count and time.monotonic() < deadline:
+        done += worker.poll()
+        time.sleep(0.001)
+    return done
+
+
+def test_jobs_run_off_the_event_loop_in_order_and_stay_busy_until_polled():
+    worker = Worker()
+    release = threading.Event()
+
+    def slow_move():
+        release.wait(5)
+        return threading.current_thread().name
+
+    worker.submit("ai", slow_move)
+    worker.submit("learn", lambda x: x * 2, 21)
+    assert worker.poll() == []          # the loop never waits on a job
+    assert worker.busy("ai") and worker.busy("learn")
+
+    release.set()
+    assert wait_for(worker, 2) == [("ai", "ai-worker"), ("learn", 42)]
+    assert not worker.busy("ai") and not worker.busy("learn")
+    worker.close(5)
+
+
+def test_a_failed_job_raises_in_poll():
+    worker = Worker()
+    worker.submit("ai", lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        wait_for(worker, 1)
+    assert not worker.busy("ai")
+    worker.close(5)
+
+
+def test_ai_moves_from_the_worker_are_the_moves_it_makes_inline():
+    fleet = FLEETS[10]
+    games = []
+    for use_worker in (False, True):
+        random.seed(12)
+        board = Board(10)
+        board.place_ships_randomly(fleet)
+        ai = SearchAI(10)
+        worker = Worker() if use_worker else None
+        moves = []
+        while not board.all_ships_sunk():
+            if worker:
+                worker.submit("ai", ai.get_next_move, board)
+                [(_, move)] = wait_for(worker, 1)
+            else:
+                move = ai.get_next_move(board)
+            ai.update_result(move, board.receive_shot(move), board)
+            moves.append(move)
+        if worker:
+            worker.close(5)
+        games.append(moves)
+    assert games[0] == games[1]
+
+
+def test_close_lets_queued_jobs_finish():
+    worker = Worker()
+    finished = []
+
+    def slow_learn():
+        time.sleep(0.05)
+        finished.append(True)
+
+    worker.submit("learn", slow_learn)
+    worker.close(5)
+    assert finished == [True]
+    assert not worker.thread.is_alive()
@@ -0,0 +1,49 @@
+import os
+import random
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+from Game.board import Board
+from ai.heuristics import get_best_hunt_move, get_probability_grid
+from ai.search import SearchAI
+from gui_main import ai_heatmap
+from gui_render import HEAT_LEVELS, BoardView
+from simulation import FLEETS
+
+
+def test_overlay_shows_the_grid_the_ai_picks_its_move_from():
+    random.seed(7)
+    board = Board(10)
+    board.place_ships_randomly(FLEETS[10])
+    ai = SearchAI(10)
+    while not board.all_ships_sunk():
+        grid = ai_heatmap(board, None)
+        move = ai.get_next_move(board)
+        assert get_best_hunt_move(board, grid) == move
+        if ai.mode == "hunt":
+            remaining = [ship for ship in board.ships if not ship.is_sunk()]
+            assert grid == get_probability_grid(board, remaining)
+        ai.update_result(move, board.receive_shot(move), board)
+
+
+def test_set_heat_only_marks_cells_whose_shade_changed():
+    pygame.font.init()
+    view = BoardView(Board(4), 0, 0, "Your Fleet", pygame.font.Font(None, 36))
+    grid = [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11], [12, 13, 14, 15]]
+    view.set_heat(grid)
+    assert view.heat[(3, 3)] == HEAT_LEVELS - 1 and (0, 0) not in view.heat
+    assert len(view.pending) == 15
+
+    view.pending.clear()
+    view.set_heat([[2 * score for score in row] for row in grid])     # same shades
+    assert not view.pending
+    grid[0][1] = 0
+    view.set_heat(grid)
+    assert view.pending == {(0, 1)}
+
+    view.pending.clear()
+    view.set_heat(None)
+    assert not view.heat and len(view.pending) == 14
@@ -0,0 +1,44 @@
+from ai.heuristics import HeatmapScratch, get_probability_grid_into
+from ai.learning import RLBrain
+from positions import random_positions
+
+
+def original_probability_grid(board, remaining_ships, rl_brain=None):
+    """The heatmap as it was before the scratch buffers: dict lookups, a fresh grid and a set every call."""
+    size = board.size
+    grid = [[0] * size for _ in range(size)]
+    forbidden = {cell for cell, state in board.grid.items() if state == "miss"}
+    for ship in board.ships:
+        if ship.is_sunk():
+            for (sr, sc) in ship.coord:
+                forbidden |= {(sr + dr, sc + dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)}
+    for ship in remaining_ships:
+        length = len(ship.coord)
+        for dr, dc in ((0, 1), (1, 0)):
+            for r in range(size - dr * (length - 1)):
+                for c in range(size - dc * (length - 1)):
+                    cells = [(r + i * dr, c + i * dc) for i in range(length)]
+                    if any(cell in forbidden for cell in cells):
+                        continue
+                    for (pr, pc) in cells:
+                        grid[pr][pc] += 10 if board.grid.get((pr, pc)) == "already_hit" else 1
+    if rl_brain:
+        for r in range(size):
+            for c in range(size):
+                if board.grid.get((r, c)) not in ("miss", "already_hit"):
+                    grid[r][c] += rl_brain.get_bias_score(r, c)
+    return grid
+
+
+def test_a_reused_scratch_gives_the_original_heatmap_every_call(tmp_path):
+    brain = RLBrain(10, path=str(tmp_path / "memory.bin"))
+    for board, _ in random_positions(10, 2, seed=8):
+        brain.learn_from_game(board)
+
+    scratch = HeatmapScratch(10)
+    for board, remaining in random_positions(10, 3, seed=6):
+        for rl_brain in (None, brain):
+            grid = get_probability_grid_into(board, remaining, scratch, rl_brain)
+            assert grid is scratch.rows
+            assert grid == original_probability_grid(board, remaining, rl_brain)
+    brain.close()
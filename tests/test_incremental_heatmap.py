@@ -0,0 +1,21 @@
+import random
+
+from Game.board import Board
+from ai.incremental_heatmap import IncrementalHeatmap
+from simulation import default_fleet
+
+
+def test_incremental_heatmap_matches_a_full_recompute_every_shot():
+    rng = random.Random(2)
+    for size in (5, 10):
+        random.seed(size)
+        board = Board(size)
+        board.place_ships_randomly(default_fleet(size))
+        heatmap = IncrementalHeatmap(board, list(board.ships))
+        cells = [(r, c) for r in range(size) for c in range(size)]
+        rng.shuffle(cells)
+        for cell in cells:
+            heatmap.observe(cell, board.receive_shot(cell), board)
+            assert heatmap.check(board, [ship for ship in board.ships if not ship.is_sunk()])
+            if board.all_ships_sunk():
+                break
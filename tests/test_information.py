@@ -0,0 +1,70 @@
+import math
+import random
+
+from Game.board import Board
+from ai.exact_solver import ExactSolver
+from ai.information import MIN_HIT_RATIO, best_information_move
+from ai.search import SearchAI
+
+
+def brute_force_move(board, layouts):
+    """
+    Open cell with the most even hit / miss split over the layouts (depth 1), likelier cell on ties,
+    among the cells within MIN_HIT_RATIO of the best hit chance.
+    """
+    size = board.size
+    total = sum(weight for _, weight in layouts)
+    chances = {x: sum(weight for mask, weight in layouts if mask >> x & 1) / total
+               for x in range(size * size) if divmod(x, size) not in board.shots_taken}
+    floor = max(chances.values()) * MIN_HIT_RATIO
+    best = None
+    for x, p in chances.items():
+        if p == 0 or p < floor:
+            continue
+        if p == 1:
+            return divmod(x, size)
+        gain = -(p * math.log2(p) + (1 - p) * math.log2(1 - p))
+        key = (round(gain, 9), p)
+        if best is None or key > best[0]:
+            best = (key, x)
+    return divmod(best[1], size)
+
+
+def test_info_move_takes_the_most_even_split_among_the_likeliest_cells():
+    board = Board(3)
+    # cell 0 hits 55% of the layouts, cell 1 50%: close enough, and cell 1 splits them more evenly
+    layouts = [(0b01, 0.30), (0b11, 0.25), (0b10, 0.25), (0b00, 0.20)]
+    assert best_information_move(board, layouts, depth=1, top_k=9) == (0, 1)
+    # cell 1 would split these evenly too, but it's far less likely to hit than cell 0
+    layouts = [(0b011, 0.45), (0b001, 0.50), (0b100, 0.05)]
+    assert best_information_move(board, layouts, depth=1, top_k=9) == (0, 0)
+    # a cell every layout has a ship on is a free hit
+    assert best_information_move(board, [(0b011, 1.0), (0b110, 2.0)], depth=1) == (0, 1)
+    assert best_information_move(board, []) is None
+
+
+def test_info_move_matches_a_brute_force_entropy_scan_on_exact_layouts():
+    fleet = [("Destroyer", 2), ("Patrol", 1)]
+    for seed in range(5):
+        random.seed(seed)
+        board = Board(4)
+        board.place_ships_randomly(fleet)
+        for cell in random.sample([(r, c) for r in range(4) for c in range(4)], 3):
+            board.receive_shot(cell)
+        layouts = ExactSolver(board).alive_layouts()
+        assert best_information_move(board, layouts, depth=1, top_k=16) == brute_force_move(board, layouts)
+
+
+def test_info_selector_finishes_games():
+    for heatmap in ("python", "exact"):
+        random.seed(2)
+        board = Board(5)
+        board.place_ships_randomly([("Submarine", 3), ("Destroyer", 2)])
+        ai = SearchAI(5, heatmap=heatmap, selector="info", samples=200, time_budget_ms=None)
+        moves = 0
+        while not board.all_ships_sunk() and moves < 25:
+            move = ai.get_next_move(board)
+            assert move not in board.shots_taken
+            ai.update_result(move, board.receive_shot(move), board)
+            moves += 1
+        assert board.all_ships_sunk()
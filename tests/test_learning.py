@@ -0,0 +1,105 @@
+from Game.board import Board
+from Game.ship import Ship
+from ai.learning import BIAS_WEIGHT, RLBrain
+
+
+def test_bias_computed_while_a_game_is_learned_is_not_cached(tmp_path):
+    brain = RLBrain(5, path=str(tmp_path / "memory.bin"))
+    board = Board(5)
+    board.add_ship(Ship("Destroyer", [(0, 0), (0, 1)]))
+
+    real_counts = brain.counts
+
+    def counts_then_learn():
+        # the learner thread finishes a game right after the AI thread read the old counts
+        old = real_counts()
+        brain.learn_from_game(board)
+        return old
+
+    brain.counts = counts_then_learn
+    stale = brain.bias_cells()
+    brain.counts = real_counts
+
+    fresh = brain.bias_cells()
+    assert fresh is not stale
+    assert fresh == [count * BIAS_WEIGHT / brain.effective_games() for count in brain.counts()]
+    brain.close()
+
+
+def test_opponent_profiles_live_next_to_a_custom_memory_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "memories").mkdir()
+    brain = RLBrain(5, path=str(tmp_path / "memories" / "custom.bin"))
+    profile = brain.for_opponent("alice/1")
+    board = Board(5)
+    board.add_ship(Ship("Destroyer", [(0, 0), (0, 1)]))
+    profile.learn_from_game(board)
+    brain.close()
+
+    assert profile.path == str(tmp_path / "memories" / "custom_alice_1.bin")
+    assert sorted(path.name for path in (tmp_path / "memories").glob("*.bin")) == ["custom_alice_1.bin"]
+    assert not list(tmp_path.glob("*.bin"))     # nothing written to the working directory
+
+
+def test_bias_layer_is_added_to_unshot_cells_only(tmp_path):
+    from ai.heuristics import get_probability_grid, get_probability_grid_numpy, np
+
+    brain = RLBrain(5, path=str(tmp_path / "memory.bin"))
+    past = Board(5)
+    past.add_ship(Ship("Destroyer", [(0, 0), (0, 1)]))
+    past.add_ship(Ship("Submarine", [(2, 2), (3, 2), (4, 2)]))
+    brain.learn_from_game(past)
+
+    board = Board(5)
+    board.add_ship(Ship("Destroyer", [(4, 3), (4, 4)]))
+    board.add_ship(Ship("Submarine", [(0, 2), (0, 3), (0, 4)]))
+    for shot in [(0, 0), (2, 2), (0, 3)]:
+        board.receive_shot(shot)
+    remaining = [ship for ship in board.ships if not ship.is_sunk()]
+
+    plain = get_probability_grid(board, remaining)
+    biased = get_probability_grid(board, remaining, brain)
+    bias = brain.bias_cells()
+    for r in range(5):
+        for c in range(5):
+            extra = 0 if (r, c) in board.shots_taken else bias[r * 5 + c]
+            assert biased[r][c] == plain[r][c] + extra
+    if np is not None:
+        assert np.allclose(get_probability_grid_numpy(board, remaining, brain), biased)
+    brain.close()
+
+
+def test_bias_is_worked_out_once_per_learned_game(tmp_path):
+    brain = RLBrain(5, path=str(tmp_path / "memory.bin"))
+    first, second = Board(5), Board(5)
+    first.add_ship(Ship("Destroyer", [(0, 0), (0, 1)]))
+    second.add_ship(Ship("Destroyer", [(0, 0), (1, 0)]))
+    brain.learn_from_game(first)
+    brain.learn_from_game(second)
+
+    bias = brain.bias_cells()
+    assert brain.bias_cells() is bias           # reused move after move
+    assert bias[0] == BIAS_WEIGHT                # a ship there in every game
+    assert bias[1] == bias[5] == BIAS_WEIGHT / 2
+    assert brain.get_bias_score(1, 0) == bias[5]
+    fingerprint = brain.bias_fingerprint()
+
+    brain.learn_from_game(first)
+    assert brain.bias_cells() is not bias
+    assert brain.bias_cells()[1] == BIAS_WEIGHT * 2 / 3
+    assert brain.bias_fingerprint() != fingerprint
+    brain.close()
+
+
+def test_shared_bias_picks_up_games_flushed_by_another_process(tmp_path):
+    path = str(tmp_path / "shared.bin")
+    brain = RLBrain(5, path=path, shared=True)
+    other = RLBrain(5, path=path, shared=True)      # stands in for a second process on the same file
+    board = Board(5)
+    board.add_ship(Ship("Destroyer", [(0, 0), (0, 1)]))
+
+    assert brain.bias_cells() == [0.0] * 25
+    other.learn_from_game(board)
+    assert brain.bias_cells()[0] == BIAS_WEIGHT
+    other.close()
+    brain.close()
@@ -0,0 +1,125 @@
+import gc
+import os
+import subprocess
+import sys
+import threading
+import time
+import weakref
+from array import array
+
+import ai.memory_store as memory_store
+from ai.memory_store import MemoryStore, SharedMemoryStore, read_memory
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_pending_games_are_written_at_exit_without_any_flush_trigger(tmp_path):
+    path = tmp_path / "memory.bin"
+    script = (
+        "from ai.memory_store import MemoryStore\n"
+        f"store = MemoryStore({str(path)!r}, 5, flush_every=None, flush_interval=None)\n"
+        "store.load()\n"
+        "store.increment([0, 6])\n"
+        "store.record_game()\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True)
+
+    size, games, cells = read_memory(str(path))
+    assert (size, games) == (5, 1)
+    assert cells[0] == cells[6] == 1
+
+
+def test_a_slow_older_flush_never_overwrites_a_newer_one(tmp_path, monkeypatch):
+    path = str(tmp_path / "memory.bin")
+    store = MemoryStore(path, 5, flush_every=None)
+    store.load()
+
+    real_write = memory_store.write_memory
+    release = threading.Event()
+
+    def slow_first_write(path, size, games, cells):
+        if games == 1:
+            release.wait(5)
+        real_write(path, size, games, cells)
+
+    monkeypatch.setattr(memory_store, "write_memory", slow_first_write)
+
+    store.record_game()
+    older = threading.Thread(target=store.flush)
+    older.start()
+    time.sleep(0.05)            # the first flush has its snapshot and is stuck writing
+    store.record_game()
+    newer = threading.Thread(target=store.flush)
+    newer.start()
+    time.sleep(0.05)
+    release.set()
+    older.join()
+    newer.join()
+
+    assert read_memory(path)[1] == 2
+    store.close()
+
+
+def test_shard_left_under_our_own_pid_is_merged_not_wiped(tmp_path):
+    path = str(tmp_path / "shared.bin")
+    # a process that died without flushing, whose pid we got afterwards
+    leftover = array("I", bytes(25 * 4))
+    leftover[3] = 4
+    memory_store.write_memory(f"{path}.shard-{os.getpid()}", 5, 2, leftover)
+
+    store = SharedMemoryStore(path, 5)
+    store.load()
+    assert store.value(3) == 4
+    assert store.games == 2
+    store.close()
+
+
+def test_closed_stores_are_not_kept_alive_by_the_exit_hook(tmp_path):
+    store = MemoryStore(str(tmp_path / "memory.bin"), 5)
+    store.load()
+    store.load()
+    store.close()
+    ref = weakref.ref(store)
+    del store
+    gc.collect()
+    assert ref() is None
+
+
+def test_exit_hook_skips_a_store_whose_directory_is_gone(tmp_path):
+    folder = tmp_path / "gone"
+    folder.mkdir()
+    script = (
+        "import shutil\n"
+        "from ai.memory_store import MemoryStore, SharedMemoryStore\n"
+        f"store = MemoryStore({str(folder / 'memory.bin')!r}, 5, flush_every=None)\n"
+        "store.load()\n"
+        "store.record_game()\n"
+        f"shared = SharedMemoryStore({str(folder / 'shared.bin')!r}, 5, flush_every=None)\n"
+        "shared.load()\n"
+        "shared.record_game()\n"
+        f"shutil.rmtree({str(folder)!r})\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0
+    assert result.stderr == ""
+
+
+def test_two_stores_on_one_file_in_one_process_keep_their_own_shards(tmp_path):
+    path = str(tmp_path / "shared.bin")
+    first = SharedMemoryStore(path, 5, flush_every=None)
+    first.load()
+    second = SharedMemoryStore(path, 5, flush_every=None)
+    second.load()
+    assert first.shard_path != second.shard_path
+
+    first.increment([1])
+    first.record_game()
+    second.increment([2])
+    second.record_game()
+    first.close()
+    assert second.value(1) == 1 and second.value(2) == 1
+    second.close()
+
+    size, games, cells = read_memory(path)
+    assert games == 2
+    assert cells[1] == cells[2] == 1
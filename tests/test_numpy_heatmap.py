@@ -0,0 +1,13 @@
+import pytest
+
+from ai.heuristics import get_probability_grid, get_probability_grid_numpy, np
+from positions import random_positions
+
+needs_numpy = pytest.mark.skipif(np is None, reason="numpy not installed")
+
+
+@needs_numpy
+def test_numpy_heatmap_matches_the_python_one():
+    for board, remaining in random_positions(10, 3, seed=1):
+        expected = get_probability_grid(board, remaining)
+        assert get_probability_grid_numpy(board, remaining).tolist() == expected
@@ -0,0 +1,19 @@
+from Game.board import Board
+from ai.heuristics import get_best_hunt_move, get_probability_grid
+from ai.opening_book import OpeningBook
+from simulation import FLEETS
+
+
+def test_precomputed_line_is_the_all_miss_line_of_the_real_fleet():
+    book = OpeningBook()
+    line = book.precompute(10, FLEETS[10], depth=5)
+
+    board = Board(10)
+    board.place_ships_randomly(FLEETS[10])
+    fleet = list(board.ships)
+    empty = Board(10)       # same shots, no ships, so they all miss
+    for move in line:
+        assert move == get_best_hunt_move(empty, get_probability_grid(empty, fleet))
+        entry = book.get(book.position_key(empty, fleet))
+        assert entry is not None and entry[1] == move
+        empty.receive_shot(move)
@@ -0,0 +1,60 @@
+import random
+import time
+
+import Game.placements as placements
+from Game.bitboard import BitBoard
+from Game.board import Board
+from Game.placements import (fleet_fits_area, find_placement, get_placements, placement_coords,
+                             placements_covering, random_fleet_layout)
+from simulation import FLEETS
+
+
+def test_board_and_bitboard_place_the_same_fleet_for_the_same_seed():
+    layouts = []
+    for board_cls in (Board, BitBoard):
+        random.seed(11)
+        board = board_cls(10)
+        board.place_ships_randomly(FLEETS[10])
+        layouts.append([(ship.name, ship.coord) for ship in board.ships])
+    assert layouts[0] == layouts[1]
+
+
+def test_fleet_too_big_for_the_board_is_rejected_without_a_search():
+    assert fleet_fits_area(10, [length for _, length in FLEETS[10]])
+    assert not fleet_fits_area(10, [5] * 11)
+    start = time.perf_counter()
+    assert random_fleet_layout(10, [("Carrier", 5)] * 11) is None
+    assert time.perf_counter() - start < 0.01
+
+
+def test_search_still_gives_up_correctly_once_the_dead_end_memo_is_full(monkeypatch):
+    # 4x4 with two 4-long ships and a 1: passes the area check but never fits
+    monkeypatch.setattr(placements, "MAX_DEAD_ENDS", 0)
+    assert fleet_fits_area(4, [4, 4, 1])
+    assert random_fleet_layout(4, [("A", 4), ("B", 4), ("C", 1)], random.Random(0)) is None
+    assert random_fleet_layout(4, [("A", 4), ("B", 4)], random.Random(0)) is not None
+
+
+def test_placement_table_matches_a_brute_force_scan():
+    for size in (1, 4, 7, 10):
+        for length in range(1, size + 2):
+            spots = []      # the old nested loops: horizontal first, then vertical
+            for orientation, dr, dc in (("H", 0, 1), ("V", 1, 0)):
+                for r in range(size):
+                    for c in range(size):
+                        coords = [(r + i * dr, c + i * dc) for i in range(length)]
+                        if all(0 <= cr < size and 0 <= cc < size for cr, cc in coords):
+                            spots.append((orientation, r, c, coords))
+
+            table = get_placements(size, length)
+            assert [(p.orientation, p.row, p.col, placement_coords(p, size)) for p in table] == spots
+            for placement, (orientation, r, c, coords) in zip(table, spots):
+                touching = {(cr + dr, cc + dc) for cr, cc in coords for dr in (-1, 0, 1) for dc in (-1, 0, 1)}
+                buffer = sum(1 << (tr * size + tc) for tr, tc in touching if 0 <= tr < size and 0 <= tc < size)
+                assert placement.buffer == buffer
+                assert placement.mask == sum(1 << (cr * size + cc) for cr, cc in coords)
+                assert find_placement(size, length, orientation, r, c) is placement
+            for idx in range(size * size):
+                assert placements_covering(size, length, idx) == tuple(p for p in table if idx in p.cells)
+        assert find_placement(size, 2, "H", 0, size - 1) is None
+        assert find_placement(size, 2, "V", size - 1, 0) is None
@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from Game.board import Board
+from Game.ship import Ship
+from ai.exact_solver import ExactSolver
+from ai.probability_model import PosteriorSampler
+
+
+def board_with_shots(shots):
+    """6x6 board with two length-3 ships and a length-2 one, after the given shots."""
+    board = Board(6)
+    board.add_ship(Ship("cruiser", [(1, 1), (1, 2), (1, 3)]))
+    board.add_ship(Ship("submarine", [(3, 0), (4, 0), (5, 0)]))
+    board.add_ship(Ship("destroyer", [(4, 3), (4, 4)]))
+    for shot in shots:
+        board.receive_shot(shot)
+    return board
+
+
+@pytest.mark.parametrize("shots", [
+    [(1, 2), (3, 3)],           # one hit, one miss
+    [(4, 3), (4, 4)],           # destroyer sunk, both length-3 ships are free
+    [(1, 1), (1, 2), (0, 5)],   # two hits that a length-2 ship could cover but isn't sunk on
+])
+def test_sampler_matches_exact_enumeration_with_same_length_ships(shots):
+    board = board_with_shots(shots)
+    remaining = [ship for ship in board.ships if not ship.is_sunk()]
+
+    solver = ExactSolver(board)
+    total = solver.layouts_left()
+    exact = [[count / total for count in row] for row in solver.grid()]
+
+    sampler = PosteriorSampler(board, remaining, random.Random(7))
+    sampler.draw(40000, None)
+    sampled = sampler.occupancy()
+
+    error = max(abs(sampled[r][c] - exact[r][c]) for r in range(6) for c in range(6)
+                if (r, c) not in board.shots_taken)
+    assert error < 0.015
@@ -0,0 +1,66 @@
+import random
+
+import ai.exact_solver as exact_solver
+from Game.board import Board
+from Game.ship import Ship
+from ai.heuristics import get_best_hunt_move, get_probability_grid
+from ai.search import DEADLINE_MIN_SAMPLES, SearchAI
+from simulation import FLEETS
+
+
+def test_exact_heatmap_falls_back_once_when_the_board_has_too_many_layouts(monkeypatch):
+    built = []
+    real_table = exact_solver.LayoutTable
+
+    def counting_table(*args, **kwargs):
+        built.append(args)
+        return real_table(*args, **kwargs)
+
+    monkeypatch.setattr(exact_solver, "LayoutTable", counting_table)
+    monkeypatch.setattr(exact_solver, "_TABLES", {})
+
+    random.seed(3)
+    board = Board(10)
+    board.place_ships_randomly(FLEETS[10])
+    ai = SearchAI(10, heatmap="exact")
+    moves = 0
+    while not board.all_ships_sunk() and moves < 110:
+        move = ai.get_next_move(board)
+        ai.update_result(move, board.receive_shot(move), board)
+        moves += 1
+
+    assert board.all_ships_sunk()
+    assert ai.exact_failed is not None
+    assert len(built) == 1      # listed once, the failure is remembered after that
+
+
+def test_deadline_mode_keeps_the_heatmap_move_without_time_and_samples_with_it():
+    random.seed(5)
+    board = Board(10)
+    board.place_ships_randomly(FLEETS[10])
+    for cell in [(0, 0), (4, 4), (9, 2), (2, 7)]:
+        if board.grid.get(cell) is None:        # misses only, so the bot stays in hunt mode
+            board.receive_shot(cell)
+    remaining = [ship for ship in board.ships if not ship.is_sunk()]
+
+    ai = SearchAI(10, samples=DEADLINE_MIN_SAMPLES * 2)
+    rushed = ai.get_next_move(board, deadline_ms=0)
+    assert rushed == get_best_hunt_move(board, get_probability_grid(board, remaining))
+    assert ai.last_search["source"] == "python"
+    assert ai.last_search["deadline_ms"] == 0
+
+    move = ai.get_next_move(board, deadline_ms=10000)
+    assert move not in board.shots_taken
+    assert ai.last_search["source"] == "montecarlo"
+    assert ai.last_search["samples"] == DEADLINE_MIN_SAMPLES * 2     # stopped once the samples were in
+    assert ai.last_search["within_deadline"]
+
+
+def test_deadline_mode_reports_target_moves():
+    board = Board(10)
+    board.add_ship(Ship("Cruiser", [(5, 5), (5, 6), (5, 7)]))
+    board.receive_shot((5, 6))
+    ai = SearchAI(10)
+    move = ai.get_next_move(board, deadline_ms=50)
+    assert move in {(4, 6), (6, 6), (5, 5), (5, 7)}
+    assert ai.last_search["mode"] == "target"
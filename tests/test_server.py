@@ -0,0 +1,87 @@
+import asyncio
+
+from server import GameServer
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_exact_heatmap_rejected_when_the_board_has_too_many_layouts():
+    async def go():
+        server = GameServer(workers=1)
+        response = await server.handle({"op": "new", "size": 10, "heatmap": "exact"}, set())
+        server.close()
+        return response
+
+    response = run(go())
+    assert not response["ok"]
+    assert "layouts" in response["error"]
+
+
+def test_failed_ai_turn_breaks_the_session_instead_of_handing_the_turn_over():
+    async def go():
+        server = GameServer(workers=1)
+        owned = set()
+        session_id = (await server.handle({"op": "new", "size": 5}, owned))["session"]
+        session = server.sessions[session_id]
+
+        def boom(*args, **kwargs):
+            raise RuntimeError("no move")
+        session.ai.get_next_move = boom
+
+        first = await server.handle({"op": "shot", "session": session_id, "r": 0, "c": 0}, owned)
+        second = await server.handle({"op": "shot", "session": session_id, "r": 1, "c": 1}, owned)
+        state = await server.handle({"op": "state", "session": session_id}, owned)
+        server.close()
+        return first, second, state, session
+
+    first, second, state, session = run(go())
+    assert not first["ok"] and "AI turn failed" in first["error"]
+    assert not second["ok"] and "broken" in second["error"]
+    assert state["broken"]
+    # the second shot never reached the boards, in particular not as an AI move on the player's board
+    assert (1, 1) not in session.gs.ai_board.shots_taken
+    assert (1, 1) not in session.gs.player_board.shots_taken
+
+
+def test_shot_refused_when_it_is_not_the_players_turn():
+    async def go():
+        server = GameServer(workers=1)
+        owned = set()
+        session_id = (await server.handle({"op": "new", "size": 5}, owned))["session"]
+        server.sessions[session_id].gs.current_turn = "ai"
+        response = await server.handle({"op": "shot", "session": session_id, "r": 0, "c": 0}, owned)
+        server.close()
+        return response, server.sessions[session_id]
+
+    response, session = run(go())
+    assert not response["ok"] and "turn" in response["error"]
+    assert not session.gs.player_board.shots_taken and not session.gs.ai_board.shots_taken
+
+
+def test_oversized_client_fleets_are_rejected_before_placement():
+    async def go():
+        server = GameServer(workers=1)
+        too_many = await server.handle({"op": "new", "size": 20, "fleet": [["Boat", 2]] * 40}, set())
+        too_long = await server.handle({"op": "new", "size": 5, "fleet": [["Boat", 6]]}, set())
+        no_room = await server.handle({"op": "new", "size": 5, "fleet": [["Boat", 5]] * 4}, set())
+        server.close()
+        return too_many, too_long, no_room
+
+    too_many, too_long, no_room = run(go())
+    assert not too_many["ok"] and "ships" in too_many["error"]
+    assert not too_long["ok"] and "lengths" in too_long["error"]
+    assert not no_room["ok"] and "Can't fit" in no_room["error"]
+
+
+def test_malformed_session_gets_an_error_response():
+    async def go():
+        server = GameServer(workers=1)
+        responses = [await server.handle({"op": op, "session": [1], "id": 7}, set())
+                     for op in ("state", "shot", "close")]
+        server.close()
+        return responses
+
+    for response in run(go()):
+        assert response["ok"] is False and response["id"] == 7
@@ -0,0 +1,21 @@
+from Game.ship import Ship
+
+
+def test_a_repeated_hit_is_only_counted_once():
+    ship = Ship("Destroyer", [(2, 3), (2, 4)])
+    ship.register_hit((2, 3))
+    ship.register_hit((2, 3))
+    assert ship.hit_count == 1
+    assert not ship.is_sunk()
+
+    ship.register_hit((5, 5))           # not this ship
+    ship.register_hit((2, 4))
+    assert ship.hit_count == 2
+    assert ship.is_sunk()
+
+
+def test_ships_have_no_per_instance_dict():
+    ship = Ship("Cruiser", [(0, 0), (1, 0), (2, 0)])
+    assert not hasattr(ship, "__dict__")
+    assert ship.coord == ((0, 0), (1, 0), (2, 0))
+    assert (1, 0) in ship.cells and (0, 1) not in ship.cells
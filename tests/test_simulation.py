@@ -0,0 +1,49 @@
+import pytest
+
+from ai.heuristics import np
+from simulation import (BOTS, compare_selectors, default_fleet, game_seed, parse_bot_arg, play_game, run_lockstep,
+                        run_parallel)
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+@pytest.mark.parametrize("size", [5, 10])
+def test_lockstep_plays_the_same_moves_as_run_parallel(size):
+    lockstep = run_lockstep(120, size, seed=3, batch_size=50)
+    serial = run_parallel("search", 120, size, workers=1, seed=3)
+    assert [game["moves"] for game in lockstep] == [game["moves"] for game in serial]
+
+
+@pytest.mark.parametrize("bot_name", ["random", "search"])
+def test_pool_plays_every_game_like_a_plain_play_game(bot_name):
+    seen = []
+    pooled = run_parallel(bot_name, 20, 5, workers=3, seed=9, chunk_size=2, on_result=seen.append)
+    assert [game["game"] for game in pooled] == list(range(20))
+    assert sorted(game["game"] for game in seen) == list(range(20))
+
+    bot_kwargs = {"time_budget_ms": None} if bot_name == "search" else None
+    for i, game in enumerate(pooled):
+        alone = play_game(BOTS[bot_name], 5, default_fleet(5), game_seed(9, i), bot_kwargs)
+        assert (game["seed"], game["moves"]) == (alone["seed"], alone["moves"])
+
+    bit = run_parallel(bot_name, 20, 5, workers=1, seed=9, engine="bit")
+    assert [game["moves"] for game in bit] == [game["moves"] for game in pooled]
+
+
+def test_montecarlo_results_do_not_depend_on_the_worker_count():
+    kwargs = {"heatmap": "montecarlo", "samples": 100}
+    serial = run_parallel("search", 12, 5, workers=1, seed=5, bot_kwargs=kwargs)
+    pooled = run_parallel("search", 12, 5, workers=3, seed=5, bot_kwargs=kwargs, chunk_size=1)
+    assert [game["moves"] for game in serial] == [game["moves"] for game in pooled]
+
+
+def test_bot_arg_none():
+    assert parse_bot_arg("time_budget_ms=none") == ("time_budget_ms", None)
+    assert parse_bot_arg("samples=500") == ("samples", 500)
+
+
+def test_selector_comparison_is_reproducible():
+    kwargs = {"heatmap": "exact"}
+    first = compare_selectors(30, 5, seed=4, bot_kwargs=kwargs)
+    second = compare_selectors(30, 5, seed=4, bot_kwargs=kwargs)
+    assert first["info_minus_greedy"] == second["info_minus_greedy"]
+    assert first["info"]["mean_moves"] - first["greedy"]["mean_moves"] == pytest.approx(first["info_minus_greedy"])
@@ -0,0 +1,64 @@
+import random
+
+from Game.board import Board
+from Game.ship import Ship
+from ai.heuristics import get_target_grid
+from ai.search import SearchAI
+from simulation import FLEETS
+
+
+def brute_force_target_grid(board, remaining_ships):
+    """Counts, cell by cell, the ship spots that cover an open hit, avoid misses / sunk buffers and touch no other open hit."""
+    size = board.size
+    sunk = [ship for ship in board.ships if ship.is_sunk()]
+    no_go = {cell for cell, state in board.grid.items() if state == "miss"}
+    no_go |= {(r + dr, c + dc) for ship in sunk for (r, c) in ship.coord for dr in (-1, 0, 1) for dc in (-1, 0, 1)}
+    open_hits = {cell for cell, state in board.grid.items() if state == "already_hit"} - no_go
+
+    grid = [[0] * size for _ in range(size)]
+    for ship in remaining_ships:
+        length = len(ship.coord)
+        for dr, dc in ((0, 1), (1, 0)):
+            for r in range(size):
+                for c in range(size):
+                    cells = {(r + i * dr, c + i * dc) for i in range(length)}
+                    if any(not (0 <= cr < size and 0 <= cc < size) for cr, cc in cells):
+                        continue
+                    touching = {(cr + a, cc + b) for cr, cc in cells for a in (-1, 0, 1) for b in (-1, 0, 1)}
+                    if not cells & open_hits or cells & no_go or (touching - cells) & open_hits:
+                        continue
+                    for cr, cc in cells:
+                        if (cr, cc) not in board.shots_taken:
+                            grid[cr][cc] += 1
+    return grid
+
+
+def test_target_grid_matches_a_brute_force_count_through_whole_games():
+    for seed in range(4):
+        random.seed(seed)
+        board = Board(10)
+        board.place_ships_randomly(FLEETS[10])
+        ai = SearchAI(10)
+        while not board.all_ships_sunk():
+            remaining = [ship for ship in board.ships if not ship.is_sunk()]
+            grid = get_target_grid(board, remaining)
+            if grid is not None:
+                assert grid == brute_force_target_grid(board, remaining)
+            move = ai.get_next_move(board)
+            ai.update_result(move, board.receive_shot(move), board)
+
+
+def test_a_line_of_hits_is_only_extended_along_the_line():
+    board = Board(10)
+    board.add_ship(Ship("Battleship", [(4, 3), (4, 4), (4, 5), (4, 6)]))
+    board.add_ship(Ship("Destroyer", [(8, 8), (9, 8)]))
+    board.receive_shot((4, 4))
+    board.receive_shot((4, 5))
+    board.receive_shot((9, 8))
+    grid = get_target_grid(board, board.ships)
+
+    assert grid[4][3] > 0 and grid[4][6] > 0
+    assert grid[3][4] == grid[5][4] == grid[3][5] == grid[5][5] == 0
+    # the second cluster is chased too, the destroyer can only go up from the bottom row
+    assert grid[8][8] > 0
+    assert SearchAI(10).target_move(board) in {(4, 3), (4, 6), (8, 8), (9, 7), (9, 9)}
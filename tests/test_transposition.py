@@ -0,0 +1,25 @@
+from Game.board import Board
+from Game.ship import Ship
+from Game.zobrist import symmetries
+from ai.heuristics import get_probability_grid
+from ai.transposition import TranspositionTable
+from positions import random_positions
+
+
+def test_transposition_table_reads_rotated_and_mirrored_positions_back_correctly():
+    size = 10
+    table = TranspositionTable()
+    for board, remaining in random_positions(size, 2, seed=4):
+        for perm in symmetries(size):
+            # the same position seen through one of the 8 symmetries
+            moved = Board(size)
+            for ship in board.ships:
+                moved.add_ship(Ship(ship.name, [divmod(perm[r * size + c], size) for (r, c) in ship.coord]))
+            for (r, c) in sorted(board.shots_taken):     # sinks only depend on which cells were hit
+                moved.receive_shot(divmod(perm[r * size + c], size))
+            moved_remaining = [ship for ship in moved.ships if not ship.is_sunk()]
+
+            expected = get_probability_grid(moved, moved_remaining)
+            cached = table.grid(moved, moved_remaining, None, lambda: get_probability_grid(moved, moved_remaining))
+            assert cached == expected
+    assert table.hits > 0